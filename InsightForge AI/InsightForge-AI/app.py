@@ -9,32 +9,89 @@ from typing import List, Tuple
 import traceback
 
 # Import core modules
-from core.pdf_loader import PDFLoader
-from core.chunking import DocumentChunker
+from core.chunking import collapse_to_parents
 from core.embeddings import EmbeddingGenerator
-from core.vector_store import VectorStore
+from core.ingest_jobs import IngestJobManager
 from core.rag_pipeline import RAGPipeline
+from core.prompting import PromptAssembler
+from core.reranker import CrossEncoderReranker
 
 # Import utilities
 from utils.memory import ConversationMemory
 from utils.logger import setup_logger, QueryLogger
+from utils.cache import RetrievalCache
+from utils.diagnostics import process_usage, deep_sizeof, format_bytes
 
 # Setup logging
 logger = setup_logger("RAG_Intelligence")
 
 # Global state
-pdf_loader = PDFLoader()
-chunker = DocumentChunker(chunk_size=1000, chunk_overlap=200)
 embedding_generator = None
 vector_store = None
 rag_pipeline = None
+reranker = None
 conversation_memory = ConversationMemory()
 query_logger = QueryLogger()
+retrieval_cache = RetrievalCache()
+prompt_assembler = PromptAssembler(max_context_tokens=int(os.environ.get("PROMPT_CONTEXT_TOKENS", "6000")))
 
 # Application state
 documents_loaded = False
 chunks_data = []
 
+# Retrieval settings
+RETRIEVAL_K = 5
+RERANK_CANDIDATES = 20  # Over-fetch from FAISS when re-ranking
+RERANK_TOP_N = 3  # Chunks passed to the LLM after re-ranking
+CHILD_K = 15  # Child chunks retrieved before collapsing to parent windows
+PARENT_TOP_N = 3  # Parent windows passed to the LLM
+MMR_SETTINGS = {
+    'fetch_k': int(os.environ.get("MMR_FETCH_K", "50")),  # Candidate pool diversified with MMR
+    'lambda_mult': float(os.environ.get("MMR_LAMBDA", "0.5"))  # 1.0 = pure relevance, 0.0 = pure diversity
+}
+
+# Index layout: more than one shard enables parallel scatter-gather search
+VECTOR_SHARDS = int(os.environ.get("VECTOR_SHARDS", "1"))
+
+# Ingestion runs in a worker process; settings are passed to every job
+INGEST_SETTINGS = {
+    'chunk_size': 1000,
+    'chunk_overlap': 200,
+    'num_shards': VECTOR_SHARDS,
+    'extraction_cache_dir': os.environ.get("EXTRACTION_CACHE_DIR"),
+    'extraction_cache_bytes': int(os.environ.get("EXTRACTION_CACHE_MB", "256")) * 1024 * 1024,
+    'release_documents': os.environ.get("RELEASE_PAGE_TEXT", "1") == "1",
+    # Index small child chunks, answer from the page windows they belong to
+    'parent_windows': os.environ.get("PARENT_WINDOWS", "1") == "1",
+    'child_chunk_size': 300,
+    'child_chunk_overlap': 50,
+    'parent_window_size': 2000
+}
+latest_ingest = None  # Result of the job whose index is currently being served
+scope_version = None  # Index version the search-scope choices were last built for
+
+
+def swap_index(store, job):
+    """Atomically replace the served index with a freshly built one"""
+    global vector_store, chunks_data, documents_loaded, latest_ingest
+    
+    # Format and count prompt blocks once per index instead of once per query
+    prompt_assembler.prepare(store.parents or store.chunks)
+    
+    # Each name is rebound in one step; queries hold their own reference to the old store
+    chunks_data = store.parents or store.chunks
+    latest_ingest = job
+    vector_store = store
+    documents_loaded = True
+
+
+ingest_manager = IngestJobManager(
+    settings=INGEST_SETTINGS,
+    output_dir=os.environ.get("INGEST_DIR"),
+    max_workers=int(os.environ.get("INGEST_WORKERS", "1")),
+    on_complete=swap_index
+)
+
 
 def initialize_models():
     """Initialize AI models (lazy loading)"""
@@ -50,7 +107,7 @@ def initialize_models():
             if not groq_api_key:
                 raise ValueError("GROQ_API_KEY environment variable not set")
             logger.info("Initializing RAG pipeline...")
-            rag_pipeline = RAGPipeline(groq_api_key)
+            rag_pipeline = RAGPipeline(groq_api_key, prompt_assembler=prompt_assembler)
         
         return True
     except Exception as e:
@@ -58,67 +115,93 @@ def initialize_models():
         return False
 
 
-def process_documents(files):
-    """Process uploaded PDF documents"""
-    global documents_loaded, chunks_data, vector_store
+def get_reranker():
+    """Initialize cross-encoder re-ranker (lazy loading)"""
+    global reranker
     
+    if reranker is None:
+        logger.info("Initializing cross-encoder re-ranker...")
+        reranker = CrossEncoderReranker(
+            backend=os.environ.get("RERANK_BACKEND", "torch"),
+            quantize=os.environ.get("RERANK_QUANTIZE", "0") == "1"
+        )
+    
+    return reranker
+
+
+def process_documents(files):
+    """Queue uploaded PDF documents for background ingestion"""
     if not files or len(files) == 0:
         return "⚠️ ALERT: No documents uploaded. Please select PDF files.", ""
     
     try:
-        # Initialize models
+        # Query-side models load here; the ingest worker loads its own embedding model
         if not initialize_models():
             return "❌ SYSTEM ERROR: Failed to initialize AI models. Check API configuration.", ""
         
-        # Load PDFs
-        logger.info(f"Processing {len(files)} documents...")
-        documents = pdf_loader.load_pdfs(files)
-        
-        if not documents:
-            return "❌ EXTRACTION FAILED: No content extracted from PDFs.", ""
-        
-        # Chunk documents
-        logger.info("Chunking documents...")
-        chunks_data = chunker.chunk_documents(documents)
-        
-        if not chunks_data:
-            return "❌ PROCESSING ERROR: Failed to create document chunks.", ""
-        
-        # Generate embeddings
-        logger.info("Generating embeddings...")
-        chunk_texts = [chunk['text'] for chunk in chunks_data]
-        embeddings = embedding_generator.generate_embeddings(chunk_texts)
-        
-        # Build vector store
-        logger.info("Building vector index...")
-        vector_store = VectorStore(embedding_generator.embedding_dim)
-        vector_store.build_index(embeddings, chunks_data)
-        
-        documents_loaded = True
+        paths = [f if isinstance(f, str) else f.name for f in files]
+        job_id = ingest_manager.submit(paths)
+        logger.info(f"Submitted {len(paths)} documents as ingest job {job_id}")
         
-        # Get statistics
-        stats = pdf_loader.get_summary_stats()
-        chunk_stats = chunker.get_chunking_stats(chunks_data)
+        return get_ingest_status(), ""
         
-        status_msg = f"""✅ PROCESSING COMPLETE
+    except Exception as e:
+        logger.error(f"Error processing documents: {str(e)}")
+        traceback.print_exc()
+        return f"❌ CRITICAL ERROR: {str(e)}", ""
+
+
+def format_ingest_report(result):
+    """Render statistics of a finished ingest job"""
+    stats = result['doc_stats']
+    chunk_stats = result['chunk_stats']
+    dedup_stats = result['dedup_stats']
+    
+    return f"""✅ PROCESSING COMPLETE
 
 📊 INTELLIGENCE REPORT:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 📚 Documents Analyzed: {stats['num_files']}
 📄 Total Pages: {stats['total_pages']}
 🔤 Characters Processed: {stats['total_characters']:,}
+🧹 Boilerplate Lines Removed: {dedup_stats['lines_removed']:,}
+♻️ Duplicate Pages Skipped: {dedup_stats['exact_duplicates'] + dedup_stats['near_duplicates']}
 🧩 Data Chunks: {chunk_stats['total_chunks']}
 📊 Avg Chunk Size: {int(chunk_stats['avg_chunk_size'])} chars
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 🟢 SYSTEM READY FOR QUERIES"""
-        
-        return status_msg, ""
-        
-    except Exception as e:
-        logger.error(f"Error processing documents: {str(e)}")
-        traceback.print_exc()
-        return f"❌ CRITICAL ERROR: {str(e)}", ""
+
+
+def get_ingest_status():
+    """Render ingest job progress and the report of the index being served"""
+    jobs = ingest_manager.list_jobs()
+    if not jobs:
+        return ""
+    
+    icons = {'queued': '⏳', 'running': '⚙️', 'done': '✅', 'failed': '❌', 'cancelled': '🛑'}
+    lines = ["📥 **INGEST JOBS**", "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"]
+    for job in jobs[:5]:
+        files = ", ".join(job['files'][:3]) + (f" +{len(job['files']) - 3}" if len(job['files']) > 3 else "")
+        line = f"{icons[job['status']]} `{job['job_id']}` {job['status'].upper()}"
+        if job['status'] == "running":
+            line += f" | {job['stage']} | {job['progress']:.0%}"
+        elif job['status'] == "failed":
+            line += f" | {job['error']}"
+        lines.append(f"{line} | {job['elapsed_s']}s | {files}")
+    
+    report = "\n".join(lines)
+    served = latest_ingest
+    if served is not None and served.result is not None:
+        report = format_ingest_report(served.result) + "\n\n" + report
+    return report
+
+
+def cancel_ingest():
+    """Cancel every queued or running ingest job"""
+    for job_id in ingest_manager.active_jobs():
+        ingest_manager.cancel(job_id)
+    return get_ingest_status()
 
 
 def generate_summary(mode):
@@ -146,9 +229,26 @@ def generate_summary(mode):
         return f"❌ SUMMARY GENERATION FAILED: {str(e)}"
 
 
-def answer_question(message, history, mode):
+def get_scope_choices():
+    """List indexed documents for search scoping (left untouched until a new index is swapped in)"""
+    global scope_version
+    
+    store = vector_store
+    if not documents_loaded or store is None or store.version == scope_version:
+        return gr.update()
+    
+    scope_version = store.version
+    return gr.update(choices=sorted(store.source_ids), value=[])
+
+
+def poll_ingest():
+    """Timer callback: refresh job progress and pick up newly swapped indexes"""
+    return get_ingest_status(), get_scope_choices()
+
+
+def answer_question(message, history, mode, use_rerank=False, scope_sources=None, use_mmr=False):
     """Answer user question using RAG - FIXED for Gradio chat format"""
-    global vector_store, rag_pipeline, conversation_memory, query_logger
+    global vector_store, rag_pipeline, conversation_memory, query_logger, retrieval_cache
     
     # Handle empty message
     if not message or message.strip() == "":
@@ -161,11 +261,30 @@ def answer_question(message, history, mode):
         return history
     
     try:
-        # Generate query embedding
-        query_embedding = embedding_generator.generate_query_embedding(message)
+        # Pin the current index; an ingest finishing mid-query swaps in the next one for later queries
+        store = vector_store
         
-        # Retrieve relevant chunks
-        retrieved_chunks = vector_store.search(query_embedding, k=5)
+        # Generate query embedding (cached per normalized query text)
+        query_embedding = retrieval_cache.embed_query(message, embedding_generator, store.version)
+        
+        # Restrict search to the selected documents (none selected = whole corpus)
+        filters = {'sources': sorted(scope_sources)} if scope_sources else None
+        mmr = MMR_SETTINGS if use_mmr else None
+        
+        # Retrieve relevant chunks (cached per embedding, k, filters and corpus version)
+        if use_rerank:
+            candidates = retrieval_cache.search(store, query_embedding, k=RERANK_CANDIDATES, filters=filters, mmr=mmr)
+            retrieved_chunks = get_reranker().rerank(
+                message, candidates, top_n=CHILD_K if store.parents else RERANK_TOP_N
+            )
+        else:
+            retrieved_chunks = retrieval_cache.search(
+                store, query_embedding, k=CHILD_K if store.parents else RETRIEVAL_K, filters=filters, mmr=mmr
+            )
+        
+        # Two-level index: hand the LLM each matched parent window once instead of overlapping children
+        if store.parents:
+            retrieved_chunks = collapse_to_parents(retrieved_chunks, store.parents, limit=PARENT_TOP_N)
         
         # Get conversation context
         context = conversation_memory.get_context_for_llm(num_turns=2)
@@ -186,6 +305,9 @@ def answer_question(message, history, mode):
 """
         for i, source in enumerate(sources, 1):
             formatted_answer += f"\n{i}. 📄 {source['source']}, Page {source['page']} | Confidence: {source['relevance']:.2%}"
+            if source.get('duplicates'):
+                also_in = ", ".join(f"{d['source']} p.{d['page']}" for d in source['duplicates'])
+                formatted_answer += f" (also in: {also_in})"
         
         # Update memory
         conversation_memory.add_turn(message, answer, sources)
@@ -243,13 +365,17 @@ def clear_conversation():
 
 def get_analytics():
     """Get query analytics"""
-    global query_logger
+    global query_logger, retrieval_cache
     
     stats = query_logger.get_stats()
     
     if stats['total_queries'] == 0:
         return "📊 No queries processed yet."
     
+    cache_stats = retrieval_cache.get_stats()
+    embedding_cache = cache_stats['embeddings']
+    results_cache = cache_stats['results']
+    
     return f"""📊 **SYSTEM ANALYTICS**
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -258,9 +384,84 @@ def get_analytics():
 ❌ Failed: {stats['failed_queries']}
 📈 Success Rate: {stats['success_rate']}%
 📏 Avg Query Length: {stats['avg_question_length']} chars
+🧠 Embedding Cache: {embedding_cache['hit_rate']}% hits ({embedding_cache['size']}/{embedding_cache['max_size']})
+🗂️ Retrieval Cache: {results_cache['hit_rate']}% hits ({results_cache['size']}/{results_cache['max_size']})
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
 
 
+def get_diagnostics():
+    """Per-component memory estimates, process usage and last ingest profile"""
+    store = vector_store
+    # Shared so chunk dicts referenced from several places are attributed once
+    seen = set()
+    components = {}
+    
+    if embedding_generator is not None:
+        components['embedding_model'] = embedding_generator.get_memory_usage()['model_bytes']
+    if reranker is not None:
+        rerank_usage = reranker.get_memory_usage()
+        components['reranker_model'] = rerank_usage['model_bytes']
+        components['rerank_score_cache'] = rerank_usage['cache_bytes']
+    if store is not None:
+        store_usage = store.get_memory_usage(seen)
+        components['vector_index'] = store_usage['index_bytes']
+        components['chunk_metadata'] = store_usage['metadata_bytes']
+    # Summaries read the served store's chunks, so this is usually already counted
+    components['chunks_data'] = deep_sizeof(chunks_data, seen)
+    cache_usage = retrieval_cache.get_memory_usage()
+    components['query_embedding_cache'] = cache_usage['embeddings_bytes']
+    components['retrieval_result_cache'] = cache_usage['results_bytes']
+    components['conversation_memory'] = deep_sizeof(conversation_memory.history, seen)
+    served = latest_ingest
+    
+    return {
+        'process': process_usage(),
+        'components': components,
+        'ingest': served.result['worker'] if served is not None and served.result is not None else None
+    }
+
+
+def render_diagnostics():
+    """Render resource diagnostics for the UI panel"""
+    report = get_diagnostics()
+    process = report['process']
+    
+    lines = [
+        "🩺 **RESOURCE DIAGNOSTICS**",
+        "",
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"🧮 Process RSS: {format_bytes(process['rss_bytes'])} (peak {format_bytes(process['peak_rss_bytes'])})",
+        f"⏱️ CPU Time: {process['cpu_user_s']}s user / {process['cpu_system_s']}s system",
+        "",
+        "| Component | Est. Memory |",
+        "|-----------|-------------|"
+    ]
+    for name, num_bytes in sorted(report['components'].items(), key=lambda item: -item[1]):
+        lines.append(f"| {name} | {format_bytes(num_bytes)} |")
+    
+    ingest = report['ingest']
+    if ingest:
+        lines += [
+            "",
+            f"⚙️ **Last Ingest** (worker pid {ingest['pid']}, peak RSS {format_bytes(ingest['peak_rss_bytes'])})",
+            "",
+            "| Stage | Wall | CPU | RSS Δ |",
+            "|-------|------|-----|-------|"
+        ]
+        for stage in ingest['stages']:
+            lines.append(
+                f"| {stage['stage']} | {stage['wall_s']}s | {stage['cpu_s']}s | {format_bytes(stage['rss_delta_bytes'])} |"
+            )
+        lines.append(f"| **total** | {ingest['total_wall_s']}s | {ingest['total_cpu_s']}s | |")
+        lines.append("")
+        lines.append(
+            "Worker memory: " + ", ".join(f"{name} {format_bytes(value)}" for name, value in ingest['memory'].items())
+        )
+    
+    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    return "\n".join(lines)
+
+
 # Military-Grade CSS
 military_css = """
 /* Military-Grade Intelligence Theme */
@@ -433,11 +634,23 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
                 elem_classes="primary-btn"
             )
             
+            cancel_btn = gr.Button(
+                "Cancel Processing",
+                variant="secondary",
+                elem_classes="secondary-btn"
+            )
+            
             status_output = gr.Markdown(
                 label="PROCESSING STATUS",
                 elem_classes="status-box"
             )
             
+            scope_selector = gr.CheckboxGroup(
+                choices=[],
+                label="Search Scope",
+                info="Limit answers to selected documents (none selected = all)"
+            )
+            
             gr.HTML('<p class="section-header">⚙️ SETTINGS</p>')
             
             mode_selector = gr.Radio(
@@ -447,6 +660,18 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
                 info="Executive: Strategic insights | Technical: Detailed analysis"
             )
             
+            rerank_toggle = gr.Checkbox(
+                value=False,
+                label="Cross-Encoder Re-ranking",
+                info=f"Re-score top {RERANK_CANDIDATES} matches and send the best {RERANK_TOP_N} to the LLM"
+            )
+            
+            mmr_toggle = gr.Checkbox(
+                value=False,
+                label="Diversify Results (MMR)",
+                info=f"Pick varied passages from the top {MMR_SETTINGS['fetch_k']} instead of overlapping neighbours"
+            )
+            
             gr.HTML('<p class="section-header">📊 DOCUMENT SUMMARY</p>')
             
             summary_btn = gr.Button(
@@ -483,6 +708,14 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
             )
             
             analytics_output = gr.Markdown()
+            
+            diagnostics_btn = gr.Button(
+                "🩺 Resource Diagnostics",
+                variant="secondary",
+                elem_classes="secondary-btn"
+            )
+            
+            diagnostics_output = gr.Markdown()
         
         # Right Column - Chat
         with gr.Column(scale=2):
@@ -523,6 +756,20 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
         outputs=[status_output, summary_output]
     )
     
+    cancel_btn.click(
+        fn=cancel_ingest,
+        inputs=[],
+        outputs=[status_output]
+    )
+    
+    # Ingestion runs in the background; poll its progress instead of blocking a worker
+    ingest_timer = gr.Timer(2.0)
+    ingest_timer.tick(
+        fn=poll_ingest,
+        inputs=[],
+        outputs=[status_output, scope_selector]
+    )
+    
     summary_btn.click(
         fn=generate_summary,
         inputs=[mode_selector],
@@ -532,7 +779,7 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
     # FIXED: Proper chat interface binding
     submit_btn.click(
         fn=answer_question,
-        inputs=[msg_input, chatbot, mode_selector],
+        inputs=[msg_input, chatbot, mode_selector, rerank_toggle, scope_selector, mmr_toggle],
         outputs=[chatbot]
     ).then(
         lambda: "",  # Clear input after submit
@@ -542,7 +789,7 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
     
     msg_input.submit(
         fn=answer_question,
-        inputs=[msg_input, chatbot, mode_selector],
+        inputs=[msg_input, chatbot, mode_selector, rerank_toggle, scope_selector, mmr_toggle],
         outputs=[chatbot]
     ).then(
         lambda: "",
@@ -567,6 +814,12 @@ with gr.Blocks(title="RAG PDF Intelligence") as app:
         inputs=[],
         outputs=[analytics_output]
     )
+    
+    diagnostics_btn.click(
+        fn=render_diagnostics,
+        inputs=[],
+        outputs=[diagnostics_output]
+    )
 
 
 if __name__ == "__main__":
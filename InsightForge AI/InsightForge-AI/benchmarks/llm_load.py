@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+LLM Client Load Test
+Drives LLMClient against the local fake server and reports tail latency
+
+Usage:
+    python benchmarks/llm_load.py --requests 400 --concurrency 32 --tail-prob 0.05 --hedge-percentile 90
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm_client import LLMClient
+from utils.fake_llm_server import FakeLLMConfig, FakeLLMServer
+
+
+def run(client: LLMClient, requests: int, concurrency: int) -> np.ndarray:
+    """Issue requests concurrently and return per-request latencies (NaN for failures)"""
+    def one(i):
+        start = time.perf_counter()
+        try:
+            client.chat(model="fake", messages=[{"role": "user", "content": f"question {i}"}], max_tokens=16)
+            return time.perf_counter() - start
+        except Exception:
+            return float('nan')
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return np.array(list(pool.map(one, range(requests))))
+
+
+def report(label: str, latencies: np.ndarray, wall: float, stats: dict):
+    ok = latencies[~np.isnan(latencies)] * 1000
+    p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (0, 0, 0)
+    print(f"{label:<12} ok={len(ok):>5}/{len(latencies):<5} "
+          f"p50={p50:7.1f}ms p95={p95:7.1f}ms p99={p99:7.1f}ms "
+          f"throughput={len(ok) / wall:7.1f}/s retries={stats['retries']} hedges={stats['hedges']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--tail-prob", type=float, default=0.05)
+    parser.add_argument("--tail-ms", type=float, default=1500.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--hedge-percentile", type=float, default=90.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        tail_prob=args.tail_prob,
+        tail_ms=args.tail_ms,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        seed=7
+    )).start()
+
+    try:
+        for label, hedge in (("no-hedge", None), ("hedged", args.hedge_percentile)):
+            client = LLMClient(
+                "test-key",
+                base_url=server.base_url,
+                # Headroom for backup requests so hedges do not queue behind primaries
+                max_connections=2 * args.concurrency,
+                timeout=args.timeout,
+                backoff_base=0.05,
+                hedge_percentile=hedge
+            )
+            start = time.perf_counter()
+            latencies = run(client, args.requests, args.concurrency)
+            report(label, latencies, time.perf_counter() - start, client.get_stats())
+            client.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
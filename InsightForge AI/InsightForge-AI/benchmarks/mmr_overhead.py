@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+MMR Overhead Benchmark
+Times maximal-marginal-relevance selection against plain top-k on a synthetic corpus
+
+Usage:
+    python benchmarks/mmr_overhead.py --chunks 20000 --dim 384 --fetch-k 20,50,100,200 --k 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.vector_store import VectorStore, mmr_select
+
+
+def synthetic_corpus(num_chunks: int, dim: int, overlap: int, seed: int = 0) -> np.ndarray:
+    """Normalized embeddings where runs of `overlap` neighbours are near-duplicates, like overlapping chunks"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_chunks // overlap + 1, dim)).astype(np.float32)
+    vectors = np.repeat(centers, overlap, axis=0)[:num_chunks]
+    vectors += 0.1 * rng.normal(size=vectors.shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def time_us(fn, repeats: int) -> float:
+    """Median microseconds per call"""
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--overlap", type=int, default=4, help="Near-duplicate neighbours per chunk group")
+    parser.add_argument("--fetch-k", default="20,50,100,200")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lambda-mult", type=float, default=0.5)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    vectors = synthetic_corpus(args.chunks, args.dim, args.overlap)
+    chunks = [{'text': '', 'page': i // args.overlap, 'source': 'synthetic.pdf'} for i in range(args.chunks)]
+    store = VectorStore(args.dim)
+    store.build_index(vectors, chunks)
+    query = vectors[0]
+
+    top_ids, _ = store.search_ids(query, args.k)
+    print(f"corpus={args.chunks} dim={args.dim} k={args.k} lambda={args.lambda_mult}")
+    print(f"top-k search: {time_us(lambda: store.search_ids(query, args.k), args.repeats):8.1f} us  "
+          f"distinct groups={len(set(top_ids // args.overlap))}")
+
+    for fetch_k in (int(v) for v in args.fetch_k.split(",")):
+        candidate_ids, _ = store.search_ids(query, fetch_k)
+        candidates = store.get_vectors(candidate_ids)
+        select_us = time_us(lambda: mmr_select(query, candidates, args.k, args.lambda_mult), args.repeats)
+        total_us = time_us(
+            lambda: store.search_ids_mmr(query, args.k, fetch_k=fetch_k, lambda_mult=args.lambda_mult),
+            args.repeats
+        )
+        mmr_ids, _ = store.search_ids_mmr(query, args.k, fetch_k=fetch_k, lambda_mult=args.lambda_mult)
+        print(f"fetch_k={fetch_k:<4} mmr_select: {select_us:8.1f} us  search+mmr: {total_us:8.1f} us  "
+              f"distinct groups={len(set(mmr_ids // args.overlap))}")
+
+
+if __name__ == "__main__":
+    main()
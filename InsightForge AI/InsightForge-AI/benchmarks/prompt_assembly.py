@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Prompt Assembly Benchmark
+Per-query cost of building answer prompts: per-call formatting vs prepared PromptAssembler blocks
+
+Usage:
+    python benchmarks/prompt_assembly.py --k 50 --chunk-chars 1000 --repeats 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.prompting import PromptAssembler, SYSTEM_PROMPTS, USER_PROMPT_FOOTERS
+
+
+def legacy_messages(question, retrieved_chunks, mode):
+    """Prompt construction as done before PromptAssembler: every block re-formatted per call"""
+    context_parts = []
+    sources = []
+    for i, (chunk, score) in enumerate(retrieved_chunks, 1):
+        context_parts.append(f"[Context {i} - {chunk['source']}, Page {chunk['page']}]\n{chunk['text']}\n")
+        sources.append({
+            'source': chunk['source'],
+            'page': chunk['page'],
+            'relevance': round(score, 3),
+            'text_preview': chunk['text'][:200] + "...",
+            'duplicates': chunk.get('duplicates', [])
+        })
+    context = "\n".join(context_parts)
+    user_prompt = f"Question: {question}\n\nContext from documents:\n{context}\n{USER_PROMPT_FOOTERS[mode]}"
+    return [{"role": "system", "content": SYSTEM_PROMPTS[mode]}, {"role": "user", "content": user_prompt}], sources
+
+
+def time_us(fn, repeats: int) -> float:
+    """Median microseconds per call"""
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000, help="Chunks in the prepared corpus")
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = "revenue margin forecast pipeline latency throughput index vector quarter growth".split()
+    chunks = []
+    for i in range(args.chunks):
+        text = " ".join(rng.choice(words) for _ in range(args.chunk_chars // 7))[:args.chunk_chars]
+        chunks.append({'text': text, 'source': f"report_{i % 20}.pdf", 'page': i // 20 + 1, 'chunk_id': f"c{i}"})
+
+    # Budget large enough to keep all k chunks, so both paths build the same prompt
+    assembler = PromptAssembler(max_context_tokens=10 ** 9)
+    start = time.perf_counter()
+    assembler.prepare(chunks)
+    prepare_ms = (time.perf_counter() - start) * 1000
+
+    retrieved = [(chunks[i], 0.9 - i * 0.001) for i in rng.sample(range(args.chunks), args.k)]
+    question = "How did the quarterly revenue forecast change across reports?"
+
+    legacy, _ = legacy_messages(question, retrieved, "technical")
+    prepared, _, usage = assembler.build_messages(question, retrieved, "technical")
+    assert legacy == prepared, "prepared prompt differs from legacy prompt"
+
+    legacy_us = time_us(lambda: legacy_messages(question, retrieved, "technical"), args.repeats)
+    prepared_us = time_us(lambda: assembler.build_messages(question, retrieved, "technical"), args.repeats)
+    budget = PromptAssembler(max_context_tokens=3000)
+    budget.prepare(chunks)
+    budget_us = time_us(lambda: budget.build_messages(question, retrieved, "technical"), args.repeats)
+    _, kept, budget_usage = budget.build_messages(question, retrieved, "technical")
+
+    print(f"k={args.k} chunk_chars={args.chunk_chars} prompt_tokens~{usage['prompt_tokens']}")
+    print(f"prepare (index time, {args.chunks} chunks): {prepare_ms:8.1f} ms")
+    print(f"legacy per-query assembly:        {legacy_us:8.1f} us")
+    print(f"prepared per-query assembly:      {prepared_us:8.1f} us  ({legacy_us / prepared_us:.2f}x)")
+    print(f"prepared with 3000-token budget:  {budget_us:8.1f} us  (kept {len(kept)}, "
+          f"dropped {budget_usage['dropped_chunks']})")
+
+
+if __name__ == "__main__":
+    main()
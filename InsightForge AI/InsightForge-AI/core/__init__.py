@@ -3,15 +3,30 @@ InsightForge AI - Core Module
 """
 
 from .pdf_loader import PDFLoader
+from .deduplication import PageDeduplicator
+from .extraction_cache import ExtractionCache
 from .chunking import DocumentChunker
 from .embeddings import EmbeddingGenerator
 from .vector_store import VectorStore
+from .sharded_store import ShardedVectorStore
+from .llm_client import LLMClient, DeadlineExceeded
+from .prompting import PromptAssembler
 from .rag_pipeline import RAGPipeline
+from .ingest_jobs import IngestJobManager
+from .reranker import CrossEncoderReranker
 
 __all__ = [
     'PDFLoader',
+    'PageDeduplicator',
+    'ExtractionCache',
     'DocumentChunker',
     'EmbeddingGenerator',
     'VectorStore',
-    'RAGPipeline'
+    'ShardedVectorStore',
+    'LLMClient',
+    'DeadlineExceeded',
+    'PromptAssembler',
+    'RAGPipeline',
+    'IngestJobManager',
+    'CrossEncoderReranker'
 ]
@@ -4,7 +4,7 @@ Semantic text splitting optimized for RAG retrieval
 """
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -54,6 +54,9 @@ class DocumentChunker:
                         'chunk_id': f"{doc['source']}_p{doc['page']}_c{i}",
                         'total_pages': doc.get('total_pages', 0)
                     }
+                    # Pages dropped as duplicates of this one, so citations still resolve
+                    if doc.get('duplicates'):
+                        chunk['duplicates'] = doc['duplicates']
                     all_chunks.append(chunk)
                     
             except Exception as e:
@@ -76,3 +79,133 @@ class DocumentChunker:
             'min_chunk_size': min(chunk_sizes),
             'max_chunk_size': max(chunk_sizes)
         }
+
+
+class ParentChildChunker:
+    """Two-level chunking: small child chunks for retrieval, page-level parent windows for generation"""
+    
+    def __init__(self, child_size: int = 300, child_overlap: int = 50, parent_size: int = 2000):
+        """
+        Initialize chunker
+        
+        Args:
+            child_size: Target size of indexed child chunks in characters
+            child_overlap: Overlap between children of the same parent
+            parent_size: Pages longer than this are split into non-overlapping parent windows
+        """
+        self.parent_size = parent_size
+        self.child_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=child_size,
+            chunk_overlap=child_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+        self.parent_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=parent_size,
+            chunk_overlap=0,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+    
+    def chunk_documents(self, documents: List[Dict[str, any]]) -> Tuple[List[Dict[str, any]], List[Dict[str, any]]]:
+        """
+        Split pages into parent windows and each window into child chunks
+        
+        Args:
+            documents: List of document dictionaries with text and metadata
+            
+        Returns:
+            Tuple of (child chunks carrying a parent_id, parent windows stored once)
+        """
+        children = []
+        parents = []
+        
+        for doc in documents:
+            try:
+                text = doc['text']
+                windows = [text] if len(text) <= self.parent_size else self.parent_splitter.split_text(text)
+                
+                for w, window_text in enumerate(windows):
+                    parent = {
+                        'text': window_text,
+                        'page': doc['page'],
+                        'source': doc['source'],
+                        'chunk_id': f"{doc['source']}_p{doc['page']}_w{w}",
+                        'total_pages': doc.get('total_pages', 0)
+                    }
+                    if doc.get('duplicates'):
+                        parent['duplicates'] = doc['duplicates']
+                    parent_id = len(parents)
+                    parents.append(parent)
+                    
+                    for i, child_text in enumerate(self.child_splitter.split_text(window_text)):
+                        child = {
+                            'text': child_text,
+                            'page': doc['page'],
+                            'source': doc['source'],
+                            'chunk_id': f"{parent['chunk_id']}_c{i}",
+                            'total_pages': parent['total_pages'],
+                            'parent_id': parent_id
+                        }
+                        if doc.get('duplicates'):
+                            child['duplicates'] = doc['duplicates']
+                        children.append(child)
+                        
+            except Exception as e:
+                logger.error(f"Error chunking document from {doc.get('source', 'unknown')}: {str(e)}")
+                continue
+        
+        logger.info(
+            f"Created {len(children)} child chunks in {len(parents)} parent windows from {len(documents)} document pages"
+        )
+        return children, parents
+    
+    def get_chunking_stats(self, children: List[Dict[str, any]], parents: List[Dict[str, any]] = None) -> Dict[str, any]:
+        """Get statistics about child chunks and their parent windows"""
+        if not children:
+            return {}
+        
+        child_sizes = [len(chunk['text']) for chunk in children]
+        stats = {
+            'total_chunks': len(children),
+            'avg_chunk_size': sum(child_sizes) / len(child_sizes),
+            'min_chunk_size': min(child_sizes),
+            'max_chunk_size': max(child_sizes)
+        }
+        if parents:
+            stats['total_parents'] = len(parents)
+            stats['avg_parent_size'] = sum(len(parent['text']) for parent in parents) / len(parents)
+        return stats
+
+
+def collapse_to_parents(
+    results: List[Tuple[Dict[str, any], float]],
+    parents: List[Dict[str, any]],
+    limit: int = None
+) -> List[Tuple[Dict[str, any], float]]:
+    """
+    Replace retrieved child chunks by their parent windows, keeping each parent once
+    
+    Args:
+        results: (chunk, score) tuples sorted by descending score
+        parents: Parent windows indexed by the chunks' parent_id
+        limit: Maximum number of parent windows to return
+        
+    Returns:
+        (parent, best_child_score) tuples in order of first appearance
+    """
+    collapsed = []
+    seen = set()
+    
+    for chunk, score in results:
+        parent_id = chunk.get('parent_id')
+        # Chunks from a flat (single-level) index pass through unchanged
+        key = ('chunk', chunk['chunk_id']) if parent_id is None else parent_id
+        if key in seen:
+            continue
+        seen.add(key)
+        collapsed.append((chunk if parent_id is None else parents[parent_id], score))
+        if limit is not None and len(collapsed) >= limit:
+            break
+    
+    return collapsed
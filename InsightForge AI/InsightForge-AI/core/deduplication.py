@@ -0,0 +1,228 @@
+"""
+Deduplication Module
+Boilerplate line stripping and duplicate page elimination across an ingest batch
+"""
+
+from collections import Counter
+from typing import List, Dict, Tuple
+import hashlib
+import math
+import re
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the MinHash universal hash family
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_DIGITS = re.compile(r'\d+')
+_LETTERS = re.compile(r'[^\W\d_]')
+
+
+class PageDeduplicator:
+    """Fingerprint lines and pages across a batch to drop repeated content"""
+
+    def __init__(
+        self,
+        min_repeats: int = 3,
+        min_page_fraction: float = 0.5,
+        edge_lines: int = 2,
+        min_line_chars: int = 12,
+        near_duplicate_threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 42
+    ):
+        """
+        Initialize deduplicator
+
+        Args:
+            min_repeats: Fewest pages a line must appear on before it is treated as boilerplate
+            min_page_fraction: Fraction of the batch's pages a header/footer line must appear on
+            edge_lines: Lines at the top and at the bottom of a page that may be header/footer
+            min_line_chars: Shorter lines (and lines without letters) are never stripped
+            near_duplicate_threshold: Estimated Jaccard similarity at which a page counts as a near-duplicate
+            num_perm: Number of MinHash permutations per page signature
+            bands: Number of LSH bands (num_perm must be divisible by bands)
+            shingle_size: Words per shingle used for MinHash
+            seed: Random seed for the hash permutations
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.min_repeats = min_repeats
+        self.min_page_fraction = min_page_fraction
+        self.edge_lines = edge_lines
+        self.min_line_chars = min_line_chars
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._perm_a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._perm_b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.duplicate_map = {}
+        self.stats = {}
+
+    def process(self, pages: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """
+        Strip boilerplate lines and drop duplicate pages
+
+        Args:
+            pages: Page dictionaries with raw 'lines', 'page' and 'source'
+
+        Returns:
+            Surviving pages with boilerplate removed. Pages that absorbed duplicates
+            carry a 'duplicates' list of {'source', 'page'} references.
+        """
+        self.duplicate_map = {}
+        boilerplate = self._find_boilerplate(pages)
+
+        lines_removed = 0
+        stripped_pages = []
+        for page in pages:
+            kept = [
+                line for i, line in enumerate(page['lines'])
+                if not (self._is_edge(i, len(page['lines'])) and self._is_candidate(line)
+                        and (page['source'], self._normalize_line(line, page)) in boilerplate)
+            ]
+            lines_removed += len(page['lines']) - len(kept)
+            stripped_pages.append({**page, 'lines': kept})
+
+        exact_duplicates = 0
+        near_duplicates = 0
+        seen_hashes = {}
+        lsh_buckets = {}
+        signatures = []
+        kept_pages = []
+
+        for page in stripped_pages:
+            words = ' '.join(page['lines']).lower().split()
+            if not words:
+                continue
+
+            # Exact duplicates: identical normalized text
+            digest = hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=16).digest()
+            if digest in seen_hashes:
+                self._record_duplicate(kept_pages[seen_hashes[digest]], page)
+                exact_duplicates += 1
+                continue
+
+            # Near duplicates: MinHash signatures bucketed by LSH bands
+            signature = self._minhash(words)
+            band_keys = [
+                (b, signature[b * self.rows:(b + 1) * self.rows].tobytes())
+                for b in range(self.bands)
+            ]
+            match = self._find_near_duplicate(signature, band_keys, lsh_buckets, signatures)
+            if match is not None:
+                self._record_duplicate(kept_pages[match], page)
+                near_duplicates += 1
+                continue
+
+            position = len(kept_pages)
+            seen_hashes[digest] = position
+            signatures.append(signature)
+            for key in band_keys:
+                lsh_buckets.setdefault(key, []).append(position)
+            kept_pages.append(page)
+
+        self.stats = {
+            'input_pages': len(pages),
+            'output_pages': len(kept_pages),
+            'boilerplate_lines': len(boilerplate),
+            'lines_removed': lines_removed,
+            'exact_duplicates': exact_duplicates,
+            'near_duplicates': near_duplicates
+        }
+        logger.info(
+            f"Deduplicated {len(pages)} pages -> {len(kept_pages)} "
+            f"({lines_removed} boilerplate lines, {exact_duplicates} exact / "
+            f"{near_duplicates} near duplicate pages)"
+        )
+        return kept_pages
+
+    def resolve(self, source: str, page: int) -> Tuple[str, int]:
+        """Map a dropped page to the (source, page) that was indexed in its place"""
+        return self.duplicate_map.get((source, page), (source, page))
+
+    def _find_boilerplate(self, pages: List[Dict[str, any]]) -> set:
+        """
+        (source, normalized line) pairs of header/footer lines repeated within a document
+
+        Only the first and last edge_lines of a page are candidates, so repeated table
+        labels and body sentences are left alone. A line must appear on at least
+        min_page_fraction of its document's pages (and never fewer than min_repeats).
+        """
+        page_frequency = Counter()
+        document_pages = Counter()
+        for page in pages:
+            lines = page['lines']
+            document_pages[page['source']] += 1
+            page_frequency.update({
+                (page['source'], self._normalize_line(line, page)) for i, line in enumerate(lines)
+                if self._is_edge(i, len(lines)) and self._is_candidate(line)
+            })
+
+        return {
+            key for key, count in page_frequency.items()
+            if count >= max(self.min_repeats, math.ceil(self.min_page_fraction * document_pages[key[0]]))
+        }
+
+    def _is_edge(self, index: int, num_lines: int) -> bool:
+        """Whether a line sits in a page's header or footer region (always leaving a body line)"""
+        edge = min(self.edge_lines, (num_lines - 1) // 2)
+        return index < edge or index >= num_lines - edge
+
+    def _is_candidate(self, line: str) -> bool:
+        """Short and numeric-only lines (table cells, labels, bare page numbers) are never boilerplate"""
+        line = ' '.join(line.split())
+        return len(line) >= self.min_line_chars and _LETTERS.search(line) is not None
+
+    def _normalize_line(self, line: str, page: Dict[str, any]) -> str:
+        """Case/whitespace-insensitive header/footer fingerprint with the page number and page count masked"""
+        numbers = {page['page'], page.get('total_pages')}
+        line = ' '.join(line.split()).lower()
+        return _DIGITS.sub(lambda m: '#' if int(m.group()) in numbers else m.group(), line)
+
+    def _minhash(self, words: List[str]) -> np.ndarray:
+        """MinHash signature over word shingles"""
+        size = min(self.shingle_size, len(words))
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+             for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # (a * x + b) mod p stays below 2**64 because a, b and x are all < 2**32
+        permuted = (self._perm_a[:, None] * hashes[None, :] + self._perm_b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _find_near_duplicate(self, signature, band_keys, lsh_buckets, signatures):
+        """Return the kept position of a near-duplicate page, if any"""
+        candidates = set()
+        for key in band_keys:
+            candidates.update(lsh_buckets.get(key, ()))
+
+        for position in sorted(candidates):
+            similarity = float(np.mean(signatures[position] == signature))
+            if similarity >= self.near_duplicate_threshold:
+                return position
+        return None
+
+    def _record_duplicate(self, canonical: Dict[str, any], duplicate: Dict[str, any]):
+        """Attach a dropped page to the page that represents it in the index"""
+        canonical.setdefault('duplicates', []).append({
+            'source': duplicate['source'],
+            'page': duplicate['page']
+        })
+        self.duplicate_map[(duplicate['source'], duplicate['page'])] = (
+            canonical['source'], canonical['page']
+        )
@@ -4,10 +4,12 @@ Vector embedding generation using state-of-the-art sentence transformers
 """
 
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Dict
 import numpy as np
 import logging
 
+from utils.diagnostics import module_bytes
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,6 +54,10 @@ class EmbeddingGenerator:
             logger.error(f"Error generating embeddings: {str(e)}")
             raise
     
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Bytes held by model parameters and buffers"""
+        return {'model_bytes': module_bytes(self.model)}
+    
     def generate_query_embedding(self, query: str) -> np.ndarray:
         """
         Generate embedding for a single query
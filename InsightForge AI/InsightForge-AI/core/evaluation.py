@@ -0,0 +1,224 @@
+"""
+Evaluation Module
+Offline retrieval quality and latency measurement over labeled question sets
+"""
+
+from typing import List, Dict, Tuple, Iterable
+import itertools
+import json
+import math
+import time
+import logging
+
+import faiss
+import numpy as np
+
+from .chunking import DocumentChunker
+from .vector_store import VectorStore
+from utils.diagnostics import RssSampler
+
+logger = logging.getLogger(__name__)
+
+
+def load_questions(path: str) -> List[Dict[str, any]]:
+    """
+    Load a labeled question set
+
+    Each JSONL line holds a "question" plus either "source"/"page" or an
+    "expected" list of {"source", "page"} objects. "page" may be omitted to
+    accept any page of the source.
+
+    Args:
+        path: Path to the JSONL file
+
+    Returns:
+        List of {'question', 'expected'} dictionaries
+    """
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'question' not in record or not (record.get('expected') or record.get('source')):
+                raise ValueError(f"Line {line_num}: expected 'question' and 'source' or 'expected'")
+            expected = record.get('expected') or [{'source': record['source'], 'page': record.get('page')}]
+            questions.append({
+                'question': record['question'],
+                'expected': [(target['source'], target.get('page')) for target in expected]
+            })
+
+    logger.info(f"Loaded {len(questions)} labeled questions from {path}")
+    return questions
+
+
+class RetrievalEvaluator:
+    """Sweep chunking, index and k settings and score retrieval against labels"""
+
+    def __init__(self, embedding_generator, documents: List[Dict[str, any]], questions: List[Dict[str, any]]):
+        """
+        Initialize evaluator
+
+        Args:
+            embedding_generator: EmbeddingGenerator shared by all configurations
+            documents: Page documents from PDFLoader.load_pdfs
+            questions: Labeled questions from load_questions
+        """
+        self.embedding_generator = embedding_generator
+        self.documents = documents
+        self.questions = questions
+        self._query_embeddings = None
+
+    def run(
+        self,
+        chunk_sizes: Iterable[int] = (1000,),
+        chunk_overlaps: Iterable[int] = (200,),
+        index_types: Iterable[str] = ("flat",),
+        ks: Iterable[int] = (5,)
+    ) -> List[Dict[str, any]]:
+        """
+        Evaluate every configuration in the sweep grid
+
+        Chunk embeddings are computed once per chunking setting and each index is
+        searched once at the largest k, so the sweep costs one embedding pass per
+        chunking setting rather than per grid point. Memory is reported as the RSS
+        growth sampled while a configuration chunks, embeds, builds and searches,
+        above the RSS its chunking setting started from; the process-wide peak
+        would only report the largest configuration seen so far.
+
+        Args:
+            chunk_sizes: DocumentChunker chunk_size values
+            chunk_overlaps: DocumentChunker chunk_overlap values
+            index_types: VectorStore index types
+            ks: Retrieval depths to score
+
+        Returns:
+            One result dictionary per (chunk_size, chunk_overlap, index_type, k)
+        """
+        ks = sorted(set(ks))
+        query_embeddings, query_seconds = self._embed_questions()
+        results = []
+
+        for chunk_size, chunk_overlap in itertools.product(chunk_sizes, chunk_overlaps):
+            if chunk_overlap >= chunk_size:
+                logger.warning(f"Skipping chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+                continue
+
+            with RssSampler() as chunk_rss:
+                chunks = DocumentChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap).chunk_documents(self.documents)
+                start = time.perf_counter()
+                embeddings = self.embedding_generator.generate_embeddings([chunk['text'] for chunk in chunks])
+                embed_seconds = time.perf_counter() - start
+
+            for index_type in index_types:
+                # Release the previous index so it does not count towards this one
+                store = None
+                with RssSampler() as index_rss:
+                    store = VectorStore(self.embedding_generator.embedding_dim, index_type)
+                    start = time.perf_counter()
+                    store.build_index(embeddings, chunks)
+                    build_seconds = time.perf_counter() - start
+
+                    indices, latencies = self._search_all(store, query_embeddings, ks[-1])
+                    index_bytes = faiss.serialize_index(store.index).nbytes
+                rss_growth = max(chunk_rss.peak_bytes, index_rss.peak_bytes) - chunk_rss.start_bytes
+
+                for k in ks:
+                    metrics = self._score(store.chunks, indices[:, :k], k)
+                    results.append({
+                        'chunk_size': chunk_size,
+                        'chunk_overlap': chunk_overlap,
+                        'index_type': index_type,
+                        'k': k,
+                        'num_chunks': len(chunks),
+                        **metrics,
+                        'chunk_embed_s': round(embed_seconds, 3),
+                        'index_build_s': round(build_seconds, 4),
+                        'query_embed_ms': round(query_seconds * 1000 / max(1, len(self.questions)), 3),
+                        'search_p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+                        'search_p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3),
+                        'index_mb': round(index_bytes / 1024 / 1024, 3),
+                        'rss_growth_mb': round(rss_growth / 1024 / 1024, 1)
+                    })
+
+                logger.info(
+                    f"Evaluated chunk_size={chunk_size} overlap={chunk_overlap} index={index_type}"
+                )
+
+        return results
+
+    def _embed_questions(self) -> Tuple[np.ndarray, float]:
+        """Embed all questions in one batch (reused across the sweep)"""
+        if self._query_embeddings is None:
+            start = time.perf_counter()
+            embeddings = self.embedding_generator.generate_embeddings([q['question'] for q in self.questions])
+            self._query_embeddings = (np.asarray(embeddings, dtype=np.float32), time.perf_counter() - start)
+        return self._query_embeddings
+
+    def _search_all(self, store: VectorStore, query_embeddings: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched search for quality metrics plus per-query searches for latency percentiles"""
+        indices, _ = store.search_ids_batch(query_embeddings, k)
+
+        latencies = np.empty(len(query_embeddings))
+        for i, query in enumerate(query_embeddings):
+            start = time.perf_counter()
+            store.search_ids(query, k)
+            latencies[i] = time.perf_counter() - start
+
+        return indices, latencies
+
+    def _score(self, chunks: List[Dict[str, any]], indices: np.ndarray, k: int) -> Dict[str, float]:
+        """Recall@k, MRR and nDCG@k with binary relevance per expected (source, page)"""
+        recall_total = 0.0
+        mrr_total = 0.0
+        ndcg_total = 0.0
+
+        for question, row in zip(self.questions, indices):
+            targets = question['expected']
+            found = set()
+            first_rank = None
+            dcg = 0.0
+
+            for rank, idx in enumerate(row, 1):
+                if idx < 0:
+                    continue
+                chunk = chunks[idx]
+                for target in targets:
+                    source, page = target
+                    if chunk['source'] == source and (page is None or chunk['page'] == page):
+                        if first_rank is None:
+                            first_rank = rank
+                        # Each expected target earns gain once, however many of its chunks are retrieved
+                        if target not in found:
+                            found.add(target)
+                            dcg += 1.0 / math.log2(rank + 1)
+                        break
+
+            ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(targets), k) + 1))
+            recall_total += len(found) / len(targets)
+            mrr_total += 1.0 / first_rank if first_rank else 0.0
+            ndcg_total += dcg / ideal if ideal else 0.0
+
+        n = max(1, len(self.questions))
+        return {
+            'recall': round(recall_total / n, 4),
+            'mrr': round(mrr_total / n, 4),
+            'ndcg': round(ndcg_total / n, 4)
+        }
+
+
+def format_results(results: List[Dict[str, any]]) -> str:
+    """Render sweep results as a fixed-width table"""
+    columns = [
+        'chunk_size', 'chunk_overlap', 'index_type', 'k', 'num_chunks', 'recall', 'mrr', 'ndcg',
+        'chunk_embed_s', 'search_p50_ms', 'search_p95_ms', 'index_mb', 'rss_growth_mb'
+    ]
+    widths = {col: max(len(col), *(len(str(r[col])) for r in results)) if results else len(col) for col in columns}
+
+    lines = [
+        "  ".join(col.rjust(widths[col]) for col in columns),
+        "  ".join("-" * widths[col] for col in columns)
+    ]
+    for result in results:
+        lines.append("  ".join(str(result[col]).rjust(widths[col]) for col in columns))
+    return "\n".join(lines)
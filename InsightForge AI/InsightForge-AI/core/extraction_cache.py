@@ -0,0 +1,281 @@
+"""
+Extraction Cache Module
+On-disk cache of extracted PDF page text keyed by content hash
+"""
+
+from typing import List, Dict, Optional
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1 << 20
+# Bumped whenever hash_page changes, so entries keyed by an older scheme are never served
+_PAGE_HASH_VERSION = b'page-v2'
+_REFERENCE = re.compile(r'\b(\d+) \d+ R\b')
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of raw page text, shared across uploads"""
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 256 * 1024 * 1024, max_files: int = 10000):
+        """
+        Initialize cache database
+
+        Args:
+            cache_dir: Directory for the cache database (defaults to the system temp dir)
+            max_bytes: Maximum total size of cached page text before LRU eviction
+            max_files: Maximum number of file manifests kept
+        """
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "insightforge_extraction_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "pages.sqlite3"),
+            check_same_thread=False,
+            timeout=30
+        )
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS pages (
+                page_hash TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                file_hash TEXT PRIMARY KEY,
+                page_hashes TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_lru ON pages (last_access);
+            CREATE INDEX IF NOT EXISTS files_lru ON files (last_access);
+        """)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        logger.info(f"Extraction cache at {self.cache_dir}")
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """Content hash of a file on disk"""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_buffer(data) -> str:
+        """Content hash of an in-memory PDF (bytes, memoryview or mmap), without copying it"""
+        digest = hashlib.blake2b(digest_size=20)
+        view = memoryview(data)
+        for start in range(0, len(view), _CHUNK_SIZE):
+            digest.update(view[start:start + _CHUNK_SIZE])
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_page(page) -> str:
+        """
+        Content hash of a PyMuPDF page
+
+        Covers the content stream, the geometry and every object reachable from the
+        page's resources (fonts with their ToUnicode maps, Form XObjects and the
+        resources they draw in turn). Object numbers are replaced by their visit order,
+        so the same page hashes the same in any file.
+        """
+        doc = page.parent
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(_PAGE_HASH_VERSION)
+        digest.update(page.read_contents())
+        digest.update(repr(tuple(page.rect)).encode('utf-8'))
+
+        # Resources may be inherited from the page tree
+        node = page.xref
+        kind, value = doc.xref_get_key(node, "Resources")
+        while kind == 'null':
+            kind, parent = doc.xref_get_key(node, "Parent")
+            if kind != 'xref':
+                break
+            node = int(parent.split()[0])
+            kind, value = doc.xref_get_key(node, "Resources")
+
+        order = {}
+        pending = []
+
+        def canonical(source: str) -> str:
+            """Replace indirect references by visit order, queueing unseen objects"""
+            def number(match):
+                xref = int(match.group(1))
+                if xref not in order:
+                    order[xref] = len(order)
+                    pending.append(xref)
+                return f"@{order[xref]}"
+            return _REFERENCE.sub(number, source)
+
+        digest.update(canonical(value).encode('utf-8'))
+        while pending:
+            xref = pending.pop(0)
+            if doc.xref_get_key(xref, "Type")[1] in ('/Page', '/Pages'):
+                # A back-reference into the page tree; its content is not drawn by this page
+                digest.update(b'<page>')
+                continue
+            digest.update(canonical(doc.xref_object(xref, compressed=True)).encode('utf-8'))
+            if doc.xref_is_stream(xref) and doc.xref_get_key(xref, "Subtype")[1] != '/Image':
+                digest.update(doc.xref_stream_raw(xref) or b'')
+        return digest.hexdigest()
+
+    def get_file(self, file_hash: str) -> Optional[List[str]]:
+        """
+        Look up every page of a previously seen file
+
+        Args:
+            file_hash: Content hash from hash_file
+
+        Returns:
+            Raw page texts in page order, or None if the file (or any of its pages) is not cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_hashes FROM files WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            page_hashes = json.loads(row[0])
+            texts = self._fetch_pages(page_hashes)
+            if texts is None:
+                # Some pages were evicted; fall back to per-page lookups
+                self._conn.execute("DELETE FROM files WHERE file_hash = ?", (file_hash,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            now = time.time()
+            self._conn.execute("UPDATE files SET last_access = ? WHERE file_hash = ?", (now, file_hash))
+            self._conn.executemany(
+                "UPDATE pages SET last_access = ? WHERE page_hash = ?",
+                [(now, page_hash) for page_hash in set(page_hashes)]
+            )
+            self._conn.commit()
+            self.hits += 1
+            return texts
+
+    def put_file(self, file_hash: str, page_hashes: List[str]):
+        """Record which page hashes make up a file"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (file_hash, page_hashes, last_access) VALUES (?, ?, ?)",
+                (file_hash, json.dumps(page_hashes), time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM files WHERE file_hash IN ("
+                "SELECT file_hash FROM files ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_files,)
+            )
+            self._conn.commit()
+
+    def get_page(self, page_hash: str) -> Optional[str]:
+        """Raw text of a cached page, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM pages WHERE page_hash = ?", (page_hash,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE pages SET last_access = ? WHERE page_hash = ?", (time.time(), page_hash)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put_page(self, page_hash: str, text: str):
+        """Store raw page text and evict least recently used pages beyond max_bytes"""
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM pages WHERE page_hash = ?", (page_hash,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (page_hash, text, size, last_access) VALUES (?, ?, ?, ?)",
+                (page_hash, text, size, time.time())
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, any]:
+        """Get cache statistics"""
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            'files': files,
+            'pages': pages,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0
+        }
+
+    def _fetch_pages(self, page_hashes: List[str]) -> Optional[List[str]]:
+        """Texts for the given page hashes, or None if any is missing"""
+        unique = list(set(page_hashes))
+        texts = {}
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            texts.update(self._conn.execute(
+                f"SELECT page_hash, text FROM pages WHERE page_hash IN ({placeholders})", batch
+            ).fetchall())
+
+        if len(texts) != len(unique):
+            return None
+        return [texts[page_hash] for page_hash in page_hashes]
+
+    def _evict(self):
+        """Drop least recently used pages until the cache fits in max_bytes"""
+        evicted = 0
+        while self._total_bytes > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT page_hash, size FROM pages ORDER BY last_access ASC LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+
+            for page_hash, size in oldest:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM pages WHERE page_hash = ?", (page_hash,))
+                self._total_bytes -= size
+                evicted += 1
+
+        if evicted:
+            logger.info(f"Evicted {evicted} pages from extraction cache")
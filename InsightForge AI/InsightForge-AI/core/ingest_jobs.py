@@ -0,0 +1,401 @@
+"""
+Ingest Jobs Module
+Background document ingestion in a worker process with progress, cancellation and atomic index swaps
+"""
+
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from typing import List, Dict, Optional, Callable
+import multiprocessing
+import itertools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import logging
+
+import numpy as np
+
+from utils.diagnostics import StageProfiler
+
+from .pdf_loader import PDFLoader
+from .deduplication import PageDeduplicator
+from .extraction_cache import ExtractionCache
+from .chunking import DocumentChunker, ParentChildChunker
+from .embeddings import EmbeddingGenerator
+from .vector_store import VectorStore
+from .sharded_store import ShardedVectorStore
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "chunk", "embed", "index")
+
+# Per-process cache so a worker loads the embedding model once, not once per job
+_worker_embedders = {}
+
+
+class IngestCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled"""
+
+
+def _run_ingest_job(
+    job_id: str,
+    paths: List[str],
+    settings: Dict[str, any],
+    output_dir: str,
+    progress,
+    cancelled
+) -> Dict[str, any]:
+    """
+    Worker-process entry point: extract, chunk, embed and index one batch of PDFs
+
+    Args:
+        job_id: Job identifier used in progress messages
+        paths: PDF file paths
+        settings: Ingest settings (see IngestJobManager)
+        output_dir: Directory the finished index is written to
+        progress: Queue receiving (job_id, stage, fraction) tuples
+        cancelled: Shared dict whose keys are cancelled job ids
+
+    Returns:
+        Index location, extraction/dedup/chunking statistics and per-stage CPU and memory
+    """
+    def report(stage, fraction):
+        if job_id in cancelled:
+            raise IngestCancelled(job_id)
+        progress.put((job_id, stage, fraction))
+
+    report("extract", 0.0)
+    profiler = StageProfiler()
+    loader = PDFLoader(
+        deduplicator=PageDeduplicator(),
+        extraction_cache=ExtractionCache(
+            cache_dir=settings.get('extraction_cache_dir'),
+            max_bytes=settings.get('extraction_cache_bytes', 256 * 1024 * 1024)
+        )
+    )
+    with profiler.stage("extract"):
+        documents = loader.load_pdfs(paths)
+    if not documents:
+        raise ValueError("No content extracted from PDFs")
+
+    report("chunk", 0.0)
+    parents = None
+    if settings.get('parent_windows'):
+        # Small children are embedded and indexed; answers are built from their parent windows
+        chunker = ParentChildChunker(
+            child_size=settings.get('child_chunk_size', 300),
+            child_overlap=settings.get('child_chunk_overlap', 50),
+            parent_size=settings.get('parent_window_size', 2000)
+        )
+        with profiler.stage("chunk"):
+            chunks, parents = chunker.chunk_documents(documents)
+    else:
+        chunker = DocumentChunker(
+            chunk_size=settings.get('chunk_size', 1000),
+            chunk_overlap=settings.get('chunk_overlap', 200)
+        )
+        with profiler.stage("chunk"):
+            chunks = chunker.chunk_documents(documents)
+    if not chunks:
+        raise ValueError("Failed to create document chunks")
+
+    memory = {'documents_bytes': loader.get_memory_usage()['documents_bytes']}
+    if settings.get('release_documents', True):
+        # Chunks carry everything later stages need; free page text before embedding
+        del documents
+        loader.release_documents()
+
+    model_name = settings.get('embedding_model', "all-MiniLM-L6-v2")
+    if model_name not in _worker_embedders:
+        with profiler.stage("load_model"):
+            _worker_embedders[model_name] = EmbeddingGenerator(model_name)
+    embedder = _worker_embedders[model_name]
+    memory.update(embedder.get_memory_usage())
+
+    # Embed in batches so progress is reported and cancellation is honoured mid-stage
+    batch_size = settings.get('embed_batch_size', 256)
+    batches = []
+    with profiler.stage("embed"):
+        for start in range(0, len(chunks), batch_size):
+            report("embed", start / len(chunks))
+            batches.append(embedder.generate_embeddings([chunk['text'] for chunk in chunks[start:start + batch_size]]))
+        embeddings = batches[0] if len(batches) == 1 else np.concatenate(batches)
+
+    report("index", 0.0)
+    num_shards = settings.get('num_shards', 1)
+    with profiler.stage("index"):
+        if num_shards > 1:
+            store = ShardedVectorStore(
+                embedder.embedding_dim,
+                num_shards=num_shards,
+                partition="source",
+                storage_dir=output_dir
+            )
+            store.build_index(embeddings, chunks, parents)
+        else:
+            store = VectorStore(embedder.embedding_dim, settings.get('index_type', "flat"))
+            store.build_index(embeddings, chunks, parents)
+            store.save(output_dir)
+    memory.update(store.get_memory_usage())
+    report("index", 1.0)
+
+    return {
+        'output_dir': output_dir,
+        'sharded': num_shards > 1,
+        'doc_stats': loader.get_summary_stats(),
+        'dedup_stats': dict(loader.deduplicator.stats),
+        'chunk_stats': chunker.get_chunking_stats(chunks, parents) if parents else chunker.get_chunking_stats(chunks),
+        'worker': {'pid': os.getpid(), **profiler.summary(), 'memory': memory}
+    }
+
+
+class IngestJob:
+    """State of one ingest request"""
+
+    def __init__(self, job_id: str, seq: int, paths: List[str]):
+        self.job_id = job_id
+        self.seq = seq
+        self.paths = paths
+        self.status = "queued"  # queued -> running -> done | failed | cancelled
+        self.stage = None
+        self.progress = 0.0
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, any]:
+        """Snapshot for display"""
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.job_id,
+            'files': [os.path.basename(path) for path in self.paths],
+            'status': self.status,
+            'stage': self.stage,
+            'progress': round(self.progress, 3),
+            'error': self.error,
+            'elapsed_s': round(end - (self.started_at or self.created_at), 1),
+            'result': self.result
+        }
+
+
+class IngestJobManager:
+    """Run ingest jobs in a separate process and swap finished indexes in atomically"""
+
+    def __init__(
+        self,
+        settings: Dict[str, any] = None,
+        output_dir: str = None,
+        max_workers: int = 1,
+        on_complete: Callable = None
+    ):
+        """
+        Initialize job manager
+
+        Args:
+            settings: Ingest settings passed to workers: chunk_size, chunk_overlap, embedding_model,
+                embed_batch_size, index_type, num_shards, extraction_cache_dir, extraction_cache_bytes,
+                release_documents (free page text once chunked, default True), parent_windows
+                (index small child chunks and keep page-level parents), child_chunk_size,
+                child_chunk_overlap, parent_window_size
+            output_dir: Root directory for built indexes (defaults to a temp directory)
+            max_workers: Worker processes; further jobs wait in the queue
+            on_complete: Called as on_complete(store, job) with the loaded index of the newest finished job
+        """
+        self.settings = dict(settings or {})
+        self.output_dir = output_dir or tempfile.mkdtemp(prefix="insightforge_ingest_")
+        self.max_workers = max_workers
+        self.on_complete = on_complete
+
+        self.jobs: Dict[str, IngestJob] = {}
+        self._seq = itertools.count(1)
+        self._active_seq = 0
+        self._active_dir = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._cancelled = None
+        self._listener = None
+
+    def submit(self, paths: List[str]) -> str:
+        """
+        Queue a batch of PDFs for ingestion
+
+        Args:
+            paths: PDF file paths
+
+        Returns:
+            Job id
+        """
+        self._ensure_started()
+        job = IngestJob(uuid.uuid4().hex[:8], next(self._seq), list(paths))
+        output_dir = os.path.join(self.output_dir, f"job_{job.seq:05d}_{job.job_id}")
+
+        with self._lock:
+            self.jobs[job.job_id] = job
+        job.future = self._executor.submit(
+            _run_ingest_job, job.job_id, job.paths, self.settings, output_dir, self._progress, self._cancelled
+        )
+        job.future.add_done_callback(lambda future, job=job: self._finish(job, future))
+
+        logger.info(f"Queued ingest job {job.job_id} with {len(paths)} files")
+        return job.job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if the job was still cancellable
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return False
+
+        # Running jobs notice the flag at their next progress report
+        self._cancelled[job_id] = True
+        if job.future.cancel():
+            self._mark(job, "cancelled")
+        logger.info(f"Cancellation requested for ingest job {job_id}")
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, any]]:
+        """Snapshot of one job"""
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list_jobs(self) -> List[Dict[str, any]]:
+        """Snapshots of all jobs, newest first"""
+        with self._lock:
+            jobs = sorted(self.jobs.values(), key=lambda job: job.seq, reverse=True)
+        return [job.to_dict() for job in jobs]
+
+    def active_jobs(self) -> List[str]:
+        """Ids of queued or running jobs"""
+        with self._lock:
+            return [job.job_id for job in self.jobs.values() if not job.is_finished]
+
+    def shutdown(self):
+        """Cancel pending work and stop the worker pool"""
+        for job_id in self.active_jobs():
+            self.cancel(job_id)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._progress.put(None)
+            self._listener.join(timeout=5)
+            self._manager.shutdown()
+            self._manager = None
+
+    def _ensure_started(self):
+        """Start the worker pool, shared state and progress listener on first use"""
+        if self._executor is not None:
+            return
+
+        # Spawn keeps torch/FAISS state of the parent out of the workers
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._progress = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        """Apply worker progress messages to job state"""
+        while True:
+            try:
+                message = self._progress.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+
+            job_id, stage, fraction = message
+            job = self.jobs.get(job_id)
+            if job is None or job.is_finished:
+                continue
+            with self._lock:
+                if job.status == "queued":
+                    job.status = "running"
+                    job.started_at = time.time()
+                job.stage = stage
+                job.progress = (STAGES.index(stage) + fraction) / len(STAGES)
+
+    def _finish(self, job: IngestJob, future):
+        """Record the outcome and swap in the new index if it is the newest one built"""
+        try:
+            result = future.result()
+        except (CancelledError, IngestCancelled):
+            self._mark(job, "cancelled")
+            return
+        except Exception as e:
+            if job.job_id in self._cancelled:
+                self._mark(job, "cancelled")
+                return
+            logger.error(f"Error in ingest job {job.job_id}: {str(e)}")
+            self._mark(job, "failed", error=str(e))
+            return
+
+        try:
+            store = self._load_store(result)
+        except Exception as e:
+            logger.error(f"Error loading index of ingest job {job.job_id}: {str(e)}")
+            self._mark(job, "failed", error=str(e))
+            return
+
+        with self._lock:
+            # A slower, older job must not replace an index built from a newer upload
+            superseded = job.seq < self._active_seq
+            if not superseded:
+                self._active_seq = job.seq
+                previous_dir, self._active_dir = self._active_dir, result['output_dir']
+
+        if superseded:
+            logger.info(f"Ingest job {job.job_id} finished after a newer job; discarding its index")
+            shutil.rmtree(result['output_dir'], ignore_errors=True)
+            self._mark(job, "done", result=result)
+            return
+
+        # Readers of the swapped-in job see its result as soon as the index is live
+        with self._lock:
+            job.result = result
+        if self.on_complete is not None:
+            self.on_complete(store, job)
+        if previous_dir:
+            shutil.rmtree(previous_dir, ignore_errors=True)
+
+        self._mark(job, "done", result=result)
+        logger.info(f"Ingest job {job.job_id} complete; index swapped in")
+
+    def _load_store(self, result: Dict[str, any]):
+        """Load the index a worker wrote to disk"""
+        if result['sharded']:
+            return ShardedVectorStore.load(result['output_dir'])
+        return VectorStore.load(result['output_dir'])
+
+    def _mark(self, job: IngestJob, status: str, error: str = None, result: Dict[str, any] = None):
+        with self._lock:
+            job.status = status
+            job.error = error
+            job.result = result
+            job.finished_at = time.time()
+            if status == "done":
+                job.stage = STAGES[-1]
+                job.progress = 1.0
@@ -0,0 +1,203 @@
+"""
+LLM Client Module
+Pooled Groq client with deadlines, jittered retries and request hedging
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+from typing import Dict, Optional
+import random
+import threading
+import time
+import logging
+
+import groq
+import httpx
+import numpy as np
+from groq import Groq
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call cannot complete within its deadline"""
+
+
+class LLMClient:
+    """Shared-connection Groq client with retry, backoff and hedging policies"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = None,
+        max_connections: int = 32,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200
+    ):
+        """
+        Initialize client
+
+        Args:
+            api_key: Groq API key
+            base_url: Override API endpoint (e.g. the local fake server)
+            max_connections: Size of the shared HTTP connection pool
+            timeout: Default per-call deadline in seconds, covering all retries
+            max_retries: Retries after the first attempt on 429/5xx/connection errors
+            backoff_base: Base delay for exponential backoff in seconds
+            backoff_max: Upper bound on a single backoff delay in seconds
+            hedge_percentile: Send a second request once the first is slower than this
+                latency percentile (e.g. 95); None disables hedging
+            hedge_min_samples: Latency samples needed before hedging starts
+            latency_window: Number of recent call latencies kept for the percentile
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self._http = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=min(5.0, timeout))
+        )
+        # Retries are handled here, so the SDK's own retry loop is disabled
+        self.client = Groq(api_key=api_key, base_url=base_url, http_client=self._http, max_retries=0)
+
+        self._latencies = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        # Every hedged call can hold a primary and a backup request at once
+        self._hedge_pool = ThreadPoolExecutor(max_workers=2 * max_connections) if hedge_percentile else None
+        self.stats = {'calls': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'failures': 0}
+
+    def chat(self, deadline: float = None, **kwargs):
+        """
+        Create a chat completion
+
+        Args:
+            deadline: Seconds allowed for the whole call, including retries (defaults to timeout)
+            **kwargs: Arguments for chat.completions.create (model, messages, ...)
+
+        Returns:
+            ChatCompletion response
+        """
+        expires_at = time.monotonic() + (deadline or self.timeout)
+        self._bump('calls')
+
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is None:
+                return self._call_with_retries(expires_at, kwargs)
+            return self._call_hedged(expires_at, hedge_delay, kwargs)
+        except Exception:
+            self._bump('failures')
+            raise
+
+    def get_stats(self) -> Dict[str, any]:
+        """Get call, retry and latency statistics"""
+        with self._lock:
+            latencies = list(self._latencies)
+            stats = dict(self.stats)
+
+        if latencies:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            stats.update({
+                'p50_ms': round(p50 * 1000, 1),
+                'p95_ms': round(p95 * 1000, 1),
+                'p99_ms': round(p99 * 1000, 1)
+            })
+        return stats
+
+    def close(self):
+        """Release pooled connections and hedge workers"""
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self._http.close()
+
+    def _call_with_retries(self, expires_at: float, kwargs: Dict[str, any]):
+        """One logical call: retry retryable failures with jittered backoff until the deadline"""
+        for attempt in range(self.max_retries + 1):
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("LLM call deadline exceeded")
+
+            start = time.monotonic()
+            try:
+                response = self.client.chat.completions.create(timeout=remaining, **kwargs)
+                self._record_latency(time.monotonic() - start)
+                return response
+
+            except (groq.RateLimitError, groq.InternalServerError,
+                    groq.APIConnectionError, groq.APITimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+
+                delay = self._backoff(attempt, e)
+                if time.monotonic() + delay >= expires_at:
+                    raise DeadlineExceeded(f"LLM call deadline exceeded after {attempt + 1} attempts") from e
+
+                logger.warning(f"LLM call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+                self._bump('retries')
+                time.sleep(delay)
+
+    def _call_hedged(self, expires_at: float, hedge_delay: float, kwargs: Dict[str, any]):
+        """Start a backup request if the primary is slower than the hedge delay; return the first success"""
+        primary = self._hedge_pool.submit(self._call_with_retries, expires_at, kwargs)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self._bump('hedges')
+        backup = self._hedge_pool.submit(self._call_with_retries, expires_at, kwargs)
+        pending = {primary, backup}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires_at - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._bump('hedge_wins')
+                    return future.result()
+                error = future.exception()
+
+        if error is not None:
+            raise error
+        raise DeadlineExceeded("LLM call deadline exceeded (hedged)")
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Current hedge trigger latency, or None while hedging is off or warming up"""
+        if not self.hedge_percentile:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.hedge_percentile))
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends it"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _bump(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
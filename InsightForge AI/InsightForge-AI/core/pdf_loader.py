@@ -4,64 +4,239 @@ Handles PDF document processing with page-level tracking
 """
 
 import fitz  # PyMuPDF
-from typing import List, Dict, Tuple
+from pathlib import PureWindowsPath
+from typing import List, Dict, Tuple, Iterator, Optional
+import glob
+import hashlib
+import mmap
+import os
 import logging
 
+from utils.diagnostics import deep_sizeof
+
 logger = logging.getLogger(__name__)
 
+# In-memory PDF inputs opened with fitz.open(stream=...) instead of a path
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
 
 class PDFLoader:
     """Enterprise-grade PDF document loader with metadata preservation"""
     
-    def __init__(self):
+    def __init__(self, deduplicator=None, extraction_cache=None):
+        """
+        Initialize loader
+        
+        Args:
+            deduplicator: Optional PageDeduplicator applied across each batch before cleaning
+            extraction_cache: Optional ExtractionCache so previously seen pages skip PyMuPDF
+        """
         self.documents = []
+        self._released_stats = None
+        self.deduplicator = deduplicator
+        self.extraction_cache = extraction_cache
         
     def load_pdfs(self, pdf_files: List) -> List[Dict[str, any]]:
         """
         Load multiple PDF files and extract text with page numbers
         
         Args:
-            pdf_files: List of file objects from Gradio
+            pdf_files: Gradio file objects, paths, directories, glob patterns, in-memory buffers
+                (bytes, memoryview, mmap) or (filename, buffer) tuples - see expand_sources
             
         Returns:
             List of document dictionaries with text, page numbers, and metadata
         """
-        all_documents = []
+        raw_pages = []
         
-        for pdf_file in pdf_files:
+        for filename, source in self.expand_sources(pdf_files):
             try:
-                # Open PDF with PyMuPDF
-                doc = fitz.open(pdf_file.name)
-                filename = pdf_file.name.split('/')[-1]
+                page_texts = self._extract_pages(source)
                 
-                logger.info(f"Processing {filename}: {len(doc)} pages")
+                logger.info(f"Processing {filename}: {len(page_texts)} pages")
                 
-                # Extract text from each page
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    text = page.get_text()
-                    
-                    # Clean and normalize text
-                    text = self._clean_text(text)
-                    
-                    if text.strip():  # Only add non-empty pages
-                        all_documents.append({
-                            'text': text,
-                            'page': page_num + 1,
-                            'source': filename,
-                            'total_pages': len(doc)
-                        })
+                # Keep line structure for deduplication
+                for page_num, page_text in enumerate(page_texts):
+                    raw_pages.append({
+                        'lines': page_text.splitlines(),
+                        'page': page_num + 1,
+                        'source': filename,
+                        'total_pages': len(page_texts)
+                    })
                 
-                doc.close()
                 logger.info(f"Successfully processed {filename}")
                 
             except Exception as e:
-                logger.error(f"Error processing {pdf_file.name}: {str(e)}")
+                logger.error(f"Error processing {filename}: {str(e)}")
                 raise
         
+        # Strip batch-wide boilerplate and drop duplicate pages
+        if self.deduplicator is not None:
+            raw_pages = self.deduplicator.process(raw_pages)
+        
+        all_documents = []
+        for raw_page in raw_pages:
+            # Clean and normalize text
+            text = self._clean_text('\n'.join(raw_page.pop('lines')))
+            
+            if text.strip():  # Only add non-empty pages
+                all_documents.append({'text': text, **raw_page})
+        
         self.documents = all_documents
+        self._released_stats = None
         return all_documents
     
+    def iter_pages(self, pdf_file, page_range: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, any]]:
+        """
+        Stream cleaned pages one at a time without holding the whole document's text
+        
+        Pages are yielded as they are extracted, so huge PDFs can be processed in
+        slices. Batch-wide deduplication does not apply here.
+        
+        Args:
+            pdf_file: Any single input accepted by load_pdfs (a directory or glob streams every match)
+            page_range: Inclusive 1-based (first_page, last_page); None for all pages
+            
+        Yields:
+            Document dictionaries with text, page number, and metadata
+        """
+        for filename, source in self.expand_sources([pdf_file]):
+            with self._open(source) as doc:
+                total_pages = doc.page_count
+                first_page, last_page = page_range or (1, total_pages)
+                
+                for page_num in range(max(1, first_page), min(last_page, total_pages) + 1):
+                    text = self._clean_text(self._page_text(doc.load_page(page_num - 1)))
+                    if text.strip():
+                        yield {
+                            'text': text,
+                            'page': page_num,
+                            'source': filename,
+                            'total_pages': total_pages
+                        }
+    
+    def iter_page_slices(
+        self,
+        pdf_file,
+        slice_size: int = 50,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> Iterator[List[Dict[str, any]]]:
+        """
+        Stream cleaned pages in lists of at most slice_size pages (see iter_pages)
+        
+        Args:
+            pdf_file: Any single input accepted by load_pdfs
+            slice_size: Maximum pages per yielded list
+            page_range: Inclusive 1-based (first_page, last_page); None for all pages
+            
+        Yields:
+            Lists of document dictionaries
+        """
+        batch = []
+        for page in self.iter_pages(pdf_file, page_range):
+            batch.append(page)
+            if len(batch) >= slice_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def expand_sources(self, pdf_files: List) -> List[Tuple[str, any]]:
+        """
+        Resolve loader inputs into (display filename, path or buffer) pairs
+        
+        Accepted inputs:
+            - Gradio file objects (anything with a .name path) and str/PathLike paths
+            - directories (every *.pdf inside, sorted) and glob patterns ("docs/**/*.pdf")
+            - bytes, bytearray, memoryview or mmap buffers (named by content hash)
+            - (filename, buffer) tuples
+        
+        Args:
+            pdf_files: Inputs to resolve
+            
+        Returns:
+            List of (filename, source) tuples
+        """
+        sources = []
+        
+        for item in pdf_files:
+            if isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], BUFFER_TYPES):
+                sources.append((self._display_name(item[0]), item[1]))
+            elif isinstance(item, BUFFER_TYPES):
+                digest = hashlib.blake2b(item, digest_size=4).hexdigest()
+                sources.append((f"document_{digest}.pdf", item))
+            else:
+                path = os.fspath(getattr(item, 'name', item))
+                if os.path.isfile(path):
+                    # Existing files win over glob syntax ("Q3 report [draft].pdf")
+                    matches = [path]
+                elif os.path.isdir(path):
+                    matches = sorted(
+                        entry.path for entry in os.scandir(path)
+                        if entry.is_file() and entry.name.lower().endswith('.pdf')
+                    )
+                elif glob.has_magic(path):
+                    matches = sorted(glob.glob(path, recursive=True))
+                    if not matches:
+                        logger.warning(f"No files match {path}")
+                else:
+                    matches = [path]
+                sources.extend((self._display_name(match), match) for match in matches)
+        
+        return sources
+    
+    @staticmethod
+    def _display_name(path) -> str:
+        """Base filename for citations, for POSIX and Windows separators alike"""
+        return PureWindowsPath(os.fsdecode(path)).name
+    
+    @staticmethod
+    def _open(source):
+        """Open a path, or a buffer in place via a memoryview (mmap'd files are never copied)"""
+        if isinstance(source, BUFFER_TYPES):
+            return fitz.open(stream=memoryview(source), filetype="pdf")
+        return fitz.open(source)
+    
+    def _extract_pages(self, source) -> List[str]:
+        """Extract raw text of every page, reusing cached pages where the content hash matches"""
+        cache = self.extraction_cache
+        
+        if cache is None:
+            with self._open(source) as doc:
+                return [page.get_text() for page in doc]
+        
+        # Unchanged file: skip PyMuPDF entirely
+        file_hash = cache.hash_buffer(source) if isinstance(source, BUFFER_TYPES) else cache.hash_file(source)
+        page_texts = cache.get_file(file_hash)
+        if page_texts is not None:
+            logger.info(f"Extraction cache hit for {file_hash}")
+            return page_texts
+        
+        # New or changed file: only re-extract pages whose content hash is unknown
+        page_texts = []
+        page_hashes = []
+        with self._open(source) as doc:
+            for page in doc:
+                page_hash = cache.hash_page(page)
+                page_texts.append(self._page_text(page, page_hash))
+                page_hashes.append(page_hash)
+        
+        cache.put_file(file_hash, page_hashes)
+        return page_texts
+    
+    def _page_text(self, page, page_hash: str = None) -> str:
+        """Raw text of one page, through the extraction cache when configured"""
+        cache = self.extraction_cache
+        if cache is None:
+            return page.get_text()
+        
+        page_hash = page_hash or cache.hash_page(page)
+        text = cache.get_page(page_hash)
+        if text is None:
+            text = page.get_text()
+            cache.put_page(page_hash, text)
+        return text
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         # Remove excessive whitespace
@@ -70,10 +245,21 @@ class PDFLoader:
         text = text.replace('\x00', '')
         return text
     
+    def release_documents(self):
+        """Drop page text kept after load_pdfs (summary statistics stay available)"""
+        if self.documents:
+            self._released_stats = self.get_summary_stats()
+        self.documents = []
+        logger.info("Released loaded page text")
+    
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Estimated bytes held by loaded page text and metadata"""
+        return {'documents_bytes': deep_sizeof(self.documents)}
+    
     def get_summary_stats(self) -> Dict[str, any]:
         """Get statistics about loaded documents"""
         if not self.documents:
-            return {}
+            return self._released_stats or {}
         
         sources = set(doc['source'] for doc in self.documents)
         total_pages = sum(doc['total_pages'] for doc in self.documents if 'total_pages' in doc)
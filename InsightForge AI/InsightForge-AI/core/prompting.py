@@ -0,0 +1,180 @@
+"""
+Prompting Module
+Prompt assembly from precomputed context blocks with a token budget
+"""
+
+from typing import List, Dict, Tuple, Callable
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPTS = {
+    'executive': """You are InsightForge AI, an elite business intelligence assistant.
+
+Your role:
+- Provide clear, actionable insights for decision-makers
+- Focus on strategic implications and key takeaways
+- Use business language, avoid unnecessary jargon
+- Be concise and impactful
+
+Guidelines:
+- Always cite sources with [Source: filename, Page X] format
+- Synthesize information across documents when relevant
+- Highlight contradictions or uncertainties
+- Provide confidence levels when appropriate""",
+    'technical': """You are InsightForge AI, an expert technical analyst.
+
+Your role:
+- Provide detailed, technically accurate information
+- Include relevant methodologies and data
+- Explain technical concepts thoroughly
+- Reference specific sections and details
+
+Guidelines:
+- Always cite sources with [Source: filename, Page X] format
+- Include relevant technical details and specifications
+- Note limitations or gaps in the data
+- Cross-reference related information"""
+}
+
+_MODE_INSTRUCTIONS = {
+    'executive': 'Focus on strategic insights and business implications',
+    'technical': 'Provide comprehensive technical details'
+}
+
+# The user prompt is "Question: ...", the context blocks, then a per-mode footer
+USER_PROMPT_HEADER = "Question: "
+USER_PROMPT_CONTEXT = "\n\nContext from documents:\n"
+USER_PROMPT_FOOTERS = {
+    mode: f"""
+Instructions:
+- Answer the question based ONLY on the provided context
+- Cite specific sources using [Source: filename, Page X] format
+- If the context doesn't contain relevant information, state this clearly
+- {instruction}
+- Be precise and evidence-based
+
+Answer:"""
+    for mode, instruction in _MODE_INSTRUCTIONS.items()
+}
+
+# Context numbering labels, built once
+_CONTEXT_LABELS = [f"[Context {i}" for i in range(1, 257)]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count (~4 characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+
+class PromptAssembler:
+    """Assemble answer prompts from per-chunk blocks prepared once at index time"""
+
+    def __init__(self, max_context_tokens: int = 6000, count_tokens: Callable[[str], int] = None):
+        """
+        Initialize assembler
+
+        Args:
+            max_context_tokens: Budget for context blocks; lower-ranked chunks beyond it are dropped
+            count_tokens: Token counter (defaults to estimate_tokens); e.g. a tokenizer's
+                lambda text: len(tokenizer.encode(text))
+        """
+        self.max_context_tokens = max_context_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+        # Static parts are counted once
+        self.system_tokens = {mode: self.count_tokens(prompt) for mode, prompt in SYSTEM_PROMPTS.items()}
+        self.footer_tokens = {mode: self.count_tokens(footer) for mode, footer in USER_PROMPT_FOOTERS.items()}
+
+    def prepare(self, chunks: List[Dict[str, any]]):
+        """
+        Precompute the context header, preview and token count of each chunk
+
+        Call after building or swapping an index with the chunks (or parent windows)
+        that can reach the prompt. Text is referenced, not copied.
+
+        Args:
+            chunks: Chunk dictionaries with text, source, page and chunk_id
+        """
+        blocks = {chunk['chunk_id']: self._make_block(chunk) for chunk in chunks}
+        with self._lock:
+            self._blocks = blocks
+        logger.info(f"Prepared prompt blocks for {len(blocks)} chunks")
+
+    def build_messages(
+        self,
+        question: str,
+        retrieved_chunks: List[Tuple[Dict[str, any], float]],
+        mode: str = "executive",
+        conversation_history: List[Dict[str, str]] = None
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, any]], Dict[str, int]]:
+        """
+        Build chat messages and source citations for a question
+
+        Args:
+            question: User question
+            retrieved_chunks: (chunk, score) tuples in rank order
+            mode: "executive" or "technical"
+            conversation_history: Previous conversation turns
+
+        Returns:
+            Tuple of (messages, source_citations, usage) where usage reports
+            context_tokens, prompt_tokens and dropped_chunks
+        """
+        mode = mode if mode in SYSTEM_PROMPTS else "technical"
+        parts = [USER_PROMPT_HEADER, question, USER_PROMPT_CONTEXT]
+        sources = []
+        context_tokens = 0
+        dropped = 0
+        blocks = self._blocks
+
+        for chunk, score in retrieved_chunks:
+            block = blocks.get(chunk.get('chunk_id'))
+            if block is None:
+                # Not seen at index time (e.g. an older index still serving a query)
+                block = self._make_block(chunk)
+            header, preview, tokens = block
+            if context_tokens + tokens > self.max_context_tokens and sources:
+                dropped += 1
+                continue
+
+            context_tokens += tokens
+            n = len(sources)
+            parts.append(_CONTEXT_LABELS[n] if n < len(_CONTEXT_LABELS) else f"[Context {n + 1}")
+            parts.append(header)
+            parts.append(chunk['text'])
+            parts.append("\n\n")
+            sources.append({
+                'source': chunk['source'],
+                'page': chunk['page'],
+                'relevance': round(score, 3),
+                'text_preview': preview,
+                'duplicates': chunk.get('duplicates', [])
+            })
+
+        parts.append(USER_PROMPT_FOOTERS[mode])
+
+        messages = [{"role": "system", "content": SYSTEM_PROMPTS[mode]}]
+        if conversation_history:
+            messages.extend(conversation_history)
+        messages.append({"role": "user", "content": "".join(parts)})
+
+        usage = {
+            'context_tokens': context_tokens,
+            'prompt_tokens': self.system_tokens[mode] + self.footer_tokens[mode]
+                + self.count_tokens(question) + context_tokens,
+            'dropped_chunks': dropped
+        }
+        if dropped:
+            logger.info(f"Prompt budget of {self.max_context_tokens} tokens dropped {dropped} chunks")
+        return messages, sources, usage
+
+    def _make_block(self, chunk: Dict[str, any]) -> Tuple[str, str, int]:
+        """(header after the context number, text preview, block token count)"""
+        header = f" - {chunk['source']}, Page {chunk['page']}]\n"
+        # "[Context N" adds about three tokens on top of header and text
+        tokens = self.count_tokens(header) + self.count_tokens(chunk['text']) + 3
+        return header, chunk['text'][:200] + "...", tokens
@@ -3,26 +3,47 @@ RAG Pipeline Module
 End-to-end retrieval-augmented generation orchestration
 """
 
-from groq import Groq
 from typing import List, Dict, Tuple
 import logging
 import os
 
+from .llm_client import LLMClient
+from .prompting import PromptAssembler
+
 logger = logging.getLogger(__name__)
 
 
 class RAGPipeline:
     """Enterprise RAG pipeline with Groq LLM integration"""
     
-    def __init__(self, groq_api_key: str, model: str = "llama-3.1-70b-versatile"):
+    def __init__(
+        self,
+        groq_api_key: str,
+        model: str = "llama-3.1-70b-versatile",
+        llm_client: LLMClient = None,
+        prompt_assembler: PromptAssembler = None
+    ):
         """
         Initialize RAG pipeline
         
         Args:
             groq_api_key: Groq API key
             model: Groq model identifier
+            llm_client: Preconfigured LLMClient (defaults to one built from the LLM_* environment variables)
+            prompt_assembler: PromptAssembler holding prepared context blocks (defaults to an empty one
+                with the PROMPT_CONTEXT_TOKENS budget)
         """
-        self.client = Groq(api_key=groq_api_key)
+        self.llm = llm_client or LLMClient(
+            groq_api_key,
+            base_url=os.environ.get("GROQ_BASE_URL"),
+            timeout=float(os.environ.get("LLM_TIMEOUT", "30")),
+            max_retries=int(os.environ.get("LLM_MAX_RETRIES", "3")),
+            hedge_percentile=float(os.environ["LLM_HEDGE_PERCENTILE"]) if os.environ.get("LLM_HEDGE_PERCENTILE") else None
+        )
+        self.client = self.llm.client
+        self.prompts = prompt_assembler or PromptAssembler(
+            max_context_tokens=int(os.environ.get("PROMPT_CONTEXT_TOKENS", "6000"))
+        )
         self.model = model
         logger.info(f"Initialized RAG pipeline with model: {model}")
     
@@ -46,37 +67,13 @@ class RAGPipeline:
             Tuple of (answer_text, source_citations)
         """
         try:
-            # Prepare context from retrieved chunks
-            context_parts = []
-            sources = []
-            
-            for i, (chunk, score) in enumerate(retrieved_chunks, 1):
-                context_parts.append(
-                    f"[Context {i} - {chunk['source']}, Page {chunk['page']}]\n{chunk['text']}\n"
-                )
-                sources.append({
-                    'source': chunk['source'],
-                    'page': chunk['page'],
-                    'relevance': round(score, 3),
-                    'text_preview': chunk['text'][:200] + "..."
-                })
-            
-            context = "\n".join(context_parts)
-            
-            # Build prompt based on mode
-            system_prompt = self._build_system_prompt(mode)
-            user_prompt = self._build_user_prompt(question, context, mode)
-            
-            # Prepare messages with conversation history
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            if conversation_history:
-                messages.extend(conversation_history)
-            
-            messages.append({"role": "user", "content": user_prompt})
+            # Assemble prompt from prepared context blocks within the token budget
+            messages, sources, usage = self.prompts.build_messages(
+                question, retrieved_chunks, mode=mode, conversation_history=conversation_history
+            )
             
             # Call Groq API
-            response = self.client.chat.completions.create(
+            response = self.llm.chat(
                 model=self.model,
                 messages=messages,
                 temperature=0.3,
@@ -86,7 +83,7 @@ class RAGPipeline:
             
             answer = response.choices[0].message.content
             
-            logger.info(f"Generated answer for question: {question[:50]}...")
+            logger.info(f"Generated answer for question: {question[:50]}... ({usage['prompt_tokens']} prompt tokens)")
             return answer, sources
             
         except Exception as e:
@@ -148,7 +145,7 @@ Documents:
 Provide a detailed technical summary:"""
             
             # Generate summary
-            response = self.client.chat.completions.create(
+            response = self.llm.chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert document analyst and summarizer."},
@@ -166,50 +163,3 @@ Provide a detailed technical summary:"""
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
             raise
-    
-    def _build_system_prompt(self, mode: str) -> str:
-        """Build system prompt based on mode"""
-        if mode == "executive":
-            return """You are InsightForge AI, an elite business intelligence assistant.
-
-Your role:
-- Provide clear, actionable insights for decision-makers
-- Focus on strategic implications and key takeaways
-- Use business language, avoid unnecessary jargon
-- Be concise and impactful
-
-Guidelines:
-- Always cite sources with [Source: filename, Page X] format
-- Synthesize information across documents when relevant
-- Highlight contradictions or uncertainties
-- Provide confidence levels when appropriate"""
-        else:
-            return """You are InsightForge AI, an expert technical analyst.
-
-Your role:
-- Provide detailed, technically accurate information
-- Include relevant methodologies and data
-- Explain technical concepts thoroughly
-- Reference specific sections and details
-
-Guidelines:
-- Always cite sources with [Source: filename, Page X] format
-- Include relevant technical details and specifications
-- Note limitations or gaps in the data
-- Cross-reference related information"""
-    
-    def _build_user_prompt(self, question: str, context: str, mode: str) -> str:
-        """Build user prompt with context"""
-        return f"""Question: {question}
-
-Context from documents:
-{context}
-
-Instructions:
-- Answer the question based ONLY on the provided context
-- Cite specific sources using [Source: filename, Page X] format
-- If the context doesn't contain relevant information, state this clearly
-- {'Focus on strategic insights and business implications' if mode == 'executive' else 'Provide comprehensive technical details'}
-- Be precise and evidence-based
-
-Answer:"""
@@ -0,0 +1,194 @@
+"""
+Re-ranking Module
+Batched cross-encoder scoring between retrieval and generation
+"""
+
+from sentence_transformers import CrossEncoder
+from typing import List, Dict, Tuple
+import hashlib
+import numpy as np
+import logging
+
+from utils.cache import LRUCache
+from utils.diagnostics import module_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Re-rank retrieved chunks with a small cross-encoder on CPU"""
+
+    BACKENDS = ("torch", "onnx")
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        backend: str = "torch",
+        quantize: bool = False,
+        max_length: int = 512,
+        cache_size: int = 4096
+    ):
+        """
+        Initialize cross-encoder model
+
+        Args:
+            model_name: HuggingFace cross-encoder identifier
+            backend: "torch" (sentence-transformers) or "onnx" (onnxruntime via optimum)
+            quantize: Apply dynamic int8 quantization to the model's linear layers
+            max_length: Maximum tokens per (query, passage) pair
+            cache_size: Number of (query, passage) scores kept in the LRU cache
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose one of {self.BACKENDS}")
+
+        logger.info(f"Loading cross-encoder: {model_name} (backend={backend}, quantize={quantize})")
+        self.model_name = model_name
+        self.backend = backend
+        self.max_length = max_length
+        self.score_cache = LRUCache(cache_size)
+
+        if backend == "onnx":
+            self._load_onnx(model_name, quantize)
+        else:
+            self.model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+            if quantize:
+                import torch
+                self.model.model = torch.quantization.quantize_dynamic(
+                    self.model.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+        logger.info("Cross-encoder loaded")
+
+    def _load_onnx(self, model_name: str, quantize: bool):
+        """Export (or load) the model as ONNX and run it through onnxruntime"""
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "ONNX backend requires 'optimum[onnxruntime]'. Install it or use backend='torch'."
+            ) from e
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+
+        if quantize:
+            import tempfile
+            export_dir = tempfile.mkdtemp(prefix="insightforge_reranker_")
+            quantizer = ORTQuantizer.from_pretrained(model)
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=export_dir, quantization_config=qconfig)
+            model = ORTModelForSequenceClassification.from_pretrained(
+                export_dir, file_name="model_quantized.onnx"
+            )
+
+        self.model = model
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        """
+        Score (query, text) pairs, running one batched forward pass for all cache misses
+
+        Args:
+            query: Query text
+            texts: Candidate passage texts
+
+        Returns:
+            NumPy array of relevance scores in [0, 1], aligned with texts
+        """
+        scores = np.empty(len(texts), dtype=np.float32)
+        keys = [self._pair_key(query, text) for text in texts]
+
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.score_cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                scores[i] = cached
+
+        if missing:
+            try:
+                fresh = self._predict(query, [texts[i] for i in missing])
+            except Exception as e:
+                logger.error(f"Error scoring candidates: {str(e)}")
+                raise
+
+            for i, value in zip(missing, fresh):
+                scores[i] = value
+                self.score_cache.put(keys[i], float(value))
+
+        return scores
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Tuple[Dict[str, any], float]],
+        top_n: int = 3
+    ) -> List[Tuple[Dict[str, any], float]]:
+        """
+        Re-order retrieved chunks by cross-encoder relevance
+
+        Args:
+            query: User question
+            candidates: List of (chunk, score) tuples from retrieval
+            top_n: Number of chunks to keep
+
+        Returns:
+            Best top_n (chunk, rerank_score) tuples, highest first
+        """
+        if not candidates:
+            return []
+
+        scores = self.score(query, [chunk['text'] for chunk, _ in candidates])
+        order = np.argsort(-scores, kind="stable")[:top_n]
+
+        logger.info(f"Re-ranked {len(candidates)} candidates, kept {len(order)}")
+        return [(candidates[i][0], float(scores[i])) for i in order]
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Bytes held by model weights (torch backend) and the score cache"""
+        # CrossEncoder wraps the transformer in .model; ONNX sessions hold weights outside Python
+        model = getattr(self.model, 'model', self.model)
+        return {
+            'model_bytes': module_bytes(model),
+            'cache_bytes': self.score_cache.get_memory_usage()
+        }
+
+    def _predict(self, query: str, texts: List[str]) -> np.ndarray:
+        """Run a single batched forward pass over (query, text) pairs"""
+        if self.backend == "onnx":
+            inputs = self.tokenizer(
+                [query] * len(texts),
+                texts,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="pt"
+            )
+            logits = self.model(**inputs).logits.detach().numpy().reshape(-1)
+            return 1.0 / (1.0 + np.exp(-logits))
+
+        # CrossEncoder applies a sigmoid for single-label models
+        return self.model.predict(
+            [(query, text) for text in texts],
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).reshape(-1)
+
+    def _pair_key(self, query: str, text: str) -> str:
+        """Cache key for a (query, passage) pair"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(' '.join(query.split()).encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_stats(self) -> Dict[str, any]:
+        """Get re-ranker statistics"""
+        return {
+            'model': self.model_name,
+            'backend': self.backend,
+            'score_cache': self.score_cache.get_stats()
+        }
@@ -0,0 +1,450 @@
+"""
+Sharded Vector Store Module
+Multi-collection FAISS storage with scatter-gather parallel search
+"""
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Tuple, Iterable, Optional
+import hashlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import uuid
+import logging
+
+import numpy as np
+
+from utils.diagnostics import deep_sizeof
+
+from .vector_store import VectorStore, next_corpus_version, mmr_select
+
+logger = logging.getLogger(__name__)
+
+# Shards loaded inside process-pool workers, keyed by shard directory
+_worker_shards = {}
+
+
+def _search_shard_on_disk(
+    shard_dir: str,
+    build_id: str,
+    query_embedding: np.ndarray,
+    k: int,
+    sources: Optional[List[str]],
+    page_range: Optional[Tuple[int, int]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Process-pool task: search one persisted shard, loading it once per worker"""
+    cached = _worker_shards.get(shard_dir)
+    if cached is None or cached[0] != build_id:
+        store = VectorStore.load(shard_dir)
+        global_ids = np.load(os.path.join(shard_dir, "ids.npy"))
+        cached = _worker_shards[shard_dir] = (build_id, store, global_ids)
+
+    _, store, global_ids = cached
+    local_ids, scores = store.search_ids(query_embedding, k, sources=sources, page_range=page_range)
+    return global_ids[local_ids], scores
+
+
+class ShardedVectorStore:
+    """Partition chunks across several VectorStore shards and search them in parallel"""
+
+    PARTITIONS = ("hash", "source")
+    EXECUTORS = ("thread", "process")
+
+    def __init__(
+        self,
+        embedding_dim: int,
+        num_shards: int = 4,
+        partition: str = "hash",
+        executor: str = "thread",
+        max_workers: int = None,
+        storage_dir: str = None,
+        collection: str = "default",
+        index_type: str = "flat"
+    ):
+        """
+        Initialize sharded store
+
+        Args:
+            embedding_dim: Dimension of embedding vectors
+            num_shards: Number of shards to partition chunks across
+            partition: "hash" (by chunk id) or "source" (all chunks of a file in one shard)
+            executor: "thread" (in-process shards) or "process" (workers load persisted shards)
+            max_workers: Pool size (defaults to num_shards)
+            storage_dir: Root directory for persisted collections (required for "process")
+            collection: Collection name, e.g. one per team
+            index_type: FAISS index type used by every shard (see VectorStore)
+        """
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"Unknown partition '{partition}'. Choose one of {self.PARTITIONS}")
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Choose one of {self.EXECUTORS}")
+        if executor == "process" and not storage_dir:
+            raise ValueError("Process executor requires storage_dir so workers can load shards")
+
+        self.embedding_dim = embedding_dim
+        self.num_shards = num_shards
+        self.partition = partition
+        self.executor_type = executor
+        self.max_workers = max_workers or num_shards
+        self.storage_dir = storage_dir
+        self.collection = collection
+        self.index_type = index_type
+
+        self.shards = [VectorStore(embedding_dim, index_type) for _ in range(num_shards)]
+        self.shard_ids = [np.empty(0, dtype=np.int64) for _ in range(num_shards)]
+        self.shard_sources = [set() for _ in range(num_shards)]
+        self.chunks = []
+        self.parents = []
+        self.is_built = False
+        self.version = 0
+        self.build_id = None
+        self._executor = None
+
+    @property
+    def collection_dir(self) -> str:
+        """Directory holding this collection's manifest and shards"""
+        return os.path.join(self.storage_dir, self.collection)
+
+    @property
+    def source_ids(self) -> Dict[str, np.ndarray]:
+        """Global chunk ids per source, across all shards"""
+        merged = {}
+        for shard, global_ids in zip(self.shards, self.shard_ids):
+            for source, local_ids in shard.source_ids.items():
+                merged.setdefault(source, []).append(global_ids[local_ids])
+        return {source: np.sort(np.concatenate(parts)) for source, parts in merged.items()}
+
+    def shard_for(self, chunk: Dict[str, any]) -> int:
+        """Stable shard assignment for a chunk"""
+        key = chunk['source'] if self.partition == "source" else chunk.get('chunk_id', chunk['text'])
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') % self.num_shards
+
+    def build_index(
+        self,
+        embeddings: np.ndarray,
+        chunks: List[Dict[str, any]],
+        parents: List[Dict[str, any]] = None
+    ):
+        """
+        Partition chunks and build one FAISS index per shard
+
+        Args:
+            embeddings: NumPy array of embeddings (n_chunks, embedding_dim)
+            chunks: List of chunk dictionaries with metadata
+            parents: Parent windows referenced by the chunks' parent_id, kept once per collection
+        """
+        try:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            assignment = np.fromiter((self.shard_for(chunk) for chunk in chunks), dtype=np.int64, count=len(chunks))
+
+            self.shards = [VectorStore(self.embedding_dim, self.index_type) for _ in range(self.num_shards)]
+            for shard_num, shard in enumerate(self.shards):
+                global_ids = np.flatnonzero(assignment == shard_num)
+                self.shard_ids[shard_num] = global_ids
+                self.shard_sources[shard_num] = {chunks[i]['source'] for i in global_ids}
+                if len(global_ids):
+                    shard.build_index(embeddings[global_ids], [chunks[i] for i in global_ids])
+
+            self.chunks = chunks
+            self.parents = parents or []
+            self.is_built = True
+            self.version = next_corpus_version()
+            self.build_id = uuid.uuid4().hex
+
+            if self.storage_dir:
+                self.save()
+
+            sizes = [len(ids) for ids in self.shard_ids]
+            logger.info(f"Built {self.num_shards} shards for collection '{self.collection}': {sizes}")
+
+        except Exception as e:
+            logger.error(f"Error building sharded index: {str(e)}")
+            raise
+
+    def search_ids(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scatter the query to every relevant shard and merge the top-k lists
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            sources: Restrict search to these source filenames
+            page_range: Restrict search to an inclusive (first_page, last_page) range
+
+        Returns:
+            Tuple of (global_chunk_indices, similarity_scores) arrays
+        """
+        if not self.is_built:
+            raise ValueError("Index not built. Call build_index first.")
+
+        sources = list(sources) if sources is not None else None
+        targets = self._route(sources)
+        if not targets:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        executor = self._get_executor()
+
+        if self.executor_type == "process":
+            futures = [
+                executor.submit(
+                    _search_shard_on_disk,
+                    self._shard_dir(shard_num), self.build_id, query_embedding, k, sources, page_range
+                )
+                for shard_num in targets
+            ]
+        else:
+            futures = [
+                executor.submit(self._search_shard, shard_num, query_embedding, k, sources, page_range)
+                for shard_num in targets
+            ]
+
+        # Each shard list is sorted by score, so a heap merge yields the global top-k
+        shard_results = [zip(*future.result()) for future in futures]
+        merged = list(itertools.islice(heapq.merge(*shard_results, key=lambda hit: -hit[1]), k))
+
+        if not merged:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        ids, scores = zip(*merged)
+        return np.asarray(ids, dtype=np.int64), np.asarray(scores, dtype=np.float32)
+
+    def search_ids_mmr(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        fetch_k: int = 50,
+        lambda_mult: float = 0.5,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Diverse top-k over the merged candidate pool of all shards (see VectorStore.search_ids_mmr)
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            fetch_k: Candidate pool size retrieved before diversification
+            lambda_mult: Relevance/diversity trade-off (1.0 = plain top-k)
+            sources: Restrict search to these source filenames
+            page_range: Restrict search to an inclusive (first_page, last_page) range
+
+        Returns:
+            Tuple of (global_chunk_indices, similarity_scores) arrays in MMR order
+        """
+        ids, _ = self.search_ids(query_embedding, max(k, fetch_k), sources=sources, page_range=page_range)
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        order, scores = mmr_select(query_embedding, self.get_vectors(ids), k, lambda_mult)
+        return ids[order], scores
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        """Stored embedding vectors for global chunk ids (their shards must be loaded in this process)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.empty((len(ids), self.embedding_dim), dtype=np.float32)
+        for shard, global_ids in zip(self.shards, self.shard_ids):
+            if not len(global_ids):
+                continue
+            # shard_ids is sorted, so membership and local positions come from one searchsorted
+            local = np.minimum(np.searchsorted(global_ids, ids), len(global_ids) - 1)
+            hit = global_ids[local] == ids
+            if hit.any():
+                vectors[hit] = shard.get_vectors(local[hit])
+        return vectors
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[Dict[str, any], float]]:
+        """
+        Search for top-k most similar chunks across all shards
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            sources: Restrict search to these source filenames
+            page_range: Restrict search to an inclusive (first_page, last_page) range
+
+        Returns:
+            List of (chunk_dict, similarity_score) tuples
+        """
+        try:
+            indices, similarities = self.search_ids(query_embedding, k, sources=sources, page_range=page_range)
+            results = [(self.chunks[idx], float(sim)) for idx, sim in zip(indices, similarities)]
+
+            logger.info(f"Retrieved {len(results)} chunks for query from {self.num_shards} shards")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching sharded index: {str(e)}")
+            raise
+
+    def save(self):
+        """Persist every shard and the collection manifest"""
+        if not self.storage_dir:
+            raise ValueError("storage_dir not set")
+
+        for shard_num in range(self.num_shards):
+            self.save_shard(shard_num)
+
+        manifest = {
+            'collection': self.collection,
+            'embedding_dim': self.embedding_dim,
+            'num_shards': self.num_shards,
+            'partition': self.partition,
+            'index_type': self.index_type,
+            'total_chunks': len(self.chunks),
+            'build_id': self.build_id
+        }
+        with open(os.path.join(self.collection_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        if self.parents:
+            with open(os.path.join(self.collection_dir, "parents.json"), 'w', encoding='utf-8') as f:
+                json.dump(self.parents, f)
+
+    def save_shard(self, shard_num: int):
+        """Persist a single shard (index, chunks and global id mapping)"""
+        shard_dir = self._shard_dir(shard_num)
+        self.shards[shard_num].save(shard_dir)
+        np.save(os.path.join(shard_dir, "ids.npy"), self.shard_ids[shard_num])
+
+    @classmethod
+    def load(
+        cls,
+        storage_dir: str,
+        collection: str = "default",
+        shard_nums: Iterable[int] = None,
+        executor: str = "thread",
+        max_workers: int = None
+    ) -> 'ShardedVectorStore':
+        """
+        Load a persisted collection, optionally only some of its shards
+
+        Args:
+            storage_dir: Root directory for persisted collections
+            collection: Collection name
+            shard_nums: Shards to load (None for all); others stay empty
+            executor: "thread" or "process"
+            max_workers: Pool size
+
+        Returns:
+            Built ShardedVectorStore
+        """
+        with open(os.path.join(storage_dir, collection, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        store = cls(
+            manifest['embedding_dim'],
+            num_shards=manifest['num_shards'],
+            partition=manifest['partition'],
+            executor=executor,
+            max_workers=max_workers,
+            storage_dir=storage_dir,
+            collection=collection,
+            index_type=manifest.get('index_type', 'flat')
+        )
+        store.chunks = [None] * manifest['total_chunks']
+        store.build_id = manifest['build_id']
+        parents_path = os.path.join(storage_dir, collection, "parents.json")
+        if os.path.exists(parents_path):
+            with open(parents_path, 'r', encoding='utf-8') as f:
+                store.parents = json.load(f)
+
+        for shard_num in (shard_nums if shard_nums is not None else range(store.num_shards)):
+            store.load_shard(shard_num)
+
+        store.is_built = True
+        store.version = next_corpus_version()
+        return store
+
+    def load_shard(self, shard_num: int):
+        """Load a single persisted shard into this store"""
+        shard_dir = self._shard_dir(shard_num)
+        shard = VectorStore.load(shard_dir)
+        global_ids = np.load(os.path.join(shard_dir, "ids.npy"))
+
+        self.shards[shard_num] = shard
+        self.shard_ids[shard_num] = global_ids
+        self.shard_sources[shard_num] = set(shard.source_ids)
+        for chunk, global_id in zip(shard.chunks, global_ids):
+            self.chunks[global_id] = chunk
+
+    @staticmethod
+    def list_collections(storage_dir: str) -> List[str]:
+        """Names of collections persisted under storage_dir"""
+        if not os.path.isdir(storage_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(storage_dir)
+            if os.path.isfile(os.path.join(storage_dir, name, "manifest.json"))
+        )
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def get_memory_usage(self, seen: set = None) -> Dict[str, int]:
+        """Estimate memory held by all shard indexes and chunk metadata"""
+        seen = set() if seen is None else seen
+        usage = {'index_bytes': 0, 'metadata_bytes': deep_sizeof(self.chunks, seen) + deep_sizeof(self.parents, seen)}
+        for shard, global_ids in zip(self.shards, self.shard_ids):
+            shard_usage = shard.get_memory_usage(seen)
+            usage['index_bytes'] += shard_usage['index_bytes']
+            usage['metadata_bytes'] += shard_usage['metadata_bytes'] + global_ids.nbytes
+        return usage
+
+    def get_index_stats(self) -> Dict[str, any]:
+        """Get statistics about the sharded store"""
+        return {
+            'total_vectors': sum(shard.index.ntotal for shard in self.shards if shard.is_built),
+            'embedding_dim': self.embedding_dim,
+            'is_built': self.is_built,
+            'version': self.version,
+            'collection': self.collection,
+            'num_shards': self.num_shards,
+            'shard_sizes': [len(ids) for ids in self.shard_ids],
+            'num_sources': len(set().union(*self.shard_sources))
+        }
+
+    def _route(self, sources: Optional[List[str]]) -> List[int]:
+        """Shards that can contain matches (source partitioning prunes the rest)"""
+        targets = [num for num, shard in enumerate(self.shards) if shard.is_built and shard.chunks]
+        if sources is None:
+            return targets
+
+        wanted = set(sources)
+        return [num for num in targets if self.shard_sources[num] & wanted]
+
+    def _search_shard(self, shard_num, query_embedding, k, sources, page_range):
+        """Thread-pool task: search one in-memory shard"""
+        local_ids, scores = self.shards[shard_num].search_ids(
+            query_embedding, k, sources=sources, page_range=page_range
+        )
+        return self.shard_ids[shard_num][local_ids], scores
+
+    def _shard_dir(self, shard_num: int) -> str:
+        return os.path.join(self.collection_dir, f"shard_{shard_num:03d}")
+
+    def _get_executor(self):
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                # Forking with FAISS/torch threads running can deadlock; spawn starts clean workers
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
@@ -5,44 +5,158 @@ FAISS-based vector storage and similarity search
 
 import faiss
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Optional
+import itertools
+import json
+import os
 import logging
 
+from utils.diagnostics import deep_sizeof
+
 logger = logging.getLogger(__name__)
 
+# Process-wide counter so every index build gets a unique corpus version,
+# even across separate VectorStore instances
+_version_counter = itertools.count(1)
+
+
+def next_corpus_version() -> int:
+    """Allocate a new process-wide corpus version"""
+    return next(_version_counter)
+
+
+def mmr_select(
+    query_embedding: np.ndarray,
+    candidate_vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maximal marginal relevance over a candidate pool
+    
+    The full candidate similarity matrix is computed in one matmul; each
+    greedy step is then a vectorized update of the running max similarity
+    to the already selected set.
+    
+    Args:
+        query_embedding: Normalized query vector
+        candidate_vectors: Normalized candidate vectors (n_candidates, embedding_dim)
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks purely by relevance, 0.0 purely by diversity
+        
+    Returns:
+        Tuple of (positions into candidate_vectors in selection order, their query similarities)
+    """
+    n = len(candidate_vectors)
+    k = min(k, n)
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    
+    relevance = candidate_vectors @ query_embedding.reshape(-1)
+    similarity = candidate_vectors @ candidate_vectors.T
+    
+    selected = np.empty(k, dtype=np.int64)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected[step] = best
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    
+    return selected, relevance[selected]
+
+
+def index_memory_bytes(index) -> int:
+    """Estimate resident bytes of a FAISS index without serializing it"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexFlat):
+        return index.ntotal * index.code_size
+    if isinstance(index, faiss.IndexHNSW):
+        hnsw = index.hnsw
+        links = hnsw.neighbors.size() * 4 + hnsw.levels.size() * 4 + hnsw.offsets.size() * 8
+        return links + index_memory_bytes(index.storage)
+    if isinstance(index, faiss.IndexIVF):
+        # Each stored vector keeps its code plus an int64 id in its inverted list
+        stored = sum(index.invlists.list_size(i) for i in range(index.nlist))
+        return stored * (index.code_size + 8) + index_memory_bytes(index.quantizer)
+    # Unknown layout: fall back to the exact (but copying) serialized size
+    return faiss.serialize_index(index).nbytes
+
 
 class VectorStore:
     """High-performance vector storage and retrieval using FAISS"""
     
-    def __init__(self, embedding_dim: int):
+    INDEX_TYPES = ("flat", "hnsw", "ivf")
+    
+    def __init__(self, embedding_dim: int, index_type: str = "flat"):
         """
         Initialize FAISS index
         
         Args:
             embedding_dim: Dimension of embedding vectors
+            index_type: "flat" (exact), "hnsw" (graph) or "ivf" (inverted lists, trained at build time)
         """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'. Choose one of {self.INDEX_TYPES}")
+        
         self.embedding_dim = embedding_dim
+        self.index_type = index_type
         # Use inner product index (equivalent to cosine similarity with normalized vectors)
-        self.index = faiss.IndexFlatIP(embedding_dim)
+        if index_type == "hnsw":
+            self.index = faiss.IndexHNSWFlat(embedding_dim, 32, faiss.METRIC_INNER_PRODUCT)
+        else:
+            # IVF needs the corpus size to pick nlist, so it is created in build_index
+            self.index = faiss.IndexFlatIP(embedding_dim)
         self.chunks = []
+        # Parent windows referenced by chunk 'parent_id' (empty for single-level chunking)
+        self.parents = []
         self.is_built = False
+        self.version = 0
+        # Metadata columns for scoped search
+        self.source_ids = {}
+        self.pages = np.empty(0, dtype=np.int32)
         
-    def build_index(self, embeddings: np.ndarray, chunks: List[Dict[str, any]]):
+    def build_index(
+        self,
+        embeddings: np.ndarray,
+        chunks: List[Dict[str, any]],
+        parents: List[Dict[str, any]] = None
+    ):
         """
         Build FAISS index from embeddings
         
         Args:
             embeddings: NumPy array of embeddings (n_chunks, embedding_dim)
             chunks: List of chunk dictionaries with metadata
+            parents: Parent windows referenced by the chunks' parent_id (see ParentChildChunker)
         """
         try:
             # Ensure embeddings are float32
             embeddings = embeddings.astype('float32')
             
+            if self.index_type == "ivf":
+                nlist = max(1, int(np.sqrt(len(embeddings))))
+                quantizer = faiss.IndexFlatIP(self.embedding_dim)
+                self.index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, nlist, faiss.METRIC_INNER_PRODUCT)
+                self.index.train(embeddings)
+                self.index.nprobe = max(1, nlist // 8)
+                # Lets MMR reconstruct candidate vectors by id
+                self.index.make_direct_map()
+            
             # Add vectors to index
             self.index.add(embeddings)
             self.chunks = chunks
+            self.parents = parents or []
+            self._build_metadata_columns()
             self.is_built = True
+            self.version = next_corpus_version()
             
             logger.info(f"Built FAISS index with {len(chunks)} vectors")
             
@@ -50,13 +164,183 @@ class VectorStore:
             logger.error(f"Error building FAISS index: {str(e)}")
             raise
     
-    def search(self, query_embedding: np.ndarray, k: int = 5) -> List[Tuple[Dict[str, any], float]]:
+    def _build_metadata_columns(self):
+        """Index chunk ids by source and page so filters never touch other documents"""
+        self.pages = np.fromiter((chunk['page'] for chunk in self.chunks), dtype=np.int32, count=len(self.chunks))
+        
+        source_lists = {}
+        for idx, chunk in enumerate(self.chunks):
+            source_lists.setdefault(chunk['source'], []).append(idx)
+        self.source_ids = {source: np.asarray(ids, dtype=np.int64) for source, ids in source_lists.items()}
+    
+    def select_ids(
+        self,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """
+        Resolve metadata filters into a sorted array of chunk ids
+        
+        Args:
+            sources: Source filenames to include (None for all)
+            page_range: Inclusive (first_page, last_page) bounds (None for all pages)
+            
+        Returns:
+            Sorted int64 array of matching chunk ids
+        """
+        if sources is None:
+            ids = np.arange(len(self.chunks), dtype=np.int64)
+        else:
+            selected = [self.source_ids[source] for source in sources if source in self.source_ids]
+            ids = np.sort(np.concatenate(selected)) if selected else np.empty(0, dtype=np.int64)
+        
+        if page_range is not None:
+            first_page, last_page = page_range
+            pages = self.pages[ids]
+            ids = ids[(pages >= first_page) & (pages <= last_page)]
+        
+        return ids
+    
+    def search_ids(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search for top-k most similar chunk ids
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            sources: Restrict search to these source filenames
+            page_range: Restrict search to an inclusive (first_page, last_page) range
+            
+        Returns:
+            Tuple of (chunk_indices, similarity_scores) arrays
+        """
+        if not self.is_built:
+            raise ValueError("Index not built. Call build_index first.")
+        
+        # Ensure query is 2D and float32
+        query_embedding = query_embedding.reshape(1, -1).astype('float32')
+        
+        if sources is not None or page_range is not None:
+            return self._search_subset(query_embedding, k, self.select_ids(sources, page_range))
+        
+        # Search index
+        similarities, indices = self.index.search(query_embedding, min(k, len(self.chunks)))
+        
+        # Drop FAISS padding (-1) and out-of-range ids
+        valid = (indices[0] >= 0) & (indices[0] < len(self.chunks))
+        return indices[0][valid], similarities[0][valid]
+    
+    def search_ids_batch(self, query_embeddings: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search for top-k chunk ids for many queries in one FAISS call
+        
+        Args:
+            query_embeddings: NumPy array of query embeddings (n_queries, embedding_dim)
+            k: Number of results per query
+            
+        Returns:
+            Tuple of (chunk_indices, similarity_scores) arrays of shape (n_queries, k), padded with -1
+        """
+        if not self.is_built:
+            raise ValueError("Index not built. Call build_index first.")
+        
+        query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        similarities, indices = self.index.search(query_embeddings, min(k, len(self.chunks)))
+        return indices, similarities
+    
+    def _search_subset(self, query_embedding: np.ndarray, k: int, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k search restricted to the given chunk ids"""
+        k = min(k, len(ids))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        if isinstance(self.index, faiss.IndexFlat):
+            # Score only the selected rows of the flat index
+            scores = self._flat_vectors()[ids] @ query_embedding[0]
+            
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return ids[top], scores[top]
+        
+        # Other index types: let FAISS skip everything outside the selection
+        selector = faiss.IDSelectorBatch(ids)
+        if isinstance(self.index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        similarities, indices = self.index.search(query_embedding, k, params=params)
+        valid = indices[0] >= 0
+        return indices[0][valid], similarities[0][valid]
+    
+    def search_ids_mmr(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        fetch_k: int = 50,
+        lambda_mult: float = 0.5,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Diverse top-k: fetch a candidate pool, then select with maximal marginal relevance
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            fetch_k: Candidate pool size retrieved before diversification
+            lambda_mult: Relevance/diversity trade-off (1.0 = plain top-k)
+            sources: Restrict search to these source filenames
+            page_range: Restrict search to an inclusive (first_page, last_page) range
+            
+        Returns:
+            Tuple of (chunk_indices, similarity_scores) arrays in MMR order
+        """
+        ids, _ = self.search_ids(query_embedding, max(k, fetch_k), sources=sources, page_range=page_range)
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        order, scores = mmr_select(query_embedding, self.get_vectors(ids), k, lambda_mult)
+        return ids[order], scores
+    
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Stored embedding vectors for the given chunk ids
+        
+        Args:
+            ids: Chunk indices
+            
+        Returns:
+            NumPy array (len(ids), embedding_dim)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if isinstance(self.index, faiss.IndexFlat):
+            return self._flat_vectors()[ids]
+        return self.index.reconstruct_batch(ids)
+    
+    def _flat_vectors(self) -> np.ndarray:
+        """Zero-copy (ntotal, embedding_dim) view of a flat index's storage"""
+        vectors = faiss.rev_swig_ptr(self.index.get_xb(), self.index.ntotal * self.embedding_dim)
+        return vectors.reshape(self.index.ntotal, self.embedding_dim)
+    
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        sources: Optional[Iterable[str]] = None,
+        page_range: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[Dict[str, any], float]]:
         """
         Search for top-k most similar chunks
         
         Args:
             query_embedding: Query embedding vector
             k: Number of results to return
+            sources: Restrict search to these source filenames
+            page_range: Restrict search to an inclusive (first_page, last_page) range
             
         Returns:
             List of (chunk_dict, similarity_score) tuples
@@ -65,17 +349,10 @@ class VectorStore:
             raise ValueError("Index not built. Call build_index first.")
         
         try:
-            # Ensure query is 2D and float32
-            query_embedding = query_embedding.reshape(1, -1).astype('float32')
-            
-            # Search index
-            similarities, indices = self.index.search(query_embedding, min(k, len(self.chunks)))
+            indices, similarities = self.search_ids(query_embedding, k, sources=sources, page_range=page_range)
             
             # Package results with metadata
-            results = []
-            for idx, sim in zip(indices[0], similarities[0]):
-                if idx < len(self.chunks):  # Safety check
-                    results.append((self.chunks[idx], float(sim)))
+            results = [(self.chunks[idx], float(sim)) for idx, sim in zip(indices, similarities)]
             
             logger.info(f"Retrieved {len(results)} chunks for query")
             return results
@@ -84,10 +361,84 @@ class VectorStore:
             logger.error(f"Error searching index: {str(e)}")
             raise
     
+    def save(self, directory: str):
+        """
+        Persist index and chunk metadata
+        
+        Args:
+            directory: Target directory (created if missing)
+        """
+        os.makedirs(directory, exist_ok=True)
+        faiss.write_index(self.index, os.path.join(directory, "index.faiss"))
+        with open(os.path.join(directory, "chunks.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.chunks, f)
+        if self.parents:
+            with open(os.path.join(directory, "parents.json"), 'w', encoding='utf-8') as f:
+                json.dump(self.parents, f)
+        
+        logger.info(f"Saved FAISS index with {len(self.chunks)} vectors to {directory}")
+    
+    @classmethod
+    def load(cls, directory: str) -> 'VectorStore':
+        """
+        Load a store previously written with save()
+        
+        Args:
+            directory: Directory containing index.faiss, chunks.json and optionally parents.json
+            
+        Returns:
+            Built VectorStore
+        """
+        index = faiss.read_index(os.path.join(directory, "index.faiss"))
+        with open(os.path.join(directory, "chunks.json"), 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        
+        store = cls(index.d)
+        store.index = index
+        if isinstance(index, faiss.IndexHNSW):
+            store.index_type = "hnsw"
+        elif isinstance(index, faiss.IndexIVF):
+            store.index_type = "ivf"
+        if store.index_type == "ivf":
+            store.index.make_direct_map()
+        store.chunks = chunks
+        parents_path = os.path.join(directory, "parents.json")
+        if os.path.exists(parents_path):
+            with open(parents_path, 'r', encoding='utf-8') as f:
+                store.parents = json.load(f)
+        store._build_metadata_columns()
+        store.is_built = True
+        store.version = next_corpus_version()
+        
+        logger.info(f"Loaded FAISS index with {len(chunks)} vectors from {directory}")
+        return store
+    
+    def get_memory_usage(self, seen: set = None) -> Dict[str, int]:
+        """
+        Estimate memory held by the index and chunk metadata
+
+        Args:
+            seen: Object ids already counted elsewhere (see deep_sizeof)
+
+        Returns:
+            Dictionary with index_bytes and metadata_bytes
+        """
+        seen = set() if seen is None else seen
+        metadata_bytes = deep_sizeof(self.chunks, seen) + deep_sizeof(self.parents, seen) + self.pages.nbytes
+        metadata_bytes += sum(ids.nbytes for ids in self.source_ids.values())
+        
+        return {
+            'index_bytes': index_memory_bytes(self.index) if self.is_built else 0,
+            'metadata_bytes': metadata_bytes
+        }
+    
     def get_index_stats(self) -> Dict[str, any]:
         """Get statistics about the vector store"""
         return {
             'total_vectors': self.index.ntotal if self.is_built else 0,
             'embedding_dim': self.embedding_dim,
-            'is_built': self.is_built
+            'index_type': self.index_type,
+            'is_built': self.is_built,
+            'version': self.version,
+            'num_sources': len(self.source_ids)
         }
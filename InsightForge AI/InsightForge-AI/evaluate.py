@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Retrieval Evaluation Script
+Measures recall@k, MRR, nDCG, latency and memory across a configuration sweep
+
+Usage:
+    python evaluate.py --pdfs docs/*.pdf --questions questions.jsonl \
+        --chunk-sizes 500,1000 --chunk-overlaps 100,200 --index-types flat,hnsw --k 3,5,10
+"""
+
+import argparse
+import glob
+import json
+import sys
+
+from core.pdf_loader import PDFLoader
+from core.embeddings import EmbeddingGenerator
+from core.evaluation import RetrievalEvaluator, load_questions, format_results
+from utils.logger import setup_logger
+
+logger = setup_logger("InsightForge.Evaluation")
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def _str_list(value):
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Offline retrieval evaluation for InsightForge AI")
+    parser.add_argument("--pdfs", nargs="+", required=True, help="PDF files or glob patterns forming the corpus")
+    parser.add_argument("--questions", required=True, help="JSONL with question and expected source/page")
+    parser.add_argument("--chunk-sizes", type=_int_list, default=[1000], help="Comma-separated chunk sizes")
+    parser.add_argument("--chunk-overlaps", type=_int_list, default=[200], help="Comma-separated chunk overlaps")
+    parser.add_argument("--index-types", type=_str_list, default=["flat"], help="Comma-separated: flat,hnsw,ivf")
+    parser.add_argument("--k", type=_int_list, default=[5], help="Comma-separated retrieval depths")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Sentence-transformers model")
+    parser.add_argument("--output", help="Optional path to write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    paths = sorted({path for pattern in args.pdfs for path in glob.glob(pattern)})
+    if not paths:
+        print("❌ No PDF files matched --pdfs")
+        return 1
+    
+    documents = PDFLoader().load_pdfs(paths)
+    questions = load_questions(args.questions)
+    
+    evaluator = RetrievalEvaluator(EmbeddingGenerator(args.model), documents, questions)
+    results = evaluator.run(
+        chunk_sizes=args.chunk_sizes,
+        chunk_overlaps=args.chunk_overlaps,
+        index_types=args.index_types,
+        ks=args.k
+    )
+    
+    print("=" * 80)
+    print(f"InsightForge AI - Retrieval Evaluation ({len(paths)} PDFs, {len(questions)} questions)")
+    print("=" * 80)
+    print(format_results(results))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,12 @@ InsightForge AI - Utilities Module
 
 from .memory import ConversationMemory
 from .logger import setup_logger, QueryLogger
+from .cache import LRUCache, RetrievalCache
 
 __all__ = [
     'ConversationMemory',
     'setup_logger',
-    'QueryLogger'
+    'QueryLogger',
+    'LRUCache',
+    'RetrievalCache'
 ]
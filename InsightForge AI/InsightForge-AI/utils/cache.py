@@ -0,0 +1,230 @@
+"""
+Cache Module
+Bounded LRU caches for query embeddings and retrieval results
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Hashable
+import hashlib
+import threading
+import logging
+
+import numpy as np
+
+from .diagnostics import deep_sizeof
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with hit-rate metrics"""
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of entries kept before evicting the least recently used
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        """Return the cached value for key (marking it recently used) or default"""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        """Insert or refresh an entry, evicting the oldest one when full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (metrics are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get_stats(self) -> Dict[str, any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0
+        }
+
+    def get_memory_usage(self) -> int:
+        """Estimated bytes held by cached keys and values"""
+        with self._lock:
+            entries = list(self._data.items())
+        return deep_sizeof(entries)
+
+
+class RetrievalCache:
+    """Query-embedding and search-result caches scoped to one corpus version"""
+
+    def __init__(self, max_embeddings: int = 512, max_results: int = 1024):
+        """
+        Initialize retrieval caches
+
+        Args:
+            max_embeddings: Capacity of the normalized-query -> embedding cache
+            max_results: Capacity of the (embedding, k, filters, version) -> result ids cache
+        """
+        self.embeddings = LRUCache(max_embeddings)
+        self.results = LRUCache(max_results)
+        self.corpus_version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Collapse whitespace and case so trivially different queries share an entry"""
+        # all-MiniLM-L6-v2 uses an uncased tokenizer, so lowercasing does not change the embedding
+        return ' '.join(query.split()).lower()
+
+    @staticmethod
+    def hash_embedding(embedding: np.ndarray) -> str:
+        """Stable digest of an embedding vector"""
+        data = np.ascontiguousarray(embedding, dtype=np.float32)
+        return hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+
+    def sync_version(self, corpus_version) -> bool:
+        """
+        Invalidate both caches when the index has changed
+
+        Args:
+            corpus_version: Version identifier of the current vector store
+
+        Returns:
+            True if the caches were invalidated
+        """
+        with self._lock:
+            if corpus_version == self.corpus_version:
+                return False
+
+            self.embeddings.clear()
+            self.results.clear()
+            self.corpus_version = corpus_version
+
+        logger.info(f"Retrieval caches invalidated for corpus version {corpus_version}")
+        return True
+
+    def embed_query(self, query: str, embedding_generator, corpus_version) -> np.ndarray:
+        """
+        Return the query embedding, computing it only on a cache miss
+
+        Args:
+            query: Raw query text
+            embedding_generator: EmbeddingGenerator used on a miss
+            corpus_version: Version identifier of the current vector store
+
+        Returns:
+            Read-only NumPy embedding vector
+        """
+        self.sync_version(corpus_version)
+        key = self.normalize_query(query)
+
+        embedding = self.embeddings.get(key)
+        if embedding is None:
+            embedding = embedding_generator.generate_query_embedding(key)
+            embedding.setflags(write=False)
+            self.embeddings.put(key, embedding)
+
+        return embedding
+
+    def search(
+        self,
+        vector_store,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        filters: Dict[str, any] = None,
+        mmr: Dict[str, float] = None
+    ) -> List[Tuple[Dict[str, any], float]]:
+        """
+        Search the vector store, reusing cached result ids when possible
+
+        Args:
+            vector_store: VectorStore to search on a miss
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filters: Optional keyword filters forwarded to VectorStore.search_ids
+            mmr: Optional fetch_k/lambda_mult settings to diversify results with search_ids_mmr
+
+        Returns:
+            List of (chunk_dict, similarity_score) tuples
+        """
+        self.sync_version(vector_store.version)
+        filters = filters or {}
+        key = (
+            self.hash_embedding(query_embedding),
+            k,
+            self._freeze(filters),
+            self._freeze(mmr),
+            vector_store.version
+        )
+
+        hits = self.results.get(key)
+        if hits is None:
+            if mmr is not None:
+                indices, similarities = vector_store.search_ids_mmr(query_embedding, k, **mmr, **filters)
+            else:
+                indices, similarities = vector_store.search_ids(query_embedding, k, **filters)
+            hits = tuple(zip(indices.tolist(), similarities.tolist()))
+            self.results.put(key, hits)
+
+        return [(vector_store.chunks[idx], score) for idx, score in hits]
+
+    def get_stats(self) -> Dict[str, any]:
+        """Get statistics for both caches"""
+        return {
+            'corpus_version': self.corpus_version,
+            'embeddings': self.embeddings.get_stats(),
+            'results': self.results.get_stats()
+        }
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Estimated bytes held by cached embeddings and result ids"""
+        return {
+            'embeddings_bytes': self.embeddings.get_memory_usage(),
+            'results_bytes': self.results.get_memory_usage()
+        }
+
+    @classmethod
+    def _freeze(cls, value) -> Hashable:
+        """Convert filter arguments into a hashable cache key component"""
+        if isinstance(value, dict):
+            return tuple(sorted((k, cls._freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = [cls._freeze(v) for v in value]
+            return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+        return value
@@ -0,0 +1,174 @@
+"""
+Diagnostics Module
+Process resource usage, object size estimates and per-stage CPU/memory accounting
+"""
+
+from contextlib import contextmanager
+from typing import Dict, List
+import os
+import resource
+import sys
+import threading
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_usage() -> Dict[str, float]:
+    """Current and peak RSS plus CPU time of this process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is KB on Linux and bytes on macOS
+    peak_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            rss_bytes = int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        rss_bytes = peak_bytes
+
+    return {
+        'rss_bytes': rss_bytes,
+        'peak_rss_bytes': peak_bytes,
+        'cpu_user_s': round(usage.ru_utime, 3),
+        'cpu_system_s': round(usage.ru_stime, 3)
+    }
+
+
+def deep_sizeof(obj, seen: set = None, sample_limit: int = 1000) -> int:
+    """
+    Estimate the memory held by a container of Python objects
+
+    Args:
+        obj: Object to measure (dicts, lists, tuples, sets and leaves such as strings or NumPy arrays)
+        seen: Ids already counted; share one set across calls so shared objects are counted once
+        sample_limit: Sequences longer than this are measured on an even sample and extrapolated
+
+    Returns:
+        Estimated size in bytes
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray) and obj.base is not None:
+        # A view keeps its whole base buffer alive
+        size += deep_sizeof(obj.base, seen, sample_limit)
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen, sample_limit) + deep_sizeof(value, seen, sample_limit)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = obj if isinstance(obj, (list, tuple)) else list(obj)
+        if len(items) > sample_limit:
+            step = len(items) / sample_limit
+            sample = [items[int(i * step)] for i in range(sample_limit)]
+            sampled = sum(deep_sizeof(item, seen, sample_limit) for item in sample)
+            size += int(sampled * len(items) / sample_limit)
+        else:
+            size += sum(deep_sizeof(item, seen, sample_limit) for item in items)
+    return size
+
+
+def module_bytes(model) -> int:
+    """Parameter and buffer bytes of a torch module (0 if it exposes neither)"""
+    total = 0
+    for attr in ('parameters', 'buffers'):
+        tensors = getattr(model, attr, None)
+        if callable(tensors):
+            total += sum(t.numel() * t.element_size() for t in tensors())
+    return total
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Human-readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{int(num_bytes)} B"
+        num_bytes /= 1024
+
+
+class RssSampler:
+    """Track the highest RSS of this process while a block runs, sampled from a background thread"""
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Initialize sampler
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "RssSampler":
+        self.start_bytes = self.peak_bytes = process_usage()['rss_bytes']
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    @property
+    def growth_bytes(self) -> int:
+        """Peak RSS above the RSS at entry"""
+        return self.peak_bytes - self.start_bytes
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        self.peak_bytes = max(self.peak_bytes, process_usage()['rss_bytes'])
+
+
+class StageProfiler:
+    """Record wall time, CPU time and RSS growth of named pipeline stages"""
+
+    def __init__(self):
+        self.stages: List[Dict[str, any]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measure the enclosed block
+
+        Args:
+            name: Stage name
+        """
+        before = process_usage()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            after = process_usage()
+            self.stages.append({
+                'stage': name,
+                'wall_s': round(time.perf_counter() - wall_start, 3),
+                'cpu_s': round(time.process_time() - cpu_start, 3),
+                'rss_bytes': after['rss_bytes'],
+                'rss_delta_bytes': after['rss_bytes'] - before['rss_bytes'],
+                'peak_rss_bytes': after['peak_rss_bytes']
+            })
+
+    def summary(self) -> Dict[str, any]:
+        """Per-stage records plus totals"""
+        return {
+            'stages': self.stages,
+            'total_wall_s': round(sum(s['wall_s'] for s in self.stages), 3),
+            'total_cpu_s': round(sum(s['cpu_s'] for s in self.stages), 3),
+            'peak_rss_bytes': max((s['peak_rss_bytes'] for s in self.stages), default=0)
+        }
@@ -0,0 +1,236 @@
+"""
+Fake LLM Server Module
+Offline OpenAI-compatible chat endpoint with configurable latency and errors
+
+Usage:
+    python -m utils.fake_llm_server --port 8001 --latency-ms 300 --tail-prob 0.05 --error-rate 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8001 GROQ_API_KEY=test python app.py
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FakeLLMConfig:
+    """Latency and failure distribution for the fake server"""
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        latency_sigma: float = 0.3,
+        tail_prob: float = 0.0,
+        tail_ms: float = 3000.0,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = None,
+        seed: int = None
+    ):
+        """
+        Initialize configuration
+
+        Args:
+            latency_ms: Median response latency (log-normal distribution)
+            latency_sigma: Log-normal shape parameter (spread of the latency distribution)
+            tail_prob: Probability that a request lands in the slow tail
+            tail_ms: Extra latency for tail requests
+            rate_limit_rate: Probability of answering 429
+            error_rate: Probability of answering 500/503
+            retry_after: Retry-After seconds sent with 429 responses (None to omit)
+            seed: Random seed for reproducible runs
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tail_prob = tail_prob
+        self.tail_ms = tail_ms
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> Dict[str, any]:
+        """Draw latency and outcome for one request"""
+        with self._lock:
+            latency = self._rng.lognormvariate(0.0, self.latency_sigma) * self.latency_ms
+            if self._rng.random() < self.tail_prob:
+                latency += self.tail_ms
+
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                status = 429
+            elif roll < self.rate_limit_rate + self.error_rate:
+                status = self._rng.choice((500, 503))
+            else:
+                status = 200
+
+        return {'latency_s': latency / 1000, 'status': status}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default backlog of 5 drops connections under load tests
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients closing pooled keep-alive connections are expected, not errors
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeLLMServer:
+    """Threaded HTTP server answering /openai/v1/chat/completions and /v1/chat/completions"""
+
+    def __init__(self, config: FakeLLMConfig = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize server (port 0 picks a free port)
+
+        Args:
+            config: Latency/error distribution
+            host: Bind address
+            port: Bind port
+        """
+        self.config = config or FakeLLMConfig()
+        self.requests_served = 0
+        self._httpd = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeLLMServer':
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake LLM server listening on {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        logger.info(f"Fake LLM server listening on {self.base_url}")
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)) or 0)
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+                    return
+
+                try:
+                    request = json.loads(body or b'{}')
+                except json.JSONDecodeError:
+                    self._send(400, {'error': {'message': 'invalid JSON', 'type': 'invalid_request_error'}})
+                    return
+
+                outcome = server.config.sample()
+                time.sleep(outcome['latency_s'])
+                server.requests_served += 1
+
+                if outcome['status'] == 429:
+                    headers = {}
+                    if server.config.retry_after is not None:
+                        headers['Retry-After'] = str(server.config.retry_after)
+                    self._send(429, {'error': {'message': 'rate limited', 'type': 'rate_limit_exceeded'}}, headers)
+                elif outcome['status'] != 200:
+                    self._send(outcome['status'], {'error': {'message': 'upstream error', 'type': 'server_error'}})
+                else:
+                    self._send(200, _completion(request, outcome['latency_s']))
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (deadline or a hedged request that lost the race)
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def _completion(request: Dict[str, any], latency_s: float) -> Dict[str, any]:
+    """OpenAI-format chat completion echoing the last user message"""
+    messages = request.get('messages') or [{}]
+    prompt_chars = sum(len(str(m.get('content', ''))) for m in messages)
+    content = f"[fake] Answer to: {str(messages[-1].get('content', ''))[:80]}"
+
+    return {
+        'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'fake-model'),
+        'system_fingerprint': 'fake',
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'logprobs': None,
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': prompt_chars // 4,
+            'completion_tokens': len(content) // 4,
+            'total_tokens': (prompt_chars + len(content)) // 4,
+            'total_time': round(latency_s, 4)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal spread")
+    parser.add_argument("--tail-prob", type=float, default=0.0, help="Probability of a slow-tail response")
+    parser.add_argument("--tail-ms", type=float, default=3000.0, help="Extra latency of slow-tail responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of HTTP 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of HTTP 500/503")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tail_prob=args.tail_prob,
+        tail_ms=args.tail_ms,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    FakeLLMServer(config, args.host, args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
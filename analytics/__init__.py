@@ -0,0 +1,77 @@
+"""
+Analytics - Shared data processing for the Smart City, Smart Health Care and University CMS notebooks
+"""
+
+from .records import (
+    Field,
+    Schema,
+    RecordParser,
+    RecordParseError,
+    ParseResult,
+    CategoryColumn,
+    ListColumn,
+    read_records,
+    TRAFFIC_SCHEMA,
+    PATIENT_SCHEMA,
+    STUDENT_SCHEMA
+)
+from .time_buckets import TimeScheme, parse_minutes, parse_hours, format_minutes, histogram, peak, TIME_WINDOWS
+from .traffic import TrafficAnalytics
+from .stream import TrafficStreamProcessor, ZoneWindow, WindowSnapshot, replay, DEFAULT_WINDOWS
+from .traffic_log import TrafficLog, convert_traffic_logs
+from .patient_risk import RiskEngine, RiskResult, Condition, Col, Flag, Tag, Bands, PATIENT_RULES, format_patient_risk
+from .patient_store import PatientStore, HashIndex, SortedIndex
+from .vitals import VitalsMonitor, risk_score
+from .cms import StudentAnalytics, marks_matrix, STUDENT_RULES
+from .cms_views import DepartmentViews, DepartmentView
+from .enrollment import CourseAssigner, EnrollmentResult
+
+__all__ = [
+    'Field',
+    'Schema',
+    'RecordParser',
+    'RecordParseError',
+    'ParseResult',
+    'CategoryColumn',
+    'ListColumn',
+    'read_records',
+    'TRAFFIC_SCHEMA',
+    'PATIENT_SCHEMA',
+    'STUDENT_SCHEMA',
+    'TimeScheme',
+    'parse_minutes',
+    'parse_hours',
+    'format_minutes',
+    'histogram',
+    'peak',
+    'TIME_WINDOWS',
+    'TrafficAnalytics',
+    'TrafficStreamProcessor',
+    'ZoneWindow',
+    'WindowSnapshot',
+    'replay',
+    'DEFAULT_WINDOWS',
+    'TrafficLog',
+    'convert_traffic_logs',
+    'RiskEngine',
+    'RiskResult',
+    'Condition',
+    'Col',
+    'Flag',
+    'Tag',
+    'Bands',
+    'PATIENT_RULES',
+    'format_patient_risk',
+    'PatientStore',
+    'HashIndex',
+    'SortedIndex',
+    'VitalsMonitor',
+    'risk_score',
+    'StudentAnalytics',
+    'marks_matrix',
+    'STUDENT_RULES',
+    'DepartmentViews',
+    'DepartmentView',
+    'CourseAssigner',
+    'EnrollmentResult'
+]
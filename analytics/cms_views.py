@@ -0,0 +1,294 @@
+"""
+CMS Views Module
+Materialized department summaries kept current on single-student insert, update and delete
+"""
+
+from typing import List, Dict, Tuple
+import heapq
+import logging
+import math
+
+import numpy as np
+
+from .records import ParseResult, ListColumn, encode_categories
+from .patient_risk import Col, Flag, Bands
+from .cms import StudentAnalytics, STUDENT_RULES, AT_RISK_ATTENDANCE
+
+logger = logging.getLogger(__name__)
+
+# Student state slots
+_NAME, _DEPT, _ATTENDANCE, _MARKS, _AVERAGE, _ORDER, _FEEDBACK = range(7)
+
+_SLOTS = {'name': _NAME, 'dept': _DEPT, 'attendance': _ATTENDANCE, 'marks': _MARKS, 'feedback': _FEEDBACK}
+
+
+class DepartmentView:
+    """Running sums, category counts and top-student heap of one department"""
+
+    def __init__(self, name: str, num_categories: int):
+        self.name = name
+        self.members = set()
+        self.attendance_sum = 0
+        self.average_sum = 0.0
+        self.graded = 0
+        self.at_risk = 0
+        self.category_counts = [0] * num_categories
+        # (-average, order, id) and (order, id); stale entries are dropped when they surface
+        self._top = []
+        self._first = []
+
+
+class DepartmentViews:
+    """Per-department Q2/Q5/Q8/Q9 views updated in O(log n) per changed student"""
+
+    def __init__(self, bands: Bands = None, at_risk_below: int = AT_RISK_ATTENDANCE):
+        """
+        Initialize empty views
+
+        Args:
+            bands: Grade bands over a student's average mark (defaults to the Q8 bands of STUDENT_RULES)
+            at_risk_below: Attendance below which a student is at risk (Q3)
+        """
+        self.bands = bands or STUDENT_RULES[0]
+        self.at_risk_below = at_risk_below
+        self.students = {}
+        self.departments = {}
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self.students)
+
+    @classmethod
+    def from_parsed(cls, parsed: ParseResult, **kwargs) -> "DepartmentViews":
+        """
+        Build views over records parsed with STUDENT_SCHEMA
+
+        Args:
+            parsed: Parsed students
+            **kwargs: Passed to DepartmentViews
+
+        Returns:
+            DepartmentViews
+        """
+        views = cls(**kwargs)
+        columns = zip(parsed['id'].tolist(), parsed['name'].tolist(), parsed['dept'].to_list(),
+                      parsed['attendance'].tolist(), parsed['marks'].to_lists(), parsed['feedback'].tolist())
+        for sid, name, dept, attendance, marks, feedback in columns:
+            views.insert({'id': sid, 'name': name, 'dept': dept, 'attendance': attendance,
+                          'marks': marks, 'feedback': feedback})
+        return views
+
+    def insert(self, student: Dict[str, any]):
+        """
+        Add a student after every existing one
+
+        Args:
+            student: Record with id, name, dept, attendance and marks (feedback optional)
+        """
+        sid = student['id']
+        if sid in self.students:
+            raise ValueError(f"Duplicate student id {sid}")
+        marks = list(student['marks'])
+        state = [student['name'], student['dept'], student['attendance'], marks, _average(marks),
+                 self._next_order, student.get('feedback')]
+        self._next_order += 1
+        self.students[sid] = state
+        self._add(sid, state)
+
+    def update(self, student_id: int, **changes):
+        """
+        Change a student's fields, keeping their position in record order
+
+        Args:
+            student_id: Student id
+            **changes: Any of name, dept, attendance, marks, feedback
+        """
+        state = self.students.get(student_id)
+        if state is None:
+            raise KeyError(f"No student with id {student_id}")
+        unknown = set(changes) - set(_SLOTS)
+        if unknown:
+            raise ValueError(f"Unknown student fields: {sorted(unknown)}")
+        self._remove(student_id, state)
+        for field, value in changes.items():
+            state[_SLOTS[field]] = list(value) if field == 'marks' else value
+        state[_AVERAGE] = _average(state[_MARKS])
+        self._add(student_id, state)
+
+    def upsert(self, student: Dict[str, any]):
+        """Insert a new student or replace an existing student's fields (e.g. during result uploads)"""
+        if student['id'] in self.students:
+            self.update(student['id'], **{field: student[field] for field in _SLOTS if field in student})
+        else:
+            self.insert(student)
+
+    def delete(self, student_id: int):
+        """Remove a student"""
+        state = self.students.pop(student_id)
+        self._remove(student_id, state)
+
+    def department_attendance(self) -> Dict[str, float]:
+        """Q2: average attendance per department"""
+        return {view.name: view.attendance_sum / len(view.members) for view in self._ordered()}
+
+    def department_average(self) -> Dict[str, float]:
+        """Mean of the student averages per department"""
+        return {view.name: view.average_sum / max(view.graded, 1) for view in self._ordered()}
+
+    def top_student(self, dept: str) -> Tuple[int, float]:
+        """
+        Q5: (student id, average) of a department's best student
+
+        Ties go to the student earliest in record order.
+        """
+        view = self.departments[dept]
+        entry = self._peek(view, view._top, lambda state: (_heap_key(state[_AVERAGE]), state[_ORDER]))
+        return entry[2], self.students[entry[2]][_AVERAGE]
+
+    def category_counts(self) -> Dict[str, Dict[str, int]]:
+        """Q8: students per grade category per department"""
+        labels = self.bands.labels
+        return {view.name: dict(zip(labels, view.category_counts)) for view in self._ordered()}
+
+    def at_risk_counts(self) -> Dict[str, int]:
+        """Q3: students below the attendance threshold per department"""
+        return {view.name: view.at_risk for view in self._ordered()}
+
+    def department_summary(self) -> Dict[str, Dict[str, any]]:
+        """Q9: students, average attendance and top student per department, in first-seen order"""
+        summary = {}
+        for view in self._ordered():
+            top, _ = self.top_student(view.name)
+            summary[view.name] = {
+                'students': len(view.members),
+                'avg_attendance': view.attendance_sum / len(view.members),
+                'top': self.students[top][_NAME]
+            }
+        return summary
+
+    def format(self) -> str:
+        """Q9 printed as the notebook prints it"""
+        lines = ["", "--- Q9: Department Summary Report ---"]
+        lines.extend(
+            f"Dept: {dept} | Students: {s['students']} | Avg Att: {s['avg_attendance']:.1f}% | Top: {s['top']}"
+            for dept, s in self.department_summary().items()
+        )
+        return "\n".join(lines)
+
+    def to_parsed(self) -> ParseResult:
+        """Current students in record order, shaped like STUDENT_SCHEMA output"""
+        items = sorted(self.students.items(), key=lambda item: item[1][_ORDER])
+        lengths = np.array([len(state[_MARKS]) for _, state in items], dtype=np.int64)
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        columns = {
+            'id': np.array([sid for sid, _ in items], dtype=np.int64),
+            'name': np.array([state[_NAME] for _, state in items], dtype=object),
+            'dept': encode_categories([state[_DEPT] for _, state in items]),
+            'attendance': np.array([state[_ATTENDANCE] for _, state in items], dtype=np.int64),
+            'marks': ListColumn(np.array([m for _, state in items for m in state[_MARKS]], dtype=np.int64), offsets),
+            'feedback': np.array([state[_FEEDBACK] for _, state in items], dtype=object)
+        }
+        return ParseResult(columns, np.arange(len(items), dtype=np.int64), [])
+
+    def recompute(self) -> StudentAnalytics:
+        """Full recomputation over the current students"""
+        rules = [self.bands, Flag('at_risk', Col('attendance') < self.at_risk_below)]
+        return StudentAnalytics(self.to_parsed(), rules)
+
+    def verify(self) -> List[str]:
+        """
+        Compare every view with a full recomputation
+
+        Returns:
+            Departments whose views disagree (empty when consistent)
+        """
+        full = self.recompute()
+        expected = full.department_summary()
+        at_risk = np.bincount(full.dept_codes[full.at_risk()], minlength=len(full.depts))
+        categories = full.categories()
+        category_counts = np.zeros((len(full.depts), len(self.bands.labels)), dtype=np.int64)
+        np.add.at(category_counts, (full.dept_codes, categories.codes), 1)
+        averages = full.department_average()
+
+        got = self.department_summary()
+        mismatched = [dept for dept in dict.fromkeys(list(expected) + list(got))
+                      if got.get(dept, {}).get('students') != expected.get(dept, {}).get('students')
+                      or got[dept]['top'] != expected[dept]['top']
+                      or not math.isclose(got[dept]['avg_attendance'], expected[dept]['avg_attendance'])]
+        if list(got) != list(expected):
+            mismatched.append("<department order>")
+        for code, dept in enumerate(full.depts):
+            view = self.departments.get(dept)
+            if view is None or dept in mismatched:
+                continue
+            if (view.at_risk != at_risk[code] or view.category_counts != category_counts[code].tolist()
+                    or not math.isclose(view.average_sum / max(view.graded, 1), averages[dept], abs_tol=1e-9)):
+                mismatched.append(dept)
+        if mismatched:
+            logger.error(f"Error verifying department views: {mismatched} differ from a full recompute")
+        return mismatched
+
+    def _add(self, sid: int, state: list):
+        view = self.departments.get(state[_DEPT])
+        if view is None:
+            view = self.departments[state[_DEPT]] = DepartmentView(state[_DEPT], len(self.bands.labels))
+        view.members.add(sid)
+        view.attendance_sum += state[_ATTENDANCE]
+        average = state[_AVERAGE]
+        if state[_MARKS]:
+            view.average_sum += average
+            view.graded += 1
+        view.at_risk += state[_ATTENDANCE] < self.at_risk_below
+        view.category_counts[self.bands.code(average)] += 1
+        heapq.heappush(view._top, (_heap_key(average), state[_ORDER], sid))
+        heapq.heappush(view._first, (state[_ORDER], sid))
+        if len(view._top) > 2 * len(view.members) + 64:
+            self._compact(view)
+
+    def _remove(self, sid: int, state: list):
+        """Take a student out of its department's sums; heap entries go stale and are pruned lazily"""
+        view = self.departments[state[_DEPT]]
+        view.members.discard(sid)
+        view.attendance_sum -= state[_ATTENDANCE]
+        if state[_MARKS]:
+            view.average_sum -= state[_AVERAGE]
+            view.graded -= 1
+        view.at_risk -= state[_ATTENDANCE] < self.at_risk_below
+        view.category_counts[self.bands.code(state[_AVERAGE])] -= 1
+        if not view.members:
+            view.average_sum = 0.0
+            view._top, view._first = [], []
+
+    def _peek(self, view: DepartmentView, heap: list, key) -> tuple:
+        """Top live entry of a department heap"""
+        while heap:
+            entry = heap[0]
+            state = self.students.get(entry[-1])
+            if state is not None and state[_DEPT] == view.name and key(state) == entry[:-1]:
+                return entry
+            heapq.heappop(heap)
+        raise KeyError(f"Department {view.name} has no students")
+
+    def _ordered(self) -> List[DepartmentView]:
+        """Non-empty departments ordered by their earliest student, as a recompute would list them"""
+        views = [view for view in self.departments.values() if view.members]
+        first = {view.name: self._peek(view, view._first, lambda state: (state[_ORDER],))[0] for view in views}
+        return sorted(views, key=lambda view: first[view.name])
+
+    def _compact(self, view: DepartmentView):
+        """Rebuild a department's heaps from its members"""
+        states = [(sid, self.students[sid]) for sid in view.members]
+        view._top = [(_heap_key(state[_AVERAGE]), state[_ORDER], sid) for sid, state in states]
+        view._first = [(state[_ORDER], sid) for sid, state in states]
+        heapq.heapify(view._top)
+        heapq.heapify(view._first)
+
+
+def _average(marks: List[int]) -> float:
+    return sum(marks) / len(marks) if marks else math.nan
+
+
+def _heap_key(average: float) -> float:
+    """Min-heap key for the best average; students without marks rank last"""
+    return math.inf if math.isnan(average) else -average
@@ -0,0 +1,333 @@
+"""
+Enrollment Module
+Capacity-constrained student-to-course assignment over ranked preferences as a min-cost maximum flow
+"""
+
+from typing import List, Dict, Tuple
+import heapq
+import logging
+
+import numpy as np
+
+from .records import ParseResult
+
+logger = logging.getLogger(__name__)
+
+
+class EnrollmentResult:
+    """Course of every student (-1 when unmatched) and the preference rank it came from"""
+
+    def __init__(self, courses: List[str], capacities: List[int], assigned: np.ndarray, ranks: np.ndarray):
+        """
+        Args:
+            courses: Course names
+            capacities: Seats per course
+            assigned: Course code per student, -1 when unmatched
+            ranks: 0-based preference rank of the assigned course, -1 when unmatched
+        """
+        self.courses = courses
+        self.capacities = capacities
+        self.assigned = assigned
+        self.ranks = ranks
+
+    def __len__(self):
+        return len(self.assigned)
+
+    def course_of(self, row: int) -> str:
+        """Course of a student (None when unmatched)"""
+        code = self.assigned[row]
+        return self.courses[code] if code >= 0 else None
+
+    def matched(self) -> np.ndarray:
+        """Rows of students with a course"""
+        return np.flatnonzero(self.assigned >= 0)
+
+    def unmatched(self) -> np.ndarray:
+        """Rows of students without a course"""
+        return np.flatnonzero(self.assigned < 0)
+
+    def enrolled(self, course: str) -> np.ndarray:
+        """Rows of the students in a course"""
+        return np.flatnonzero(self.assigned == self.courses.index(course))
+
+    def loads(self) -> Dict[str, Tuple[int, int]]:
+        """(students, seats) per course"""
+        counts = np.bincount(self.assigned[self.assigned >= 0], minlength=len(self.courses))
+        return {course: (int(count), seats) for course, count, seats in zip(self.courses, counts, self.capacities)}
+
+    def rank_counts(self) -> Dict[int, int]:
+        """Students per preference rank they were given (1 = first choice)"""
+        counts = np.bincount(self.ranks[self.ranks >= 0])
+        return {rank + 1: int(count) for rank, count in enumerate(counts) if count}
+
+    def total_rank(self) -> int:
+        """Sum of 0-based preference ranks over matched students (what the assignment minimizes)"""
+        return int(self.ranks[self.ranks >= 0].sum())
+
+    def format(self, parsed: ParseResult) -> str:
+        """Q10 enrollment lines as the notebook prints them, for records parsed with STUDENT_SCHEMA"""
+        names = parsed['name'].tolist()
+        lines = ["", "--- Q10: Student-Course Matching ---"]
+        lines.extend(f"{names[i]} is enrolled in {self.courses[self.assigned[i]]}" for i in self.matched().tolist())
+        missing = len(self.unmatched())
+        if missing:
+            lines.append(f"Note: {missing} students/courses could not be matched due to shortage.")
+        return "\n".join(lines)
+
+
+class CourseAssigner:
+    """Assign students to courses with seat limits: most students placed, then lowest total preference rank"""
+
+    def __init__(self, capacities: Dict[str, int]):
+        """
+        Initialize assigner
+
+        Args:
+            capacities: Course -> seats
+        """
+        if any(seats < 0 for seats in capacities.values()):
+            raise ValueError("Course capacities must be non-negative")
+        self.courses = list(capacities)
+        self.capacities = [int(seats) for seats in capacities.values()]
+        self._codes = {course: code for code, course in enumerate(self.courses)}
+
+    def assign(self, preferences: List[List[str]]) -> EnrollmentResult:
+        """
+        Compute a min-cost maximum flow from students through their preferred courses to the seats
+
+        Every student-to-course edge costs the preference rank. The flow starts from all first
+        choices that fit (already optimal, as they cost nothing) and grows by successive shortest
+        augmenting paths. Students are compressed away: a path is a chain of courses where an
+        unplaced student enters the first course, one student of each course moves to the next,
+        and the last course has a free seat, so shortest paths run over courses only. This is
+        primal-dual: a Dijkstra search over the sparse course adjacency prices the courses so
+        that every shortest path costs zero after reduction, and paths of zero reduced cost are
+        then augmented by depth-first search until none is left.
+
+        Args:
+            preferences: Ranked course names per student (index = student row)
+
+        Returns:
+            EnrollmentResult
+        """
+        prefs = [self._encode(row, p) for row, p in enumerate(preferences)]
+        n, num_courses = len(prefs), len(self.courses)
+        capacity = self.capacities
+        load = [0] * num_courses
+        assigned = [-1] * n
+        rank_of = [None] * n
+
+        # First choices in record order, while seats last
+        for s, p in enumerate(prefs):
+            if p and load[p[0]] < capacity[p[0]]:
+                assigned[s] = p[0]
+                load[p[0]] += 1
+
+        # Unplaced students by course, (rank, student); moves[a][b]: (rank change, student) for students in a
+        entry_heaps = [[] for _ in range(num_courses)]
+        move_heaps = [dict() for _ in range(num_courses)]
+        for s, p in enumerate(prefs):
+            if assigned[s] < 0:
+                for rank, course in enumerate(p):
+                    entry_heaps[course].append((rank, s))
+            elif len(p) > 1:
+                rank_of[s] = {course: rank for rank, course in enumerate(p)}
+                heaps = move_heaps[p[0]]
+                for rank, course in enumerate(p[1:], 1):
+                    heaps.setdefault(course, []).append((rank, s))
+        for heap in entry_heaps:
+            heapq.heapify(heap)
+        for heaps in move_heaps:
+            for heap in heaps.values():
+                heapq.heapify(heap)
+
+        # Course-level residual graph: entering cost per course and finite move costs per course pair
+        graph = _CourseGraph(num_courses)
+        for course in range(num_courses):
+            graph.entry[course] = self._top_entry(entry_heaps[course], assigned)
+            graph.free[course] = load[course] < capacity[course]
+            for other, heap in move_heaps[course].items():
+                graph.set_move(course, other, self._top_move(heap, course, assigned))
+
+        augmentations = phases = 0
+        while True:
+            path = graph.admissible_path()
+            if path is None:
+                # No zero reduced-cost path left: reprice, or stop when no free seat is reachable
+                if not graph.reprice():
+                    break
+                phases += 1
+                continue
+            self._augment(path, prefs, assigned, rank_of, load, entry_heaps, move_heaps, graph)
+            augmentations += 1
+
+        assigned = np.array(assigned, dtype=np.int64)
+        ranks = np.full(n, -1, dtype=np.int64)
+        for s in np.flatnonzero(assigned >= 0).tolist():
+            ranks[s] = prefs[s].index(assigned[s])
+        logger.info(f"Assigned {int((assigned >= 0).sum())} of {n} students after {augmentations} augmenting paths "
+                    f"in {phases} pricing phases")
+        return EnrollmentResult(self.courses, self.capacities, assigned, ranks)
+
+    def _encode(self, row: int, courses: List[str]) -> List[int]:
+        """Course codes of one student's preferences, duplicates dropped"""
+        try:
+            return list(dict.fromkeys(self._codes[course] for course in courses))
+        except KeyError as e:
+            logger.error(f"Error reading preferences of student row {row}: unknown course {str(e)}")
+            raise
+
+    def _augment(self, path: List[int], prefs, assigned, rank_of, load, entry_heaps, move_heaps, graph):
+        """Shift one student into the first course of a path, and along every move, and refresh the touched costs"""
+        # Pick every student first: a student moved into a course must not be moved again on this path
+        movers = [(heapq.heappop(entry_heaps[path[0]])[1], None, path[0])]
+        for u, v in zip(path, path[1:]):
+            movers.append((heapq.heappop(move_heaps[u][v])[1], u, v))
+
+        entered = set()
+        touched = set()
+        for s, u, v in movers:
+            p = prefs[s]
+            if u is None:
+                if rank_of[s] is None:
+                    rank_of[s] = {course: rank for rank, course in enumerate(p)}
+                entered.update(p)
+            else:
+                load[u] -= 1
+                touched.update((u, course) for course in p if course != u)
+            assigned[s] = v
+            load[v] += 1
+            rank = rank_of[s][v]
+            heaps = move_heaps[v]
+            for course in p:
+                if course != v:
+                    heapq.heappush(heaps.setdefault(course, []), (rank_of[s][course] - rank, s))
+                    touched.add((v, course))
+
+        last = path[-1]
+        graph.free[last] = load[last] < self.capacities[last]
+        for course in entered:
+            graph.entry[course] = self._top_entry(entry_heaps[course], assigned)
+        for u, v in touched:
+            graph.set_move(u, v, self._top_move(move_heaps[u][v], u, assigned))
+
+    @staticmethod
+    def _top_entry(heap: list, assigned: List[int]) -> float:
+        """Cheapest rank among still-unplaced students, dropping placed ones"""
+        while heap and assigned[heap[0][1]] >= 0:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else np.inf
+
+    @staticmethod
+    def _top_move(heap: list, course: int, assigned: List[int]) -> float:
+        """Cheapest rank change among students still in course, dropping those who left"""
+        while heap and assigned[heap[0][1]] != course:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else np.inf
+
+
+class _CourseGraph:
+    """Residual course graph with course potentials; the pool (source) sits at potential 0"""
+
+    def __init__(self, num_courses: int):
+        self.entry = [np.inf] * num_courses
+        self.free = [False] * num_courses
+        self.moves = [dict() for _ in range(num_courses)]
+        self.potential = [0] * num_courses
+        self.target_potential = 0
+        self._starts = []
+        self._dead = set()
+
+    def set_move(self, u: int, v: int, cost: float):
+        if cost == np.inf:
+            self.moves[u].pop(v, None)
+        else:
+            self.moves[u][v] = cost
+
+    def reprice(self) -> bool:
+        """
+        Dijkstra over reduced costs from the pool, stopping at the first free seat
+
+        Nodes not settled before the target move up by its distance, which keeps every
+        reduced cost non-negative and makes each shortest path cost zero.
+
+        Returns:
+            False when no free seat is reachable (the flow is maximal)
+        """
+        potential, moves, free = self.potential, self.moves, self.free
+        num_courses = len(potential)
+        target = num_courses
+        dist = [np.inf] * (num_courses + 1)
+        heap = []
+        for course, cost in enumerate(self.entry):
+            if cost < np.inf:
+                dist[course] = cost - potential[course]
+                heap.append((dist[course], course))
+        heapq.heapify(heap)
+
+        done = [False] * (num_courses + 1)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u == target:
+                break
+            base = d + potential[u]
+            if free[u] and base - self.target_potential < dist[target]:
+                dist[target] = base - self.target_potential
+                heapq.heappush(heap, (dist[target], target))
+            for v, cost in moves[u].items():
+                d_v = base + cost - potential[v]
+                if d_v < dist[v]:
+                    dist[v] = d_v
+                    heapq.heappush(heap, (d_v, v))
+
+        if not done[target]:
+            return False
+        reach = dist[target]
+        for course in range(num_courses):
+            potential[course] += min(dist[course], reach)
+        self.target_potential += reach
+        self._starts = [course for course in range(num_courses) if self.entry[course] == potential[course]]
+        self._dead = set()
+        return True
+
+    def admissible_path(self) -> List[int]:
+        """
+        Depth-first search for a chain of courses from the pool to a free seat using only
+        zero reduced-cost edges (a shortest path at the current prices)
+
+        Courses found to lead nowhere stay pruned until the next reprice; a path missed that
+        way only costs an extra reprice.
+
+        Returns:
+            Courses on the path, or None
+        """
+        potential, moves, free, dead = self.potential, self.moves, self.free, self._dead
+        target_potential = self.target_potential
+        starts = self._starts
+        while starts:
+            start = starts[-1]
+            # Entry costs only rise, so a course that stops being admissible is dropped for the phase
+            if start in dead or self.entry[start] != potential[start]:
+                starts.pop()
+                continue
+            stack = [start]
+            edges = [iter(moves[start].items())]
+            on_path = {start}
+            while stack:
+                u = stack[-1]
+                if free[u] and potential[u] == target_potential:
+                    return stack
+                for v, cost in edges[-1]:
+                    if v not in dead and v not in on_path and cost + potential[u] == potential[v]:
+                        stack.append(v)
+                        edges.append(iter(moves[v].items()))
+                        on_path.add(v)
+                        break
+                else:
+                    dead.add(u)
+                    on_path.discard(stack.pop())
+                    edges.pop()
+        return None
@@ -0,0 +1,335 @@
+"""
+Patient Risk Module
+Declarative threshold rules over patient vitals, evaluated as NumPy masks over a whole cohort
+"""
+
+from typing import List, Dict, Tuple, Iterable, Union
+from bisect import bisect_right
+import logging
+
+import numpy as np
+
+from .records import ParseResult, CategoryColumn
+
+logger = logging.getLogger(__name__)
+
+_COMPARISONS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+
+class Condition:
+    """Boolean expression over cohort columns; combine with &, | and ~"""
+
+    def mask(self, columns: Dict[str, any]) -> np.ndarray:
+        """
+        Evaluate over every row
+
+        Args:
+            columns: Name -> np.ndarray or CategoryColumn (earlier rule outputs included)
+
+        Returns:
+            Boolean mask
+        """
+        raise NotImplementedError
+
+    def __and__(self, other: "Condition") -> "Condition":
+        return _Combined(np.logical_and, [self, other])
+
+    def __or__(self, other: "Condition") -> "Condition":
+        return _Combined(np.logical_or, [self, other])
+
+    def __invert__(self) -> "Condition":
+        return _Not(self)
+
+
+class _Compare(Condition):
+    def __init__(self, column: str, op: str, value):
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def mask(self, columns: Dict[str, any]) -> np.ndarray:
+        column = columns[self.column]
+        if isinstance(column, CategoryColumn):
+            if self.op not in ('==', '!='):
+                raise ValueError(f"'{self.column}' is categorical; only == and != apply")
+            return _COMPARISONS[self.op](column.codes, column.code_of(self.value))
+        return _COMPARISONS[self.op](column, self.value)
+
+
+class _IsIn(Condition):
+    def __init__(self, column: str, values: list):
+        self.column = column
+        self.values = values
+
+    def mask(self, columns: Dict[str, any]) -> np.ndarray:
+        column = columns[self.column]
+        if isinstance(column, CategoryColumn):
+            # Membership over the few categories, then one lookup per row
+            member = np.isin(np.array(column.categories, dtype=object), np.array(self.values, dtype=object))
+            return member[column.codes] if len(member) else np.zeros(len(column), dtype=bool)
+        return np.isin(column, self.values)
+
+
+class _Combined(Condition):
+    def __init__(self, combine, parts: List[Condition]):
+        self.combine = combine
+        self.parts = parts
+
+    def mask(self, columns: Dict[str, any]) -> np.ndarray:
+        result = self.parts[0].mask(columns)
+        for part in self.parts[1:]:
+            result = self.combine(result, part.mask(columns))
+        return result
+
+
+class _Not(Condition):
+    def __init__(self, part: Condition):
+        self.part = part
+
+    def mask(self, columns: Dict[str, any]) -> np.ndarray:
+        return ~self.part.mask(columns)
+
+
+class Col:
+    """Column reference that builds comparisons: Col('hr') > 100, Col('feedback').isin(['Fair', 'Critical'])"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __lt__(self, value) -> Condition:
+        return _Compare(self.name, '<', value)
+
+    def __le__(self, value) -> Condition:
+        return _Compare(self.name, '<=', value)
+
+    def __gt__(self, value) -> Condition:
+        return _Compare(self.name, '>', value)
+
+    def __ge__(self, value) -> Condition:
+        return _Compare(self.name, '>=', value)
+
+    def __eq__(self, value) -> Condition:
+        return _Compare(self.name, '==', value)
+
+    def __ne__(self, value) -> Condition:
+        return _Compare(self.name, '!=', value)
+
+    __hash__ = None
+
+    def isin(self, values: Iterable) -> Condition:
+        return _IsIn(self.name, list(values))
+
+    def between(self, low, high) -> Condition:
+        """low <= value <= high"""
+        return _Compare(self.name, '>=', low) & _Compare(self.name, '<=', high)
+
+    def is_true(self) -> Condition:
+        """The column (e.g. an earlier Flag) is set"""
+        return _Compare(self.name, '!=', 0)
+
+
+class Flag:
+    """Rule producing a boolean column"""
+
+    def __init__(self, name: str, condition: Condition):
+        """
+        Args:
+            name: Output column name
+            condition: Rows to flag
+        """
+        self.name = name
+        self.condition = condition
+
+    def evaluate(self, columns: Dict[str, any]) -> np.ndarray:
+        return self.condition.mask(columns)
+
+
+class Tag:
+    """Rule labelling each row by whether a condition holds"""
+
+    def __init__(self, name: str, condition: Condition, true_label: str, false_label: str):
+        """
+        Args:
+            name: Output column name
+            condition: Rows that get true_label
+            true_label: Label where the condition holds
+            false_label: Label elsewhere
+        """
+        self.name = name
+        self.condition = condition
+        self.labels = [true_label, false_label]
+
+    def evaluate(self, columns: Dict[str, any]) -> CategoryColumn:
+        return CategoryColumn(np.where(self.condition.mask(columns), 0, 1).astype(np.int32), self.labels)
+
+
+class Bands:
+    """Rule grading a numeric column into labelled bands"""
+
+    def __init__(self, name: str, column: str, bands: List[Tuple[float, str]], above: str, missing: str = None):
+        """
+        Args:
+            name: Output column name
+            column: Numeric input column
+            bands: (exclusive upper bound, label) in ascending order
+            above: Label for values at or above the last bound
+            missing: Label for NaN values (the last label); without one, NaN values are an error
+        """
+        bounds = [bound for bound, _ in bands]
+        if bounds != sorted(bounds):
+            raise ValueError(f"Band bounds of '{name}' must be ascending")
+        self.name = name
+        self.column = column
+        self.bounds = np.array(bounds)
+        self._bound_list = bounds
+        self.labels = [label for _, label in bands] + [above]
+        self.missing = missing
+        if missing is not None:
+            self.labels.append(missing)
+
+    def evaluate(self, columns: Dict[str, any]) -> CategoryColumn:
+        values = _numeric(columns, self.column)
+        codes = np.searchsorted(self.bounds, values, side="right").astype(np.int32)
+        # searchsorted puts NaN after every bound; it must not land in the top band
+        if np.issubdtype(np.asarray(values).dtype, np.floating):
+            nan = np.isnan(values)
+            if nan.any():
+                codes[nan] = self._missing_code()
+        return CategoryColumn(codes, self.labels)
+
+    def code(self, value: float) -> int:
+        """Label index of a single value (for incremental callers)"""
+        if value != value:
+            return self._missing_code()
+        return bisect_right(self._bound_list, value)
+
+    def _missing_code(self) -> int:
+        if self.missing is None:
+            raise ValueError(f"'{self.column}' has NaN values; give Bands '{self.name}' a missing label")
+        return len(self.labels) - 1
+
+
+Rule = Union[Flag, Tag, Bands]
+
+# The Smart Health Care notebook's Q4, Q7, Q11, Q15 and Q17 rules
+PATIENT_RULES = [
+    Flag('high_hr', Col('hr') > 100),
+    Flag('high_bp', (Col('bp_systolic') > 140) | (Col('bp_diastolic') > 90)),
+    Bands('hr_grade', 'hr', [(70, "A (Excellent)"), (90, "B (Stable)"), (111, "C (Concern)")], above="D (High Risk)"),
+    Tag('condition', Col('high_bp').is_true() | (Col('feedback') == "Critical"), "Severe", "Normal"),
+    Flag('underrated', (Col('hr') < 90) & Col('feedback').isin(["Fair", "Critical"]))
+]
+
+
+class RiskResult:
+    """Rule outputs for a cohort: boolean flags and labelled tag/band columns"""
+
+    def __init__(self, outputs: Dict[str, any], num_rows: int):
+        self.outputs = outputs
+        self.num_rows = num_rows
+
+    def __getitem__(self, name: str):
+        return self.outputs[name]
+
+    def rows(self, name: str, label: str = None) -> np.ndarray:
+        """
+        Row indices flagged by a rule (or given a label by a tag/band rule)
+
+        Args:
+            name: Rule name
+            label: Label to select for Tag and Bands rules
+
+        Returns:
+            Sorted row indices
+        """
+        output = self.outputs[name]
+        if isinstance(output, CategoryColumn):
+            if label is None:
+                raise ValueError(f"Rule '{name}' produces labels; pass one of {output.categories}")
+            return np.flatnonzero(output.codes == output.code_of(label))
+        return np.flatnonzero(output)
+
+    def counts(self) -> Dict[str, any]:
+        """Flagged rows per flag and rows per label per tag/band"""
+        counts = {}
+        for name, output in self.outputs.items():
+            if isinstance(output, CategoryColumn):
+                per_label = np.bincount(output.codes, minlength=len(output.categories))
+                counts[name] = dict(zip(output.categories, per_label.tolist()))
+            else:
+                counts[name] = int(np.count_nonzero(output))
+        return counts
+
+
+class RiskEngine:
+    """Evaluate an ordered rule list over columnar patient records"""
+
+    def __init__(self, rules: List[Rule] = None):
+        """
+        Initialize engine
+
+        Args:
+            rules: Rules in evaluation order; a rule may read the outputs of earlier
+                rules by name (defaults to PATIENT_RULES)
+        """
+        self.rules = PATIENT_RULES if rules is None else rules
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate rule names")
+
+    def evaluate(self, parsed: Union[ParseResult, Dict[str, any]]) -> RiskResult:
+        """
+        Apply every rule to the whole cohort
+
+        Args:
+            parsed: Records parsed with PATIENT_SCHEMA (bp already split into bp_systolic and
+                bp_diastolic), or a dictionary of columns
+
+        Returns:
+            RiskResult with one output per rule
+        """
+        columns = dict(parsed.columns if isinstance(parsed, ParseResult) else parsed)
+        num_rows = len(parsed) if isinstance(parsed, ParseResult) else len(next(iter(columns.values()), []))
+        outputs = {}
+        for rule in self.rules:
+            try:
+                outputs[rule.name] = columns[rule.name] = rule.evaluate(columns)
+            except KeyError as e:
+                logger.error(f"Error evaluating rule '{rule.name}': missing column {str(e)}")
+                raise
+        return RiskResult(outputs, num_rows)
+
+
+def format_patient_risk(parsed: ParseResult, result: RiskResult) -> str:
+    """Q4, Q7, Q11, Q15 and Q17 of the notebook, printed as the notebook prints them"""
+    names = parsed['name'].tolist()
+    hr = parsed['hr'].tolist()
+    bp = [f"{s}/{d}" for s, d in zip(parsed['bp_systolic'].tolist(), parsed['bp_diastolic'].tolist())]
+    grades = result['hr_grade'].to_list()
+    tags = result['condition'].to_list()
+
+    lines = ["", "Q4 High Risk (HR > 100):"]
+    lines.extend(f" - {names[i]} (HR: {hr[i]})" for i in result.rows('high_hr').tolist())
+    lines.extend(["", "Q7 High BP Alert (>140/90):"])
+    lines.extend(f" - {names[i]} has BP {bp[i]}" for i in result.rows('high_bp').tolist())
+    lines.extend(["", "Q11 Health Grades:"])
+    lines.extend(f" - {name}: {grade}" for name, grade in zip(names, grades))
+    lines.extend(["", "Q15 Condition Tags:"])
+    lines.extend(f" - {name}: {tag}" for name, tag in zip(names, tags))
+    lines.extend(["", "Q17 Underrated Cases (Normal HR but Bad Feedback):"])
+    lines.extend(f" - {names[i]}" for i in result.rows('underrated').tolist())
+    return "\n".join(lines)
+
+
+def _numeric(columns: Dict[str, any], name: str) -> np.ndarray:
+    column = columns[name]
+    if isinstance(column, CategoryColumn):
+        raise ValueError(f"'{name}' is categorical, not numeric")
+    return column
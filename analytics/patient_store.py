@@ -0,0 +1,457 @@
+"""
+Patient Store Module
+In-memory columnar patient table with hash and sorted secondary indexes maintained on insert and update
+"""
+
+from typing import List, Dict, Tuple, Iterable
+from bisect import bisect_left, bisect_right, insort
+import logging
+
+import numpy as np
+
+from .records import ParseResult, CategoryColumn
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = ('id', 'age', 'hr', 'bp_systolic', 'bp_diastolic', 'glucose')
+CATEGORY_FIELDS = ('doctor', 'feedback')
+HASH_INDEXED = ('doctor', 'feedback')
+SORTED_INDEXED = ('age', 'glucose', 'hr')
+
+# Sums kept per hash-index key (per-doctor average HR and glucose without a scan)
+_KEY_SUMS = ('hr', 'glucose')
+
+
+class HashIndex:
+    """Value -> row set, with a row count and running sums per value"""
+
+    def __init__(self, sum_fields: Tuple[str, ...] = _KEY_SUMS):
+        self.sum_fields = sum_fields
+        self.rows = {}
+        self.sums = {}
+
+    def build(self, keys: List[str], codes: np.ndarray, sums: Dict[str, np.ndarray]):
+        """Bulk-load rows 0..len(codes)-1 from dictionary codes"""
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for group in np.split(order, bounds) if len(order) else []:
+            key = keys[codes[group[0]]]
+            self.rows.setdefault(key, set()).update(group.tolist())
+            totals = self.sums.setdefault(key, dict.fromkeys(self.sum_fields, 0))
+            for field in self.sum_fields:
+                totals[field] += int(sums[field][group].sum())
+
+    def add(self, key: str, row: int, values: Dict[str, int]):
+        self.rows.setdefault(key, set()).add(row)
+        totals = self.sums.setdefault(key, dict.fromkeys(self.sum_fields, 0))
+        for field in self.sum_fields:
+            totals[field] += values[field]
+
+    def remove(self, key: str, row: int, values: Dict[str, int]):
+        rows = self.rows[key]
+        rows.discard(row)
+        totals = self.sums[key]
+        for field in self.sum_fields:
+            totals[field] -= values[field]
+        if not rows:
+            del self.rows[key]
+            del self.sums[key]
+
+    def adjust(self, key: str, field: str, delta: int):
+        """Apply a change of a summed field for a row under key"""
+        self.sums[key][field] += delta
+
+    def lookup(self, key: str) -> np.ndarray:
+        """Sorted rows holding key"""
+        rows = self.rows.get(key, ())
+        return np.sort(np.fromiter(rows, dtype=np.int64, count=len(rows)))
+
+    def count(self, key: str) -> int:
+        return len(self.rows.get(key, ()))
+
+
+class SortedIndex:
+    """(value, row) pairs in a sorted array plus a small sorted insert buffer; removals are tombstoned"""
+
+    def __init__(self, merge_threshold: int = 8192):
+        """
+        Args:
+            merge_threshold: Buffered inserts (or tombstones) before the main arrays are rebuilt
+        """
+        self.merge_threshold = merge_threshold
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.alive = np.ones(0, dtype=bool)
+        self.dead = 0
+        self._delta = []
+
+    def __len__(self):
+        return len(self.keys) - self.dead + len(self._delta)
+
+    def build(self, values: np.ndarray, rows: np.ndarray):
+        """Bulk-load pairs, merged with what the index already holds"""
+        keys = np.concatenate([self.keys[self.alive], np.asarray(values, dtype=np.int64)] +
+                              ([np.array([v for v, _ in self._delta], dtype=np.int64)] if self._delta else []))
+        all_rows = np.concatenate([self.rows[self.alive], np.asarray(rows, dtype=np.int64)] +
+                                  ([np.array([r for _, r in self._delta], dtype=np.int64)] if self._delta else []))
+        order = np.lexsort((all_rows, keys))
+        self.keys, self.rows = keys[order], all_rows[order]
+        self.alive = np.ones(len(self.keys), dtype=bool)
+        self.dead = 0
+        self._delta = []
+
+    def insert(self, value: int, row: int):
+        insort(self._delta, (value, row))
+        if len(self._delta) > self.merge_threshold:
+            self.build(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def remove(self, value: int, row: int):
+        i = bisect_left(self._delta, (value, row))
+        if i < len(self._delta) and self._delta[i] == (value, row):
+            del self._delta[i]
+            return
+        # Equal keys are ordered by row, so the pair is found by binary search
+        lo = np.searchsorted(self.keys, value, side="left")
+        hi = np.searchsorted(self.keys, value, side="right")
+        pos = lo + np.searchsorted(self.rows[lo:hi], row)
+        if pos >= hi or self.rows[pos] != row or not self.alive[pos]:
+            raise KeyError(f"({value}, {row}) not in index")
+        self.alive[pos] = False
+        self.dead += 1
+        if self.dead > max(self.merge_threshold, len(self.keys) // 4):
+            self.build(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def range(self, low: int = None, high: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pairs with low <= value <= high
+
+        Returns:
+            (values, rows) in value order, ties by row
+        """
+        lo = 0 if low is None else np.searchsorted(self.keys, low, side="left")
+        hi = len(self.keys) if high is None else np.searchsorted(self.keys, high, side="right")
+        keys, rows = self.keys[lo:hi], self.rows[lo:hi]
+        if self.dead:
+            alive = self.alive[lo:hi]
+            keys, rows = keys[alive], rows[alive]
+        if not self._delta:
+            return keys, rows
+        d_lo = 0 if low is None else bisect_left(self._delta, (low, -1))
+        d_hi = len(self._delta) if high is None else bisect_right(self._delta, (high, np.iinfo(np.int64).max))
+        if d_lo == d_hi:
+            return keys, rows
+        extra = np.array(self._delta[d_lo:d_hi], dtype=np.int64)
+        keys, rows = np.concatenate([keys, extra[:, 0]]), np.concatenate([rows, extra[:, 1]])
+        order = np.lexsort((rows, keys))
+        return keys[order], rows[order]
+
+    def count(self, low: int = None, high: int = None) -> int:
+        """Number of pairs with low <= value <= high"""
+        lo = 0 if low is None else int(np.searchsorted(self.keys, low, side="left"))
+        hi = len(self.keys) if high is None else int(np.searchsorted(self.keys, high, side="right"))
+        count = hi - lo - (int(np.count_nonzero(~self.alive[lo:hi])) if self.dead else 0)
+        d_lo = 0 if low is None else bisect_left(self._delta, (low, -1))
+        d_hi = len(self._delta) if high is None else bisect_right(self._delta, (high, np.iinfo(np.int64).max))
+        return count + d_hi - d_lo
+
+    def top_k(self, k: int, largest: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k largest (or smallest) pairs; ties go to the lower row, as max()/min() and a
+        stable sort over insertion order would pick
+
+        Returns:
+            (values, rows), best first
+        """
+        # Walk whole runs of equal values from the best end; each run is already in row order,
+        # so only its first live rows can make the cut
+        keys, rows = [], []
+        needed, pos = k, len(self.keys) if largest else 0
+        while needed > 0 and (pos > 0 if largest else pos < len(self.keys)):
+            if largest:
+                value = self.keys[pos - 1]
+                lo, hi = int(np.searchsorted(self.keys, value, side="left")), pos
+                pos = lo
+            else:
+                value = self.keys[pos]
+                lo, hi = pos, int(np.searchsorted(self.keys, value, side="right"))
+                pos = hi
+            run = self.rows[lo:hi][self.alive[lo:hi]] if self.dead else self.rows[lo:hi]
+            run = run[:needed]
+            keys.append(np.full(len(run), value, dtype=np.int64))
+            rows.append(run)
+            needed -= len(run)
+        keys = np.concatenate(keys) if keys else self.keys[:0]
+        rows = np.concatenate(rows) if rows else self.rows[:0]
+        if self._delta:
+            extra, pos = [], len(self._delta) if largest else 0
+            while len(extra) < k and (pos > 0 if largest else pos < len(self._delta)):
+                if largest:
+                    lo = bisect_left(self._delta, (self._delta[pos - 1][0], -1))
+                    extra.extend(self._delta[lo:min(pos, lo + k - len(extra))])
+                    pos = lo
+                else:
+                    hi = bisect_right(self._delta, (self._delta[pos][0], np.iinfo(np.int64).max))
+                    extra.extend(self._delta[pos:min(hi, pos + k - len(extra))])
+                    pos = hi
+            extra = np.array(extra, dtype=np.int64)
+            keys, rows = np.concatenate([keys, extra[:, 0]]), np.concatenate([rows, extra[:, 1]])
+        order = np.lexsort((rows, -keys if largest else keys))[:k]
+        return keys[order], rows[order]
+
+
+class PatientStore:
+    """Patient table with hash indexes on doctor/feedback and sorted indexes on age, glucose and HR"""
+
+    def __init__(self, capacity: int = 1024, merge_threshold: int = 8192):
+        """
+        Initialize an empty store
+
+        Args:
+            capacity: Initial row capacity (columns double as needed)
+            merge_threshold: Buffered sorted-index changes before an index is rebuilt
+        """
+        self.num_rows = 0
+        self.columns = {field: np.zeros(capacity, dtype=np.int64) for field in NUMERIC_FIELDS}
+        self.columns.update({field: np.zeros(capacity, dtype=np.int32) for field in CATEGORY_FIELDS})
+        self.names = []
+        self.categories = {field: [] for field in CATEGORY_FIELDS}
+        self._codes = {field: {} for field in CATEGORY_FIELDS}
+        self._rows_by_id = {}
+        self.hash_indexes = {field: HashIndex() for field in HASH_INDEXED}
+        self.sorted_indexes = {field: SortedIndex(merge_threshold) for field in SORTED_INDEXED}
+
+    def __len__(self):
+        return self.num_rows
+
+    @classmethod
+    def from_parsed(cls, parsed: ParseResult, merge_threshold: int = 8192) -> "PatientStore":
+        """
+        Bulk-load records parsed with PATIENT_SCHEMA
+
+        Args:
+            parsed: Parsed patients
+            merge_threshold: Buffered sorted-index changes before an index is rebuilt
+
+        Returns:
+            PatientStore
+        """
+        store = cls(capacity=max(len(parsed), 1), merge_threshold=merge_threshold)
+        store.insert_many(parsed)
+        return store
+
+    def insert_many(self, parsed: ParseResult) -> np.ndarray:
+        """
+        Append a parsed batch, updating every index with vectorized bulk merges
+
+        Args:
+            parsed: Records parsed with PATIENT_SCHEMA
+
+        Returns:
+            Row ids of the new patients
+        """
+        n = len(parsed)
+        first = self.num_rows
+        rows = np.arange(first, first + n, dtype=np.int64)
+        ids = parsed['id'].tolist()
+        duplicates = [i for i in ids if i in self._rows_by_id]
+        if duplicates or len(set(ids)) != n:
+            raise ValueError(f"Duplicate patient ids (e.g. {duplicates[:3] or ids[:3]})")
+
+        self._reserve(first + n)
+        for field in NUMERIC_FIELDS:
+            self.columns[field][first:first + n] = parsed[field]
+        codes = {}
+        for field in CATEGORY_FIELDS:
+            column = parsed[field]
+            remap = np.array([self._code(field, value) for value in column.categories], dtype=np.int32)
+            codes[field] = remap[column.codes] if len(remap) else np.zeros(n, dtype=np.int32)
+            self.columns[field][first:first + n] = codes[field]
+        self.names.extend(parsed['name'].tolist())
+        self._rows_by_id.update(zip(ids, rows.tolist()))
+        self.num_rows += n
+
+        sums = {field: parsed[field] for field in _KEY_SUMS}
+        for field, index in self.hash_indexes.items():
+            batch = HashIndex(index.sum_fields)
+            batch.build(self.categories[field], codes[field], sums)
+            for key, key_rows in batch.rows.items():
+                index.rows.setdefault(key, set()).update(r + first for r in key_rows)
+                totals = index.sums.setdefault(key, dict.fromkeys(index.sum_fields, 0))
+                for name, value in batch.sums[key].items():
+                    totals[name] += value
+        for field, index in self.sorted_indexes.items():
+            index.build(parsed[field], rows)
+        logger.info(f"Loaded {n} patients ({self.num_rows} total)")
+        return rows
+
+    def insert(self, patient: Dict[str, any]) -> int:
+        """
+        Add one patient
+
+        Args:
+            patient: Record as RecordParser.parse_record returns it (id, name, age, doctor,
+                hr, bp_systolic, bp_diastolic, glucose, feedback)
+
+        Returns:
+            Row id
+        """
+        if patient['id'] in self._rows_by_id:
+            raise ValueError(f"Duplicate patient id {patient['id']}")
+        row = self.num_rows
+        self._reserve(row + 1)
+        for field in NUMERIC_FIELDS:
+            self.columns[field][row] = patient[field]
+        for field in CATEGORY_FIELDS:
+            self.columns[field][row] = self._code(field, patient[field])
+        self.names.append(patient['name'])
+        self._rows_by_id[patient['id']] = row
+        self.num_rows += 1
+
+        sums = {field: int(patient[field]) for field in _KEY_SUMS}
+        for field, index in self.hash_indexes.items():
+            index.add(patient[field], row, sums)
+        for field, index in self.sorted_indexes.items():
+            index.insert(int(patient[field]), row)
+        return row
+
+    def update(self, patient_id: int, **changes) -> int:
+        """
+        Change fields of a patient, moving its index entries
+
+        Args:
+            patient_id: Patient id
+            **changes: Field -> new value (any field but id)
+
+        Returns:
+            Row id
+        """
+        row = self._rows_by_id.get(patient_id)
+        if row is None:
+            raise KeyError(f"No patient with id {patient_id}")
+        if 'id' in changes:
+            raise ValueError("Patient ids cannot be changed")
+        unknown = set(changes) - set(NUMERIC_FIELDS) - set(CATEGORY_FIELDS) - {'name'}
+        if unknown:
+            raise ValueError(f"Unknown patient fields: {sorted(unknown)}")
+
+        old = self.get_row(row)
+        for field, index in self.hash_indexes.items():
+            if field in changes and changes[field] != old[field]:
+                index.remove(old[field], row, old)
+                index.add(changes[field], row, {**old, **changes})
+            else:
+                for name in index.sum_fields:
+                    if name in changes:
+                        index.adjust(old[field], name, int(changes[name]) - old[name])
+        for field, index in self.sorted_indexes.items():
+            if field in changes and changes[field] != old[field]:
+                index.remove(old[field], row)
+                index.insert(int(changes[field]), row)
+
+        for field, value in changes.items():
+            if field == 'name':
+                self.names[row] = value
+            elif field in CATEGORY_FIELDS:
+                self.columns[field][row] = self._code(field, value)
+            else:
+                self.columns[field][row] = value
+        return row
+
+    def get(self, patient_id: int) -> Dict[str, any]:
+        """Patient record by id"""
+        return self.get_row(self._rows_by_id[patient_id])
+
+    def get_row(self, row: int) -> Dict[str, any]:
+        """Patient record by row id"""
+        record = {'name': self.names[row]}
+        for field in NUMERIC_FIELDS:
+            record[field] = int(self.columns[field][row])
+        for field in CATEGORY_FIELDS:
+            record[field] = self.categories[field][self.columns[field][row]]
+        return record
+
+    def records(self, rows: Iterable[int]) -> List[Dict[str, any]]:
+        """Patient records of several rows"""
+        return [self.get_row(row) for row in np.asarray(rows).tolist()]
+
+    def where(self, field: str, value: str) -> np.ndarray:
+        """
+        Rows with a doctor or feedback value, from the hash index
+
+        Returns:
+            Row ids in insertion order
+        """
+        return self.hash_indexes[field].lookup(value)
+
+    def range(self, field: str, low: int = None, high: int = None) -> np.ndarray:
+        """
+        Rows with low <= field <= high (age, glucose or hr), from the sorted index
+
+        Returns:
+            Row ids in insertion order
+        """
+        _, rows = self.sorted_indexes[field].range(low, high)
+        return np.sort(rows)
+
+    def count(self, field: str, low: int = None, high: int = None) -> int:
+        """Number of rows with low <= field <= high, without materializing them"""
+        return self.sorted_indexes[field].count(low, high)
+
+    def top_k(self, field: str, k: int = 1, largest: bool = True) -> np.ndarray:
+        """
+        Rows with the k largest (or smallest) values of age, glucose or hr
+
+        Returns:
+            Row ids, best first; ties go to the earlier patient
+        """
+        _, rows = self.sorted_indexes[field].top_k(k, largest)
+        return rows
+
+    def doctor_summary(self) -> Dict[str, Dict[str, float]]:
+        """Q3/Q13: patients, average HR and average glucose per doctor, from maintained sums"""
+        index = self.hash_indexes['doctor']
+        summary = {}
+        for doctor in self.categories['doctor']:
+            count = index.count(doctor)
+            if count:
+                sums = index.sums[doctor]
+                summary[doctor] = {
+                    'patients': count,
+                    'avg_hr': sums['hr'] / count,
+                    'avg_glucose': sums['glucose'] / count
+                }
+        return summary
+
+    def feedback_counts(self) -> Dict[str, int]:
+        """Q9: patients per feedback value"""
+        index = self.hash_indexes['feedback']
+        return {value: index.count(value) for value in self.categories['feedback'] if index.count(value)}
+
+    def to_parsed(self) -> ParseResult:
+        """All rows as a PATIENT_SCHEMA-shaped ParseResult (e.g. for RiskEngine)"""
+        n = self.num_rows
+        columns = {'id': self.columns['id'][:n].copy(), 'name': np.array(self.names, dtype=object)}
+        for field in NUMERIC_FIELDS[1:]:
+            columns[field] = self.columns[field][:n].copy()
+        for field in CATEGORY_FIELDS:
+            columns[field] = CategoryColumn(self.columns[field][:n].copy(), list(self.categories[field]))
+        return ParseResult(columns, np.arange(n, dtype=np.int64), [])
+
+    def _code(self, field: str, value: str) -> int:
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.categories[field])
+            self.categories[field].append(value)
+        return code
+
+    def _reserve(self, size: int):
+        """Grow every column to hold size rows"""
+        capacity = len(self.columns['id'])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for field, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.num_rows] = column[:self.num_rows]
+            self.columns[field] = grown
@@ -0,0 +1,790 @@
+"""
+Records Module
+Schema-driven parsing of "key:value,key:value" records into columnar NumPy arrays
+"""
+
+from typing import List, Dict, Iterable, Iterator, Tuple
+import re
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FIELD_KINDS = ("int", "float", "str", "category", "list", "int_list", "bp")
+
+# Commas that are not inside a [...] value
+_FIELD_SPLIT = re.compile(r",(?![^\[]*\])")
+
+# Zero bytes after a vectorized batch, so spans up to this wide are read as strided windows
+_PADDING = 64
+
+# Records tried as the key/spacing template of a vectorized batch
+_TEMPLATE_CANDIDATES = 16
+
+
+class RecordParseError(ValueError):
+    """Raised for a record that does not fit its schema"""
+
+
+class Field:
+    """One declared key of a record schema"""
+
+    def __init__(self, name: str, kind: str = "str", required: bool = True, null_tokens: Tuple[str, ...] = ("None", "")):
+        """
+        Initialize field
+
+        Args:
+            name: Key as it appears in the record ("speed" in "speed:62")
+            kind: One of FIELD_KINDS; "bp" splits "120/80" into <name>_systolic and <name>_diastolic
+            required: Quarantine records missing this key (optional keys get -1, NaN, "" or an empty list)
+            null_tokens: List items treated as "no value" ("[None]" is an empty list)
+        """
+        if kind not in FIELD_KINDS:
+            raise ValueError(f"Unknown field kind '{kind}' for '{name}' (expected one of {FIELD_KINDS})")
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.null_tokens = frozenset(null_tokens)
+
+    def __repr__(self):
+        return f"Field({self.name!r}, {self.kind!r})"
+
+
+class Schema:
+    """Ordered set of fields expected in every record"""
+
+    def __init__(self, fields: List[Field]):
+        """
+        Initialize schema
+
+        Args:
+            fields: Declared fields; keys not declared here are ignored
+        """
+        self.fields = list(fields)
+        self.names = [f.name for f in self.fields]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Duplicate field names in schema")
+
+
+class ListColumn:
+    """Variable-length list column stored as flat values plus row offsets"""
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        return self.values[self.offsets[row]:self.offsets[row + 1]]
+
+    def lengths(self) -> np.ndarray:
+        """Number of items in each row"""
+        return np.diff(self.offsets)
+
+    def row_ids(self) -> np.ndarray:
+        """Row index of every flat value"""
+        return np.repeat(np.arange(len(self)), self.lengths())
+
+    def take(self, rows: np.ndarray) -> "ListColumn":
+        """Subset of rows, in the given order"""
+        lengths = self.lengths()[rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if len(self.values) and len(rows):
+            starts = self.offsets[rows]
+            flat = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+            values = self.values[flat]
+        else:
+            values = self.values[:0]
+        return ListColumn(values, offsets)
+
+    def to_lists(self) -> List[list]:
+        """Rows as Python lists"""
+        values = self.values.tolist()
+        bounds = self.offsets.tolist()
+        return [values[bounds[i]:bounds[i + 1]] for i in range(len(self))]
+
+
+class CategoryColumn:
+    """Dictionary-encoded string column: int32 codes into categories (first-seen order)"""
+
+    def __init__(self, codes: np.ndarray, categories: List[str]):
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str:
+        return self.categories[self.codes[row]]
+
+    def take(self, rows: np.ndarray) -> "CategoryColumn":
+        """Subset of rows; categories are kept as-is"""
+        return CategoryColumn(self.codes[rows], self.categories)
+
+    def compact(self) -> "CategoryColumn":
+        """Drop categories no row uses, keeping first-seen order"""
+        used = np.bincount(self.codes, minlength=len(self.categories)) > 0
+        if used.all():
+            return self
+        remap = np.cumsum(used, dtype=np.int32) - 1
+        return CategoryColumn(remap[self.codes], [c for c, keep in zip(self.categories, used) if keep])
+
+    def code_of(self, value: str) -> int:
+        """Code of a category, or -1 if it never occurs"""
+        try:
+            return self.categories.index(value)
+        except ValueError:
+            return -1
+
+    def to_list(self) -> List[str]:
+        """Decoded values"""
+        lookup = np.array(self.categories, dtype=object)
+        return lookup[self.codes].tolist()
+
+
+class ParseResult:
+    """Columns of successfully parsed records plus quarantined lines"""
+
+    def __init__(self, columns: Dict[str, any], line_numbers: np.ndarray, quarantine: List[Tuple[int, str, str]], skipped: int = 0):
+        """
+        Args:
+            columns: Name -> np.ndarray, CategoryColumn or ListColumn
+            line_numbers: Source line number of every parsed row
+            quarantine: (line_number, line, reason) for every rejected record
+            skipped: Lines without any "key:value" pair (blank lines, list brackets, headers)
+        """
+        self.columns = columns
+        self.line_numbers = line_numbers
+        self.quarantine = quarantine
+        self.skipped = skipped
+
+    def __len__(self):
+        return len(self.line_numbers)
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def __contains__(self, name: str):
+        return name in self.columns
+
+    def take(self, rows: np.ndarray) -> "ParseResult":
+        """Subset of rows (quarantine and skipped counts are carried over)"""
+        columns = {name: col[rows] if isinstance(col, np.ndarray) else col.take(rows) for name, col in self.columns.items()}
+        return ParseResult(columns, self.line_numbers[rows], self.quarantine, self.skipped)
+
+    def to_records(self) -> List[Dict[str, any]]:
+        """Rows as dictionaries (for display and comparison with dict-based code)"""
+        decoded = {}
+        for name, col in self.columns.items():
+            if isinstance(col, CategoryColumn):
+                decoded[name] = col.to_list()
+            elif isinstance(col, ListColumn):
+                decoded[name] = col.to_lists()
+            else:
+                decoded[name] = col.tolist()
+        names = list(decoded)
+        return [dict(zip(names, row)) for row in zip(*(decoded[n] for n in names))]
+
+
+def split_record(line: str) -> List[Tuple[str, str]]:
+    """
+    Split one record into (key, value) pairs, keeping commas inside [...] values
+
+    Args:
+        line: Record such as "id:101, marks: [80,75,90], feedback: Good"
+
+    Returns:
+        Stripped (key, value) pairs in record order
+
+    Raises:
+        RecordParseError: Unbalanced brackets or a non-empty field without ':'
+    """
+    if "[" in line or "]" in line:
+        if line.count("[") != line.count("]"):
+            raise RecordParseError("unbalanced brackets")
+        parts = _FIELD_SPLIT.split(line)
+    else:
+        parts = line.split(",")
+
+    pairs = []
+    for part in parts:
+        key, sep, value = part.partition(":")
+        if not sep:
+            if part.strip():
+                raise RecordParseError(f"field without ':' ({part.strip()[:30]})")
+            continue
+        pairs.append((key.strip(), value.strip()))
+    return pairs
+
+
+def clean_line(line: str) -> str:
+    """Strip whitespace, a trailing comma and surrounding quotes (records pasted as Python string lists)"""
+    line = line.strip()
+    if line.endswith(","):
+        line = line[:-1].rstrip()
+    if len(line) >= 2 and line[0] == line[-1] and line[0] in "\"'":
+        line = line[1:-1]
+    return line
+
+
+TRAFFIC_SCHEMA = Schema([
+    Field("id", "int"),
+    Field("zone", "category"),
+    Field("vehicle", "category"),
+    Field("speed", "int"),
+    Field("time", "str"),
+    Field("violations", "list"),
+    Field("status", "category")
+])
+
+PATIENT_SCHEMA = Schema([
+    Field("id", "int"),
+    Field("name", "str"),
+    Field("age", "int"),
+    Field("doctor", "category"),
+    Field("hr", "int"),
+    Field("bp", "bp"),
+    Field("glucose", "int"),
+    Field("feedback", "category")
+])
+
+STUDENT_SCHEMA = Schema([
+    Field("id", "int"),
+    Field("name", "str"),
+    Field("dept", "category"),
+    Field("attendance", "int"),
+    Field("marks", "int_list"),
+    Field("feedback", "str")
+])
+
+
+class RecordParser:
+    """Parse key:value records against a schema into columnar arrays"""
+
+    def __init__(self, schema: Schema):
+        """
+        Initialize parser
+
+        Args:
+            schema: Declared fields and kinds
+        """
+        self.schema = schema
+
+    def parse(self, lines: Iterable[str], first_line_number: int = 1) -> ParseResult:
+        """
+        Parse a batch of records
+
+        Records shaped like the first one (same keys, order and spacing) are tokenized and
+        converted with NumPy over the batch's UTF-8 bytes, without per-value Python objects.
+        The remaining records are split one by one. Records with a missing required key,
+        unbalanced brackets or an unconvertible value are quarantined instead of failing
+        the batch.
+
+        Args:
+            lines: Record strings (quotes and trailing commas are stripped)
+            first_line_number: Line number of the first record, for quarantine reports
+
+        Returns:
+            ParseResult with one column per field, in line order
+        """
+        lines = list(map(str.strip, lines))
+        text = "\n".join(lines)
+        if "\"" in text or "'" in text or ",\n" in text or text.endswith(","):
+            lines = list(map(clean_line, lines))
+            text = None
+
+        records = [line for line in lines if ":" in line]
+        skipped = len(lines) - len(records)
+        if skipped:
+            numbers = np.array([n for n, line in enumerate(lines, first_line_number) if ":" in line], dtype=np.int64)
+            text = None
+        else:
+            numbers = np.arange(first_line_number, first_line_number + len(lines), dtype=np.int64)
+
+        vectorized = self._parse_uniform(records, text)
+        if vectorized is None:
+            result = self._parse_each(records, numbers)
+        else:
+            columns, rows = vectorized
+            result = ParseResult(columns, numbers[rows], [])
+            if len(rows) < len(records):
+                rest = np.ones(len(records), dtype=bool)
+                rest[rows] = False
+                rest = np.flatnonzero(rest)
+                result = concat_results([result, self._parse_each([records[i] for i in rest], numbers[rest])])
+                result = result.take(np.argsort(result.line_numbers, kind="stable"))
+
+        result.skipped = skipped
+        if result.quarantine:
+            first = result.quarantine[0]
+            logger.warning(f"Quarantined {len(result.quarantine)} records (first at line {first[0]}: {first[2]})")
+        return result
+
+    def parse_file(self, path: str, batch_size: int = 100000, encoding: str = "utf-8") -> Iterator[ParseResult]:
+        """
+        Stream a record file in columnar batches
+
+        Args:
+            path: Text file with one record per line
+            batch_size: Lines per batch
+            encoding: File encoding (undecodable bytes are replaced, so the record is quarantined)
+
+        Yields:
+            ParseResult per batch
+        """
+        try:
+            with open(path, "r", encoding=encoding, errors="replace") as f:
+                first = 1
+                while True:
+                    batch = [line for _, line in zip(range(batch_size), f)]
+                    if not batch:
+                        break
+                    yield self.parse(batch, first_line_number=first)
+                    first += len(batch)
+        except OSError as e:
+            logger.error(f"Error reading records from {path}: {str(e)}")
+            raise
+
+    def parse_record(self, line: str) -> Dict[str, any]:
+        """
+        Parse a single record, for event-at-a-time consumers
+
+        Args:
+            line: Record string
+
+        Returns:
+            Dictionary of converted values ("bp" fields as <name>_systolic and <name>_diastolic)
+
+        Raises:
+            RecordParseError: The record does not fit the schema
+        """
+        pairs = dict(split_record(clean_line(line)))
+        record = {}
+        for field in self.schema.fields:
+            value = _convert_value(field, pairs.get(field.name))
+            if field.kind == "bp":
+                record[f"{field.name}_systolic"], record[f"{field.name}_diastolic"] = value
+            else:
+                record[field.name] = value
+        return record
+
+    def _parse_uniform(self, records: List[str], text: str = None):
+        """
+        Vectorized parse of the records shaped like the first well-formed one
+
+        Returns:
+            (columns, rows) where rows are the indices of the records that parsed, or None
+            when no record can serve as the template
+        """
+        template = self._template(records)
+        if template is None:
+            return None
+        keys, prefixes = template
+
+        if text is None:
+            text = "\n".join(records)
+        # Zero padding lets fixed-width windows start at any value
+        buf = np.frombuffer((text + "\n").encode() + bytes(_PADDING), dtype=np.uint8)
+        ascii_text = text if len(buf) == len(text) + 1 + _PADDING else None
+        newlines = np.flatnonzero(buf == 10)
+        if len(newlines) != len(records):
+            return None
+        num_fields = len(keys)
+
+        # Field separators are newlines and the commas outside [...]; a record whose
+        # brackets do not pair up without nesting is left to per-record parsing
+        bad = np.zeros(len(records), dtype=bool)
+        is_sep = (buf == 44) | (buf == 10)
+        opens = np.flatnonzero(buf == 91)
+        closes = np.flatnonzero(buf == 93)
+        if len(opens) or len(closes):
+            open_rows = np.searchsorted(newlines, opens)
+            close_rows = np.searchsorted(newlines, closes)
+            bad |= np.bincount(open_rows, minlength=len(records)) != np.bincount(close_rows, minlength=len(records))
+            opens, open_rows, closes = opens[~bad[open_rows]], open_rows[~bad[open_rows]], closes[~bad[close_rows]]
+            misplaced = np.zeros(len(opens), dtype=bool)
+            misplaced |= opens > closes
+            misplaced[1:] |= opens[1:] < closes[:-1]
+            bad[open_rows[misplaced]] = True
+            paired = ~bad[open_rows]
+            opens, closes = opens[paired], closes[paired]
+            commas = np.flatnonzero(buf == 44)
+            is_sep[commas[_within(commas, opens, closes)]] = False
+
+        seps = np.flatnonzero(is_sep)
+        ends_row = buf[seps] == 10
+        sep_rows = np.cumsum(ends_row) - ends_row
+        bad |= np.bincount(sep_rows, minlength=len(records)) != num_fields
+        rows = np.flatnonzero(~bad)
+        seps = seps[~bad[sep_rows]].reshape(len(rows), num_fields)
+        starts = np.empty_like(seps)
+        starts[:, 0] = np.concatenate([[0], newlines[:-1] + 1])[rows]
+        starts[:, 1:] = seps[:, :-1] + 1
+
+        # Every record must carry the template's key prefixes (key, spacing and ':')
+        ok = np.ones(len(rows), dtype=bool)
+        windows = np.lib.stride_tricks.sliding_window_view(buf, max(len(prefix) for prefix in prefixes))
+        value_starts = starts + np.array([len(prefix) for prefix in prefixes])
+        for j, prefix in enumerate(prefixes):
+            ok &= value_starts[:, j] <= seps[:, j]
+            ok &= (windows[starts[:, j], :len(prefix)] == np.frombuffer(prefix, dtype=np.uint8)).all(axis=1)
+        rows, value_starts, seps = rows[ok], value_starts[ok], seps[ok]
+
+        declared = {f.name: f for f in self.schema.fields}
+        converted = {}
+        ok = np.ones(len(rows), dtype=bool)
+        for j, key in enumerate(keys):
+            field = declared.get(key)
+            if field is None:
+                continue
+            spans = _trim_spans(buf, value_starts[:, j], seps[:, j])
+            converted[key], field_ok = _convert_spans(buf, spans[0], spans[1], field, ascii_text)
+            ok &= field_ok
+
+        keep = np.flatnonzero(ok)
+        columns = {}
+        for field in self.schema.fields:
+            column = converted[field.name]
+            if field.kind == "bp":
+                columns[f"{field.name}_systolic"] = column[0][keep]
+                columns[f"{field.name}_diastolic"] = column[1][keep]
+            elif isinstance(column, np.ndarray):
+                columns[field.name] = column[keep]
+            elif isinstance(column, CategoryColumn):
+                columns[field.name] = column.take(keep).compact()
+            else:
+                columns[field.name] = column.take(keep)
+        return columns, rows[keep]
+
+    def _template(self, records: List[str]):
+        """(keys, byte prefixes) of the first of a few records that splits cleanly and holds every declared key"""
+        for record in records[:_TEMPLATE_CANDIDATES]:
+            parts = _FIELD_SPLIT.split(record)
+            if any(":" not in part for part in parts) or record.count("[") != record.count("]"):
+                continue
+            prefixes = [part[:part.index(":") + 1].encode() for part in parts]
+            keys = [prefix[:-1].decode().strip() for prefix in prefixes]
+            if len(set(keys)) == len(keys) and set(keys) >= set(self.schema.names) and max(map(len, prefixes)) <= _PADDING:
+                return keys, prefixes
+        return None
+
+    def _parse_each(self, records: List[str], numbers: List[int]) -> ParseResult:
+        """Split and convert record by record, quarantining the ones that do not fit"""
+        values = {field.name: [] for field in self.schema.fields}
+        kept = []
+        quarantine = []
+        for number, record in zip(list(map(int, numbers)), records):
+            try:
+                pairs = dict(split_record(record))
+                row = [_convert_value(field, pairs.get(field.name)) for field in self.schema.fields]
+            except RecordParseError as e:
+                quarantine.append((number, record, str(e)))
+                continue
+            for field, value in zip(self.schema.fields, row):
+                values[field.name].append(value)
+            kept.append(number)
+
+        columns = {}
+        for field in self.schema.fields:
+            column = values[field.name]
+            if field.kind == "int":
+                columns[field.name] = np.array(column, dtype=np.int64)
+            elif field.kind == "float":
+                columns[field.name] = np.array(column, dtype=np.float64)
+            elif field.kind == "str":
+                columns[field.name] = np.array(column, dtype=object)
+            elif field.kind == "category":
+                columns[field.name] = encode_categories(column)
+            elif field.kind == "bp":
+                pairs = np.array(column, dtype=np.int64).reshape(-1, 2)
+                columns[f"{field.name}_systolic"] = pairs[:, 0].copy()
+                columns[f"{field.name}_diastolic"] = pairs[:, 1].copy()
+            else:
+                offsets = np.zeros(len(column) + 1, dtype=np.int64)
+                np.cumsum([len(items) for items in column], out=offsets[1:])
+                flat = [item for items in column for item in items]
+                dtype = np.int64 if field.kind == "int_list" else object
+                columns[field.name] = ListColumn(np.array(flat, dtype=dtype), offsets)
+        return ParseResult(columns, np.array(kept, dtype=np.int64), quarantine)
+
+
+def _convert_value(field: Field, value: str):
+    """Convert one raw value (None when the key is absent) for per-record parsing"""
+    if value is None:
+        if field.required:
+            raise RecordParseError(f"missing '{field.name}'")
+        value = "[]" if field.kind in ("list", "int_list") else ""
+
+    kind = field.kind
+    try:
+        if kind == "int":
+            return int(value) if value or field.required else -1
+        if kind == "float":
+            return float(value) if value or field.required else float("nan")
+        if kind == "bp":
+            if not value and not field.required:
+                return (-1, -1)
+            systolic, sep, diastolic = value.partition("/")
+            if not sep:
+                raise ValueError(value)
+            return (int(systolic), int(diastolic))
+        if kind in ("list", "int_list"):
+            if not (value.startswith("[") and value.endswith("]")):
+                raise RecordParseError(f"'{field.name}' is not a [...] list")
+            items = [item.strip() for item in value[1:-1].split(",")]
+            items = [item for item in items if item not in field.null_tokens]
+            return [int(item) for item in items] if kind == "int_list" else items
+    except ValueError:
+        raise RecordParseError(f"bad {kind} for '{field.name}': {value[:30]!r}")
+    return value
+
+
+def _within(positions: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Mask of positions that fall inside one of the sorted, disjoint [start, end) spans"""
+    span = np.searchsorted(starts, positions, side="right") - 1
+    inside = span >= 0
+    inside[inside] = positions[inside] < ends[span[inside]]
+    return inside
+
+
+def _trim_spans(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Move span bounds past leading and trailing spaces and tabs"""
+    starts = starts.copy()
+    ends = ends.copy()
+    while True:
+        step = (starts < ends) & ((buf[starts] == 32) | (buf[starts] == 9))
+        if not step.any():
+            break
+        starts += step
+    while True:
+        step = (ends > starts) & ((buf[ends - 1] == 32) | (buf[ends - 1] == 9))
+        if not step.any():
+            break
+        ends -= step
+    return starts, ends
+
+
+def _gather(buf: np.ndarray, starts: np.ndarray, lengths: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Zero-padded (rows, width) byte matrix of the spans, plus its valid-byte mask"""
+    offsets = np.arange(width)
+    mask = offsets < lengths[:, None]
+    if len(starts) and starts.max() + width <= len(buf):
+        # One row copy per span instead of one index per byte
+        matrix = np.lib.stride_tricks.sliding_window_view(buf, width)[starts]
+    else:
+        matrix = buf[np.minimum(starts[:, None] + offsets, len(buf) - 1)]
+    matrix[~mask] = 0
+    return matrix, mask
+
+
+def _span_ints(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Decimal integers in byte spans, plus a mask of the spans that were valid integers"""
+    negative = (ends > starts) & (buf[starts] == 45)
+    starts = starts + negative
+    lengths = ends - starts
+    ok = (lengths > 0) & (lengths <= 18)
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64), ok
+    lengths = np.where(ok, lengths, 0)
+
+    digits, mask = _gather(buf, starts, lengths, max(int(lengths.max()), 1))
+    digits = digits.astype(np.int64) - 48
+    ok &= (((digits >= 0) & (digits <= 9)) | ~mask).all(axis=1)
+    values = np.zeros(len(starts), dtype=np.int64)
+    for k in range(digits.shape[1]):
+        values = np.where(mask[:, k], values * 10 + digits[:, k], values)
+    return np.where(negative, -values, values), ok
+
+
+def _span_strings(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """Dictionary-encode byte spans: int32 codes in first-seen order and the decoded strings"""
+    lengths = ends - starts
+    width = int(lengths.max()) if len(lengths) else 0
+    if width == 0:
+        return np.zeros(len(starts), dtype=np.int32), [""] if len(starts) else []
+
+    # Group on 8-byte words: exact for spans up to 8 bytes, a verified hash beyond that
+    matrix, _ = _gather(buf, starts, lengths, -(-width // 8) * 8)
+    words = np.ascontiguousarray(matrix).view("<u8")
+    keys = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        keys = keys * np.uint64(0x9E3779B97F4A7C15) ^ words[:, column]
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if words.shape[1] > 1 and not (words == words[first[inverse]]).all():
+        keys = matrix.view(f"S{matrix.shape[1]}").ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+    order = np.argsort(first)
+    remap = np.empty(len(order), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    categories = [bytes(buf[starts[i]:ends[i]]).decode("utf-8") for i in first[order]]
+    return remap[inverse], categories
+
+
+def _convert_spans(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, field: Field, text: str = None):
+    """
+    Typed column from the value spans of one field
+
+    Args:
+        buf: Batch bytes
+        starts: Start offset of each row's value
+        ends: End offset (exclusive) of each row's value
+        field: Declared field
+        text: Batch text when it is pure ASCII (so byte offsets are character offsets)
+
+    Returns:
+        (column, ok) where ok marks the rows whose value converted; a "bp" column is a
+        (systolic, diastolic) pair
+    """
+    kind = field.kind
+    everything = np.ones(len(starts), dtype=bool)
+    if kind == "int":
+        return _span_ints(buf, starts, ends)
+
+    if kind == "category":
+        return CategoryColumn(*_span_strings(buf, starts, ends)), everything
+
+    if kind == "str":
+        # Mostly distinct values: slice them out directly instead of grouping
+        spans = zip(starts.tolist(), ends.tolist())
+        if text is not None:
+            values = [text[start:end] for start, end in spans]
+        else:
+            data = buf.tobytes()
+            values = [data[start:end].decode("utf-8") for start, end in spans]
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column, everything
+
+    if kind == "float":
+        data = buf.tobytes()
+        values = np.full(len(starts), np.nan)
+        ok = everything.copy()
+        for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+            try:
+                values[i] = float(data[start:end])
+            except ValueError:
+                ok[i] = False
+        return values, ok
+
+    if kind == "bp":
+        slashes = np.flatnonzero(buf == 47)
+        slashes = slashes[_within(slashes, starts, ends)]
+        rows = np.searchsorted(starts, slashes, side="right") - 1
+        ok = np.bincount(rows, minlength=len(starts)) == 1
+        split_at = starts.copy()
+        single = ok[rows]
+        split_at[rows[single]] = slashes[single]
+        systolic, systolic_ok = _span_ints(buf, *_trim_spans(buf, starts, split_at))
+        diastolic, diastolic_ok = _span_ints(buf, *_trim_spans(buf, split_at + 1, np.maximum(ends, split_at + 1)))
+        return (systolic, diastolic), ok & systolic_ok & diastolic_ok
+
+    # list / int_list: "[a,b,c]" with the commas inside the brackets as item separators
+    ok = (ends - starts >= 2) & (buf[starts] == 91) & (buf[np.maximum(ends - 1, 0)] == 93)
+    body_starts = np.where(ok, starts + 1, starts)
+    body_ends = np.where(ok, ends - 1, starts)
+    commas = np.flatnonzero(buf == 44)
+    commas = commas[_within(commas, body_starts, body_ends)]
+    rows = np.searchsorted(body_starts, commas, side="right") - 1
+    counts = np.bincount(rows, minlength=len(starts))
+    # "[]" holds no items; any other body holds commas + 1
+    num_items = np.where((body_starts == body_ends) & (counts == 0), 0, counts + 1)
+    has_items = num_items > 0
+    item_starts = np.sort(np.concatenate([body_starts[has_items], commas + 1]))
+    item_ends = np.sort(np.concatenate([commas, body_ends[has_items]]))
+    item_starts, item_ends = _trim_spans(buf, item_starts, item_ends)
+    item_rows = np.repeat(np.arange(len(starts)), num_items)
+    offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+
+    if kind == "int_list":
+        values, item_ok = _span_ints(buf, item_starts, item_ends)
+        ok &= np.bincount(item_rows[~item_ok], minlength=len(starts)) == 0
+        np.cumsum(num_items, out=offsets[1:])
+        return ListColumn(values, offsets), ok
+
+    codes, categories = _span_strings(buf, item_starts, item_ends)
+    null_codes = [code for code, value in enumerate(categories) if value in field.null_tokens]
+    present = ~np.isin(codes, null_codes)
+    np.cumsum(np.bincount(item_rows[present], minlength=len(starts)), out=offsets[1:])
+    return ListColumn(np.array(categories, dtype=object)[codes[present]], offsets), ok
+
+
+def encode_categories(values: List[str]) -> CategoryColumn:
+    """Dictionary-encode strings with codes in first-seen order"""
+    categories = list(dict.fromkeys(values))
+    lookup = {value: code for code, value in enumerate(categories)}
+    codes = np.fromiter(map(lookup.__getitem__, values), dtype=np.int32, count=len(values))
+    return CategoryColumn(codes, categories)
+
+
+def first_seen_order(codes: np.ndarray, num_codes: int) -> np.ndarray:
+    """Index of the first row holding each code (len(codes) where a code never occurs)"""
+    first = np.full(num_codes, len(codes), dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    return first
+
+
+def concat_results(results: List[ParseResult]) -> ParseResult:
+    """
+    Concatenate batch results into one
+
+    Category columns are re-encoded onto a shared category list (first-seen order across batches).
+
+    Args:
+        results: ParseResults from the same schema
+
+    Returns:
+        Combined ParseResult
+    """
+    if not results:
+        raise ValueError("No results to concatenate")
+    if len(results) == 1:
+        return results[0]
+
+    columns = {}
+    for name, first in results[0].columns.items():
+        parts = [r.columns[name] for r in results]
+        if isinstance(first, CategoryColumn):
+            index = {}
+            codes = []
+            for part in parts:
+                remap = np.array([index.setdefault(c, len(index)) for c in part.categories], dtype=np.int32)
+                codes.append(remap[part.codes] if len(remap) else part.codes)
+            columns[name] = CategoryColumn(np.concatenate(codes), list(index))
+        elif isinstance(first, ListColumn):
+            shifts = np.cumsum([0] + [len(p.values) for p in parts[:-1]])
+            offsets = [parts[0].offsets[:1]] + [p.offsets[1:] + s for p, s in zip(parts, shifts)]
+            columns[name] = ListColumn(np.concatenate([p.values for p in parts]), np.concatenate(offsets))
+        else:
+            columns[name] = np.concatenate(parts)
+
+    return ParseResult(
+        columns,
+        np.concatenate([r.line_numbers for r in results]),
+        [q for r in results for q in r.quarantine],
+        sum(r.skipped for r in results)
+    )
+
+
+def read_records(path: str, schema: Schema, batch_size: int = 100000) -> ParseResult:
+    """
+    Parse a whole record file into one columnar result
+
+    Args:
+        path: Text file with one record per line
+        schema: Declared fields
+        batch_size: Lines parsed per batch
+
+    Returns:
+        Combined ParseResult
+    """
+    results = list(RecordParser(schema).parse_file(path, batch_size=batch_size))
+    if not results:
+        return RecordParser(schema).parse([])
+    return concat_results(results)
@@ -0,0 +1,419 @@
+"""
+Stream Module
+Incremental per-zone traffic metrics over sliding and tumbling event-time windows
+"""
+
+from typing import List, Dict, Tuple, Callable, Iterable, AsyncIterator, Union
+from collections import deque
+import asyncio
+import logging
+import time
+
+from .records import RecordParser, RecordParseError, TRAFFIC_SCHEMA
+from .traffic import OVERSPEED_KMH
+
+logger = logging.getLogger(__name__)
+
+# Per-zone counters kept in every bucket, at zone * _METRICS + offset
+_COUNT, _SPEED, _VIOLATIONS, _OVERSPEED, _CONGESTED = range(5)
+_METRICS = 5
+
+# Name -> (width, step) in seconds; step == width is a tumbling window
+DEFAULT_WINDOWS = {
+    '1m_tumbling': (60, 60),
+    '5m_sliding': (300, 60),
+    '1h_sliding': (3600, 300)
+}
+
+# A step back in HH:MM larger than this is read as the next day
+_DAY_ROLLOVER_SECONDS = 12 * 3600
+
+
+class WindowSnapshot:
+    """Per-zone metrics of one window of events"""
+
+    def __init__(self, name: str, start: float, end: float, zones: Dict[str, Dict[str, float]],
+                 hour_counts: List[int], events: int):
+        """
+        Initialize snapshot
+
+        Args:
+            name: Window name
+            start: Window start (seconds of event time, inclusive)
+            end: Window end (exclusive)
+            zones: Zone -> vehicles, avg_speed, violation_rate, overspeed, congested
+            hour_counts: Events per hour of day
+            events: Events in the window
+        """
+        self.name = name
+        self.start = start
+        self.end = end
+        self.zones = zones
+        self.hour_counts = hour_counts
+        self.events = events
+
+    @property
+    def peak_hour(self) -> Tuple[int, int]:
+        """(hour, events) of the busiest hour; ties go to the earlier hour"""
+        count = max(self.hour_counts)
+        return (self.hour_counts.index(count), count) if count else (None, 0)
+
+    def format(self) -> str:
+        """One line per zone in the notebook's 'Zone A1: ...' style"""
+        hour, count = self.peak_hour
+        lines = [f"{self.name} [{_clock(self.start)}-{_clock(self.end)}): {self.events} vehicles, "
+                 f"peak hour {'None' if hour is None else f'{hour:02d}'}:00 ({count})"]
+        lines.extend(
+            f"Zone {zone}: {z['vehicles']} vehicles, {z['avg_speed']:.1f} km/h, "
+            f"{z['violation_rate']:.2f} violations/vehicle, {z['overspeed']} overspeed, {z['congested']} congested"
+            for zone, z in self.zones.items()
+        )
+        return "\n".join(lines)
+
+
+class ZoneWindow:
+    """Running per-zone totals over a window, kept in a ring of step-sized buckets"""
+
+    def __init__(self, name: str, width: int, step: int, zones: List[str]):
+        """
+        Initialize window
+
+        Memory is num_buckets x zones counters whatever the event rate: each event updates
+        one bucket and the running totals, and a bucket leaving the window is subtracted
+        from the totals before it is reused.
+
+        Args:
+            name: Window name
+            width: Window length in seconds
+            step: Slide in seconds (== width for a tumbling window); must divide width
+            zones: Shared zone name list of the processor (index = zone code)
+        """
+        if step <= 0 or width % step:
+            raise ValueError(f"Window '{name}': step {step} must be positive and divide width {width}")
+        self.name = name
+        self.width = width
+        self.step = step
+        self.num_buckets = width // step
+        self.zones = zones
+        self.late_events = 0
+
+        self._buckets = [[0] * (len(zones) * _METRICS) for _ in range(self.num_buckets)]
+        self._bucket_hours = [[0] * 24 for _ in range(self.num_buckets)]
+        self._totals = [0] * (len(zones) * _METRICS)
+        self._hour_totals = [0] * 24
+        self._events = 0
+        self._newest = None
+
+    def add_zone(self):
+        """Make room for a zone appended to the shared zone list"""
+        for bucket in self._buckets:
+            bucket.extend([0] * _METRICS)
+        self._totals.extend([0] * _METRICS)
+
+    def add(self, bucket: int, zone: int, speed: int, violations: int, overspeed: bool, congested: bool,
+            hour: int) -> List[WindowSnapshot]:
+        """
+        Count one event
+
+        Args:
+            bucket: Absolute bucket number (event seconds // step)
+            zone: Zone code
+            speed: Speed in km/h
+            violations: Number of violations
+            overspeed: Speed is above the overspeed limit
+            congested: Status is Congested
+            hour: Hour of day
+
+        Returns:
+            Snapshots of the windows closed by this event (oldest first)
+        """
+        closed = []
+        if self._newest is None:
+            self._newest = bucket
+        elif bucket > self._newest:
+            closed = self.advance(bucket)
+        elif bucket <= self._newest - self.num_buckets:
+            self.late_events += 1
+            return closed
+
+        slot = bucket % self.num_buckets
+        base = zone * _METRICS
+        for cells in (self._buckets[slot], self._totals):
+            cells[base + _COUNT] += 1
+            cells[base + _SPEED] += speed
+            cells[base + _VIOLATIONS] += violations
+            cells[base + _OVERSPEED] += overspeed
+            cells[base + _CONGESTED] += congested
+        self._bucket_hours[slot][hour] += 1
+        self._hour_totals[hour] += 1
+        self._events += 1
+        return closed
+
+    def advance(self, bucket: int) -> List[WindowSnapshot]:
+        """
+        Move the window's newest bucket forward, evicting the buckets that fall out
+
+        Args:
+            bucket: New newest bucket number
+
+        Returns:
+            Snapshots of the non-empty windows closed on the way (at most num_buckets)
+        """
+        closed = []
+        if self._newest is None or bucket <= self._newest:
+            return closed
+        # After num_buckets steps every bucket has been evicted; jump the rest
+        steps = min(bucket - self._newest, self.num_buckets)
+        for _ in range(steps):
+            if self._events:
+                closed.append(self.snapshot())
+            self._newest += 1
+            self._evict(self._newest % self.num_buckets)
+        self._newest = bucket
+        return closed
+
+    def snapshot(self) -> WindowSnapshot:
+        """Metrics of the current window contents"""
+        totals = self._totals
+        zones = {}
+        for z, zone in enumerate(self.zones):
+            base = z * _METRICS
+            count = totals[base + _COUNT]
+            if count:
+                zones[zone] = {
+                    'vehicles': count,
+                    'avg_speed': totals[base + _SPEED] / count,
+                    'violation_rate': totals[base + _VIOLATIONS] / count,
+                    'overspeed': totals[base + _OVERSPEED],
+                    'congested': totals[base + _CONGESTED]
+                }
+        end = ((self._newest or 0) + 1) * self.step
+        return WindowSnapshot(self.name, end - self.width, end, zones, list(self._hour_totals), self._events)
+
+    def _evict(self, slot: int):
+        """Subtract a bucket from the totals and clear it for reuse"""
+        bucket = self._buckets[slot]
+        totals = self._totals
+        for i, value in enumerate(bucket):
+            if value:
+                totals[i] -= value
+                bucket[i] = 0
+        hours = self._bucket_hours[slot]
+        for h, value in enumerate(hours):
+            if value:
+                self._hour_totals[h] -= value
+                self._events -= value
+                hours[h] = 0
+
+
+class TrafficStreamProcessor:
+    """Live per-zone traffic metrics over several event-time windows"""
+
+    def __init__(
+        self,
+        windows: Dict[str, Tuple[int, int]] = None,
+        overspeed: int = OVERSPEED_KMH,
+        on_alert: Callable[[Dict[str, any]], None] = None,
+        on_window: Callable[[WindowSnapshot], None] = None,
+        max_alerts: int = 1000
+    ):
+        """
+        Initialize processor
+
+        Args:
+            windows: Window name -> (width, step) in seconds (defaults to DEFAULT_WINDOWS)
+            overspeed: Speed (km/h) above which an alert is raised
+            on_alert: Called with each overspeed event
+            on_window: Called with the snapshot of each closed window
+            max_alerts: Recent alerts kept in self.alerts
+        """
+        self.overspeed = overspeed
+        self.on_alert = on_alert
+        self.on_window = on_window
+        self.parser = RecordParser(TRAFFIC_SCHEMA)
+        self.zones = []
+        self._zone_codes = {}
+        self.windows = {
+            name: ZoneWindow(name, width, step, self.zones)
+            for name, (width, step) in (windows or DEFAULT_WINDOWS).items()
+        }
+        self.alerts = deque(maxlen=max_alerts)
+        self.events = 0
+        self.rejected = 0
+
+        # HH:MM carries no date: count days when the clock steps back
+        self._day_offset = 0
+        self._last_seconds = None
+
+    def process(self, event: Dict[str, any], timestamp: float = None) -> List[WindowSnapshot]:
+        """
+        Update every window with one event, in O(1) amortized time
+
+        Args:
+            event: Parsed record with zone, speed, violations, status and time ("HH:MM")
+            timestamp: Event time in seconds; by default taken from event['time']
+
+        Returns:
+            Snapshots of the windows this event closed
+        """
+        if timestamp is None:
+            timestamp = self._event_seconds(event['time'])
+        zone = self._zone_codes.get(event['zone'])
+        if zone is None:
+            zone = self._add_zone(event['zone'])
+
+        speed = event['speed']
+        overspeed = speed > self.overspeed
+        if overspeed:
+            self.alerts.append(event)
+            if self.on_alert:
+                self.on_alert(event)
+
+        seconds = int(timestamp)
+        hour = seconds // 3600 % 24
+        violations = len(event['violations'])
+        congested = event['status'] == 'Congested'
+        closed = []
+        for window in self.windows.values():
+            closed.extend(window.add(seconds // window.step, zone, speed, violations, overspeed, congested, hour))
+        self.events += 1
+
+        if closed and self.on_window:
+            for snapshot in closed:
+                self.on_window(snapshot)
+        return closed
+
+    def process_line(self, line: str, timestamp: float = None) -> List[WindowSnapshot]:
+        """
+        Parse and process one log line; lines that do not fit the schema are counted and skipped
+
+        Args:
+            line: Log line such as "id:501,zone:A1,vehicle:Car,speed:62,time:08:30,violations:[None],status:Smooth"
+            timestamp: Event time in seconds; by default taken from the line's time
+
+        Returns:
+            Snapshots of the windows this event closed
+        """
+        try:
+            event = self.parser.parse_record(line)
+            return self.process(event, timestamp)
+        except RecordParseError as e:
+            self.rejected += 1
+            logger.debug(f"Rejected traffic event: {str(e)}")
+            return []
+
+    def snapshot(self, name: str) -> WindowSnapshot:
+        """
+        Metrics of a window's current contents
+
+        Args:
+            name: Window name
+
+        Returns:
+            WindowSnapshot
+        """
+        return self.windows[name].snapshot()
+
+    async def run(self, source: AsyncIterator[Union[str, List[str]]], queue_size: int = 64,
+                  arrival_time: bool = False):
+        """
+        Ingest a feed until it ends
+
+        The source is read by a separate task into a bounded queue, so a fast feed waits
+        for the processor instead of growing memory.
+
+        Args:
+            source: Async iterator of log lines or lists of log lines
+            queue_size: Items buffered between the feed and the processor
+            arrival_time: Stamp events with the wall clock instead of their HH:MM time
+        """
+        queue = asyncio.Queue(maxsize=queue_size)
+
+        async def pump():
+            try:
+                async for item in source:
+                    await queue.put(item)
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.create_task(pump())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                timestamp = time.time() if arrival_time else None
+                for line in [item] if isinstance(item, str) else item:
+                    self.process_line(line, timestamp)
+        finally:
+            if not producer.done():
+                producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        logger.info(f"Stream ended after {self.events} events ({self.rejected} rejected)")
+
+    def _add_zone(self, name: str) -> int:
+        """Register a zone with every window"""
+        code = len(self.zones)
+        self._zone_codes[name] = code
+        self.zones.append(name)
+        for window in self.windows.values():
+            window.add_zone()
+        return code
+
+    def _event_seconds(self, clock: str) -> int:
+        """Seconds since the first day of the stream for an "HH:MM" time"""
+        hours, sep, minutes = clock.partition(":")
+        if not sep:
+            raise RecordParseError(f"bad time {clock!r}")
+        try:
+            seconds = int(hours) * 3600 + int(minutes) * 60
+        except ValueError:
+            raise RecordParseError(f"bad time {clock!r}")
+        if self._last_seconds is not None and seconds + _DAY_ROLLOVER_SECONDS < self._last_seconds:
+            self._day_offset += 86400
+        self._last_seconds = seconds
+        return seconds + self._day_offset
+
+
+async def replay(lines: Iterable[str], rate: float = None, batch_size: int = 500,
+                 repeat: int = 1) -> AsyncIterator[List[str]]:
+    """
+    Feed recorded log lines as a live source
+
+    Args:
+        lines: Log lines (a list or an open file)
+        rate: Target lines per second (None: as fast as the consumer takes them)
+        batch_size: Lines per yielded batch
+        repeat: Times to play the lines (requires a list)
+
+    Yields:
+        Batches of lines, paced so that the cumulative rate tracks the target
+    """
+    start = time.perf_counter()
+    sent = 0
+    for _ in range(repeat):
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) < batch_size:
+                continue
+            yield batch
+            sent += len(batch)
+            batch = []
+            await _pace(start, sent, rate)
+        if batch:
+            yield batch
+            sent += len(batch)
+            await _pace(start, sent, rate)
+
+
+async def _pace(start: float, sent: int, rate: float):
+    """Sleep until sent lines are due at rate (or just yield control)"""
+    delay = sent / rate - (time.perf_counter() - start) if rate else 0
+    await asyncio.sleep(max(delay, 0))
+
+
+def _clock(seconds: float) -> str:
+    """HH:MM of an event time in seconds (day offsets wrap)"""
+    minutes = int(seconds) // 60 % 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
@@ -0,0 +1,201 @@
+"""
+Time Buckets Module
+Minute-of-day parsing, lookup-table time windows and histograms for time-stamped records
+"""
+
+from typing import Dict, Tuple, Iterable, Union
+import logging
+
+import numpy as np
+
+from .records import CategoryColumn, first_seen_order
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 1440
+
+# Hour ranges of the notebook's Q9 time windows (Night wraps past midnight)
+TIME_WINDOWS = {
+    'Morning': list(range(5, 12)),
+    'Afternoon': list(range(12, 17)),
+    'Evening': list(range(17, 20)),
+    'Night': list(range(20, 24)) + list(range(0, 5))
+}
+
+# "HH:MM" of every minute; index -1 (unparsed) maps to ""
+_CLOCK_LABELS = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(MINUTES_PER_DAY)] + [""], dtype=object)
+
+
+def parse_minutes(times: np.ndarray) -> np.ndarray:
+    """
+    Minute of day from "HH:MM" (or "H:MM") strings
+
+    Args:
+        times: Object or string array of clock times
+
+    Returns:
+        int64 minutes (-1 where the value is not a valid time)
+    """
+    if len(times) == 0:
+        return np.zeros(0, dtype=np.int64)
+    # One spare character so longer strings ("08:300", "08:30:59") are rejected, not cut to five
+    chars = np.asarray(times, dtype="U6").view(np.uint32).reshape(len(times), 6)
+    # Code points below '0' wrap around, so one <= 9 test rejects every non-digit
+    digits = [chars[:, i] - 48 for i in range(5)]
+    short = chars[:, 1] == 58
+    hours = np.where(short, digits[0], digits[0] * 10 + digits[1])
+    minutes = np.where(short, digits[2] * 10 + digits[3], digits[3] * 10 + digits[4])
+    valid = np.where(
+        short,
+        (digits[2] <= 9) & (digits[3] <= 9) & (chars[:, 4] == 0),
+        (chars[:, 2] == 58) & (digits[1] <= 9) & (digits[3] <= 9) & (digits[4] <= 9)
+    )
+    valid &= (digits[0] <= 9) & (hours < 24) & (minutes < 60) & (chars[:, 5] == 0)
+    return np.where(valid, hours.astype(np.int64) * 60 + minutes, -1)
+
+
+def parse_hours(times: np.ndarray) -> np.ndarray:
+    """
+    Hour of day from "HH:MM" strings
+
+    Args:
+        times: Object or string array of clock times
+
+    Returns:
+        int64 hours (-1 where the value is not a valid time)
+    """
+    minutes = parse_minutes(times)
+    return np.where(minutes >= 0, minutes // 60, -1)
+
+
+def format_minutes(minutes: np.ndarray) -> np.ndarray:
+    """Clock strings ("HH:MM") of minutes of day ("" for -1)"""
+    return _CLOCK_LABELS[np.asarray(minutes)]
+
+
+def histogram(minutes: np.ndarray, width: int = 60) -> np.ndarray:
+    """
+    Record counts per time-of-day bucket
+
+    Args:
+        minutes: Minutes of day (-1 values are ignored)
+        width: Bucket width in minutes; the last bucket is shorter if width does not divide a day
+
+    Returns:
+        Counts for buckets starting at 0, width, 2 * width, ...
+    """
+    minutes = np.asarray(minutes)
+    valid = minutes[minutes >= 0]
+    return np.bincount(valid // width, minlength=-(-MINUTES_PER_DAY // width))
+
+
+def peak(minutes: np.ndarray, width: int = 60, sliding: bool = False) -> Tuple[int, int]:
+    """
+    Busiest time-of-day bucket
+
+    Args:
+        minutes: Minutes of day (-1 values are ignored)
+        width: Bucket width in minutes
+        sliding: Search every start minute (spans may wrap past midnight) instead of
+            fixed buckets; ties go to the earliest start
+
+    Returns:
+        (start minute, count), or (None, 0) without valid minutes; fixed-bucket ties go to
+        the bucket seen first in the data, as the notebook's peak-hour loop does
+    """
+    minutes = np.asarray(minutes)
+    valid = minutes[minutes >= 0]
+    if len(valid) == 0:
+        return None, 0
+    if sliding:
+        counts = np.bincount(valid, minlength=MINUTES_PER_DAY)
+        totals = np.concatenate([[0], np.cumsum(np.concatenate([counts, counts[:width - 1]]))])
+        spans = totals[width:width + MINUTES_PER_DAY] - totals[:MINUTES_PER_DAY]
+        start = int(spans.argmax())
+        return start, int(spans[start])
+
+    buckets = valid // width
+    num_buckets = -(-MINUTES_PER_DAY // width)
+    counts = np.bincount(buckets, minlength=num_buckets)
+    first = first_seen_order(buckets, num_buckets)
+    bucket = int(np.where(counts == counts.max(), first, len(buckets)).argmin())
+    return bucket * width, int(counts[bucket])
+
+
+class TimeScheme:
+    """Named time-of-day windows applied to whole minute arrays through a lookup table"""
+
+    def __init__(self, windows: Dict[str, Iterable[Union[int, str, Tuple[str, str]]]] = None,
+                 default: str = 'Unknown'):
+        """
+        Build the 1440-entry minute -> window table
+
+        Args:
+            windows: Window name -> hours (0-23 or "HH") and/or ("HH:MM", "HH:MM") ranges,
+                end exclusive and wrapping past midnight; where windows overlap the one
+                listed first wins (defaults to TIME_WINDOWS)
+            default: Window of minutes no window covers and of unparsed times
+        """
+        windows = TIME_WINDOWS if windows is None else windows
+        self.names = list(windows) + [default]
+        # Slot MINUTES_PER_DAY holds the default, so table[-1] classifies unparsed (-1) minutes
+        self.table = np.full(MINUTES_PER_DAY + 1, len(windows), dtype=np.int32)
+        for code, spans in reversed(list(enumerate(windows.values()))):
+            for span in spans:
+                self.table[_span_minutes(span)] = code
+        self.hour_table = np.append(self.table[:MINUTES_PER_DAY:60], len(windows)).astype(np.int32)
+
+    @classmethod
+    def uniform(cls, width: int, label: str = "{start}-{end}") -> "TimeScheme":
+        """
+        Scheme of equal consecutive buckets starting at midnight
+
+        Args:
+            width: Bucket width in minutes
+            label: Name format with {start} and {end} as "HH:MM"
+
+        Returns:
+            TimeScheme
+        """
+        windows = {}
+        for start in range(0, MINUTES_PER_DAY, width):
+            end = min(start + width, MINUTES_PER_DAY)
+            windows[label.format(start=_CLOCK_LABELS[start], end=_CLOCK_LABELS[end % MINUTES_PER_DAY])] = \
+                [(_CLOCK_LABELS[start], _CLOCK_LABELS[end % MINUTES_PER_DAY])]
+        return cls(windows)
+
+    def classify(self, minutes: np.ndarray) -> CategoryColumn:
+        """
+        Window of every record
+
+        Args:
+            minutes: Minutes of day (-1 for unparsed times)
+
+        Returns:
+            CategoryColumn over self.names
+        """
+        return CategoryColumn(self.table[np.asarray(minutes)], self.names)
+
+    def classify_hours(self, hours: np.ndarray) -> np.ndarray:
+        """Window codes of hours of day (windows given as whole hours only)"""
+        return self.hour_table[np.asarray(hours)]
+
+    def counts(self, minutes: np.ndarray) -> Dict[str, int]:
+        """Records per window"""
+        codes = self.table[np.asarray(minutes)]
+        return dict(zip(self.names, np.bincount(codes, minlength=len(self.names)).tolist()))
+
+
+def _span_minutes(span: Union[int, str, Tuple[str, str]]) -> np.ndarray:
+    """Minutes covered by an hour or an ("HH:MM", "HH:MM") range"""
+    if isinstance(span, tuple):
+        start, end = parse_minutes(list(span)).tolist()
+        if start < 0 or end < 0:
+            raise ValueError(f"Invalid time range {span} (expected 'HH:MM' pairs)")
+        if start < end:
+            return np.arange(start, end)
+        return np.r_[start:MINUTES_PER_DAY, 0:end]
+    hour = int(span)
+    if not 0 <= hour < 24:
+        raise ValueError(f"Invalid hour {span}")
+    return np.arange(hour * 60, hour * 60 + 60)
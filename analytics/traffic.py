@@ -0,0 +1,193 @@
+"""
+Traffic Module
+Single-pass zone, hour, vehicle and violation aggregates over columnar traffic records
+"""
+
+from typing import List, Dict, Tuple, Union
+import logging
+
+import numpy as np
+
+from .records import ParseResult, CategoryColumn, encode_categories, first_seen_order
+from .time_buckets import TimeScheme, parse_minutes, histogram, peak
+
+logger = logging.getLogger(__name__)
+
+OVERSPEED_KMH = 80
+
+
+class TrafficAnalytics:
+    """Notebook Q2-Q10 traffic aggregates computed together with NumPy group-bys"""
+
+    def __init__(self, parsed: ParseResult, overspeed: int = OVERSPEED_KMH, time_windows: Union[Dict[str, List[int]], TimeScheme] = None):
+        """
+        Aggregate a batch of parsed traffic records
+
+        Every per-group figure is a bincount over integer zone, vehicle and hour codes,
+        so the records are never regrouped into per-zone lists.
+
+        Args:
+            parsed: Records parsed with TRAFFIC_SCHEMA
+            overspeed: Speed (km/h) above which a vehicle is listed as speeding
+            time_windows: Window name -> hours, or a TimeScheme (defaults to TIME_WINDOWS)
+        """
+        self.parsed = parsed
+        self.overspeed = overspeed
+        # A filtered batch (ParseResult.take) keeps every category; group only over those present
+        zone, vehicle, status = (_present(parsed[name]) for name in ('zone', 'vehicle', 'status'))
+        speed = parsed['speed']
+        violations = parsed['violations']
+        num_zones, num_vehicles = len(zone.categories), len(vehicle.categories)
+        self.zones = zone.categories
+        self.vehicles = vehicle.categories
+
+        violation_lengths = violations.lengths()
+
+        # Zone group-by
+        self.zone_counts = np.bincount(zone.codes, minlength=num_zones)
+        self.zone_speed_sum = np.bincount(zone.codes, weights=speed, minlength=num_zones)
+        self.zone_violations = np.bincount(zone.codes, weights=violation_lengths, minlength=num_zones).astype(np.int64)
+
+        # Most common vehicle per zone; ties go to the type seen first in that zone
+        pair = zone.codes.astype(np.int64) * num_vehicles + vehicle.codes
+        pair_counts = np.bincount(pair, minlength=num_zones * num_vehicles).reshape(num_zones, num_vehicles)
+        pair_first = first_seen_order(pair, num_zones * num_vehicles).reshape(num_zones, num_vehicles)
+        is_top = pair_counts == pair_counts.max(axis=1, keepdims=True, initial=0)
+        self.zone_common_vehicle = np.where(is_top, pair_first, len(pair)).argmin(axis=1) if num_vehicles else \
+            np.zeros(num_zones, dtype=np.int64)
+
+        # Congestion, ordered by each zone's first congested record
+        congested_code = status.code_of('Congested')
+        congested = status.codes == congested_code
+        self.zone_congested = np.bincount(zone.codes[congested], minlength=num_zones)
+        congested_first = first_seen_order(zone.codes[congested], num_zones)
+        self.congested_zones = [z for z in np.argsort(congested_first, kind="stable") if self.zone_congested[z]]
+
+        # Vehicle group-by
+        self.vehicle_counts = np.bincount(vehicle.codes, minlength=num_vehicles)
+        self.vehicle_speed_sum = np.bincount(vehicle.codes, weights=speed, minlength=num_vehicles)
+        self.vehicle_violations = np.bincount(vehicle.codes, weights=violation_lengths, minlength=num_vehicles)
+
+        # Clock times are parsed once; hours and windows come from minute-of-day lookups
+        self.minutes = parsed['minute'] if 'minute' in parsed else parse_minutes(parsed['time'])
+        self.hour_counts = histogram(self.minutes, 60)
+        self._peak = peak(self.minutes, 60)
+        self.time_scheme = time_windows if isinstance(time_windows, TimeScheme) else TimeScheme(time_windows)
+        self.window_names = self.time_scheme.names
+        self.window_codes = self.time_scheme.table[self.minutes]
+
+        # Violation types and speeding vehicles
+        self.violation_types = encode_categories(violations.values.tolist())
+        self.violation_counts = np.bincount(self.violation_types.codes, minlength=len(self.violation_types.categories))
+        self.speeding_rows = np.flatnonzero(speed > overspeed)
+
+        logger.info(f"Aggregated {len(speed)} traffic records over {num_zones} zones")
+
+    def zone_average_speed(self) -> Dict[str, float]:
+        """Q2: average speed per zone"""
+        return dict(zip(self.zones, (self.zone_speed_sum / np.maximum(self.zone_counts, 1)).tolist()))
+
+    def peak_hour(self) -> Tuple[int, int]:
+        """Q3: (hour, vehicle count) of the busiest hour; ties go to the hour seen first"""
+        start, count = self._peak
+        return (None if start is None else start // 60), count
+
+    def violation_summary(self) -> Dict[str, int]:
+        """Q5: count per violation type"""
+        return dict(zip(self.violation_types.categories, self.violation_counts.tolist()))
+
+    def safety_index(self) -> Dict[str, float]:
+        """Q6: avg_speed * 0.1 + violation_rate * 20 per zone"""
+        counts = np.maximum(self.zone_counts, 1)
+        scores = self.zone_speed_sum / counts * 0.1 + self.zone_violations / counts * 20
+        return dict(zip(self.zones, scores.tolist()))
+
+    def vehicle_summary(self) -> Dict[str, Dict[str, float]]:
+        """Q7: count, average speed and average violations per vehicle type"""
+        counts = np.maximum(self.vehicle_counts, 1)
+        return {
+            name: {'count': int(count), 'avg_speed': float(speed), 'avg_violations': float(violations)}
+            for name, count, speed, violations in zip(
+                self.vehicles, self.vehicle_counts, self.vehicle_speed_sum / counts, self.vehicle_violations / counts
+            )
+        }
+
+    def congestion(self) -> Dict[str, int]:
+        """Q8: congested record count per zone, in order of first congestion"""
+        return {self.zones[z]: int(self.zone_congested[z]) for z in self.congested_zones}
+
+    def zone_report(self) -> Dict[str, Dict[str, any]]:
+        """Q10: vehicles, average speed, violations, most common vehicle and safety label per zone"""
+        report = {}
+        for z, zone in enumerate(self.zones):
+            count = int(self.zone_counts[z])
+            rate = self.zone_violations[z] / count
+            report[zone] = {
+                'vehicles': count,
+                'avg_speed': self.zone_speed_sum[z] / count,
+                'violations': int(self.zone_violations[z]),
+                'common_vehicle': self.vehicles[self.zone_common_vehicle[z]],
+                'safety': "Very Safe" if rate == 0 else "Safe" if rate < 0.5 else "Needs Attention"
+            }
+        return report
+
+    def time_windows(self) -> CategoryColumn:
+        """Q9: time window of every record"""
+        return CategoryColumn(self.window_codes, self.window_names)
+
+    def format(self) -> str:
+        """Q2-Q10 printed exactly as the notebook prints them"""
+        ids = self.parsed['id']
+        speed = self.parsed['speed']
+        vehicle = self.parsed['vehicle']
+        times = self.parsed['time']
+        lines = []
+
+        lines.extend(f"Zone {zone}: {avg:.1f} km/h" for zone, avg in self.zone_average_speed().items())
+
+        hour, count = self.peak_hour()
+        lines.append(f"Peak hour: {'None' if hour is None else f'{hour:02d}'}:00")
+        lines.append(f"Vehicles during peak: {count}")
+
+        lines.append(f"Vehicles over {self.overspeed} km/h:")
+        lines.extend(
+            f"ID {ids[i]}: {vehicle[i]} - {speed[i]} km/h" for i in self.speeding_rows.tolist()
+        )
+
+        lines.append("Violation counts:")
+        lines.extend(f"{name}: {count}" for name, count in self.violation_summary().items())
+
+        lines.append("Safety index:")
+        lines.extend(f"Zone {zone}: {score:.2f}" for zone, score in self.safety_index().items())
+
+        lines.append("Vehicle summary:")
+        lines.extend(
+            f"{name}: {s['count']} vehicles, {s['avg_speed']:.1f} km/h, {s['avg_violations']:.1f} violations"
+            for name, s in self.vehicle_summary().items()
+        )
+
+        lines.append("Congested zones:")
+        lines.extend(f"Zone {zone}: {count} congested" for zone, count in self.congestion().items())
+
+        lines.append("Time windows:")
+        lines.extend(
+            f"ID {i}: {t} → {self.window_names[w]}"
+            for i, t, w in zip(ids.tolist(), times.tolist(), self.window_codes.tolist())
+        )
+
+        lines.append("FINAL ZONE REPORT:")
+        lines.extend(
+            f"Zone {zone}: {r['vehicles']} vehicles, {r['avg_speed']:.1f} km/h, {r['violations']} violations, "
+            f"{r['common_vehicle']}, {r['safety']}"
+            for zone, r in self.zone_report().items()
+        )
+        return "\n".join(lines)
+
+
+def _present(column: CategoryColumn) -> CategoryColumn:
+    """Column recoded to the categories its rows use, in first-seen order of those rows"""
+    first = first_seen_order(column.codes, len(column.categories))
+    present = np.argsort(first, kind="stable")[:int((first < len(column.codes)).sum())]
+    remap = np.zeros(len(column.categories), dtype=np.int32)
+    remap[present] = np.arange(len(present), dtype=np.int32)
+    return CategoryColumn(remap[column.codes], [column.categories[c] for c in present])
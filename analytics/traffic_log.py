@@ -0,0 +1,441 @@
+"""
+Traffic Log Module
+Append-only, memory-mapped columnar storage for traffic history with zone and time-of-day indexes
+"""
+
+from typing import List, Iterable, Union
+import json
+import logging
+import os
+
+import numpy as np
+
+from .records import RecordParser, ParseResult, CategoryColumn, ListColumn, encode_categories, TRAFFIC_SCHEMA
+from .time_buckets import parse_minutes, format_minutes, MINUTES_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 3
+
+# Row ids in the (zone, time bucket) lists
+ROW_DTYPE = np.uint32
+
+# Fixed-width columns, one file each; category columns hold codes into the log's dictionaries
+COLUMN_DTYPES = {
+    'id': np.int64,
+    'zone': np.uint16,
+    'vehicle': np.uint16,
+    'speed': np.int16,
+    'minute': np.int16,
+    'status': np.uint16
+}
+DICTIONARY_COLUMNS = ('zone', 'vehicle', 'status', 'violation')
+
+# Violations are a list column: codes plus rows + 1 offsets
+_VIOLATION_CODES = ('violation_codes', np.uint16)
+_VIOLATION_OFFSETS = ('violation_offsets', np.int64)
+
+
+def minute_of_day(clock: Union[str, int]) -> int:
+    """Minute of day of an "HH:MM" string (ints are passed through)"""
+    if isinstance(clock, str):
+        minute = int(parse_minutes([clock])[0])
+        if minute < 0:
+            raise ValueError(f"Invalid time '{clock}' (expected HH:MM)")
+        return minute
+    return int(clock)
+
+
+class TrafficLog:
+    """Append-only columnar traffic log in a directory of memory-mapped files"""
+
+    def __init__(self, path: str, bucket_minutes: int = 60):
+        """
+        Open or create a log
+
+        Rows past the count recorded in meta.json (an interrupted append) are truncated away.
+
+        Args:
+            path: Log directory
+            bucket_minutes: Width of the time-of-day buckets of the (zone, time) index (fixed when
+                the log is created)
+        """
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        try:
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                if meta['version'] != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported traffic log version {meta['version']}")
+                self.num_rows = meta['rows']
+                self.bucket_minutes = meta['bucket_minutes']
+                self.dictionaries = meta['dictionaries']
+                self._repair()
+            else:
+                if not 0 < bucket_minutes <= MINUTES_PER_DAY:
+                    raise ValueError(f"bucket_minutes must be between 1 and {MINUTES_PER_DAY}")
+                os.makedirs(os.path.join(path, "slots"), exist_ok=True)
+                self.num_rows = 0
+                self.bucket_minutes = bucket_minutes
+                self.dictionaries = {name: [] for name in DICTIONARY_COLUMNS}
+                np.zeros(1, dtype=_VIOLATION_OFFSETS[1]).tofile(self._file(_VIOLATION_OFFSETS[0]))
+                self._write_meta()
+        except (OSError, KeyError, json.JSONDecodeError) as e:
+            logger.error(f"Error opening traffic log {path}: {str(e)}")
+            raise
+        self._codes = {name: {value: code for code, value in enumerate(values)} for name, values in self.dictionaries.items()}
+        self._maps = {}
+
+    def __len__(self):
+        return self.num_rows
+
+    def append(self, parsed: ParseResult) -> int:
+        """
+        Append records parsed with TRAFFIC_SCHEMA
+
+        Args:
+            parsed: Parsed batch
+
+        Returns:
+            Number of rows appended
+        """
+        n = len(parsed)
+        if n == 0:
+            return 0
+        first = self.num_rows
+        if first + n > np.iinfo(ROW_DTYPE).max:
+            raise ValueError("Too many rows for the log format")
+        columns = {
+            'id': parsed['id'],
+            'zone': self._encode('zone', parsed['zone']),
+            'vehicle': self._encode('vehicle', parsed['vehicle']),
+            'speed': parsed['speed'],
+            'minute': parse_minutes(parsed['time']),
+            'status': self._encode('status', parsed['status'])
+        }
+        violations = parsed['violations']
+        violation_codes = self._encode('violation', encode_categories(violations.values.tolist()))
+        offsets = self._violation_count() + violations.offsets[1:]
+
+        try:
+            for name, dtype in COLUMN_DTYPES.items():
+                self._append_file(name, np.asarray(columns[name]).astype(dtype))
+            self._append_file(_VIOLATION_CODES[0], violation_codes.astype(_VIOLATION_CODES[1]))
+            self._append_file(_VIOLATION_OFFSETS[0], offsets.astype(_VIOLATION_OFFSETS[1]))
+
+            # Per-(zone, time bucket) row lists stay sorted because rows only grow; rows
+            # without a valid time go to an extra bucket that only zone_rows() reads
+            minute = columns['minute']
+            buckets = np.where(minute >= 0, minute // self.bucket_minutes, self.num_buckets)
+            slots = columns['zone'] * (self.num_buckets + 1) + buckets
+            for slot, group in _groups(slots):
+                zone_code, bucket = divmod(slot, self.num_buckets + 1)
+                self._append_file(self._slot_name(zone_code, bucket), (group + first).astype(ROW_DTYPE))
+
+            self.num_rows += n
+            self._write_meta()
+        except OSError as e:
+            logger.error(f"Error appending to traffic log {self.path}: {str(e)}")
+            raise
+        self._maps = {}
+        return n
+
+    def append_lines(self, lines: Iterable[str]) -> int:
+        """
+        Parse and append log strings
+
+        Args:
+            lines: Lines such as "id:501,zone:A1,vehicle:Car,speed:62,time:08:30,violations:[None],status:Smooth"
+
+        Returns:
+            Number of rows appended (quarantined lines are logged by the parser and skipped)
+        """
+        return self.append(RecordParser(TRAFFIC_SCHEMA).parse(lines))
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read-only zero-copy view of a column (category columns hold codes into self.dictionaries)
+
+        Args:
+            name: One of COLUMN_DTYPES
+
+        Returns:
+            Memory-mapped array of len(self) values
+        """
+        return self._map(name, COLUMN_DTYPES[name], self.num_rows)
+
+    def violations(self) -> ListColumn:
+        """Violation codes per row as a zero-copy ListColumn"""
+        offsets = self._map(_VIOLATION_OFFSETS[0], _VIOLATION_OFFSETS[1], self.num_rows + 1)
+        return ListColumn(self._map(_VIOLATION_CODES[0], _VIOLATION_CODES[1], int(offsets[-1])), offsets)
+
+    def _violation_count(self) -> int:
+        """Number of stored violation codes"""
+        return int(self._map(_VIOLATION_OFFSETS[0], _VIOLATION_OFFSETS[1], self.num_rows + 1)[-1])
+
+    def zone_rows(self, zone: str) -> np.ndarray:
+        """
+        Sorted row ids of a zone, merged from its time bucket lists
+
+        Args:
+            zone: Zone name
+
+        Returns:
+            int64 row ids (empty for an unknown zone)
+        """
+        code = self._codes['zone'].get(zone)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._merge([self._row_list(self._slot_name(code, bucket)) for bucket in range(self.num_buckets + 1)])
+
+    @property
+    def num_buckets(self) -> int:
+        return -(-MINUTES_PER_DAY // self.bucket_minutes)
+
+    def time_buckets(self, start: Union[str, int], end: Union[str, int]) -> List[tuple]:
+        """
+        Time-of-day buckets a range touches
+
+        The log has no dates, so the index is keyed by time of day: every bucket holds its
+        rows from all days and a range reads the same buckets however long the log spans.
+
+        Args:
+            start: "HH:MM" or minute of day (inclusive)
+            end: "HH:MM" or minute of day (exclusive); end <= start wraps past midnight
+
+        Returns:
+            (bucket, partial) pairs; rows of partial buckets still need their minute checked
+        """
+        covered = _in_range(np.arange(MINUTES_PER_DAY), minute_of_day(start), minute_of_day(end))
+        starts = np.arange(0, MINUTES_PER_DAY, self.bucket_minutes)
+        counts = np.add.reduceat(covered.astype(np.int64), starts)
+        sizes = np.diff(np.append(starts, MINUTES_PER_DAY))
+        return [(bucket, bool(counts[bucket] < sizes[bucket])) for bucket in np.flatnonzero(counts).tolist()]
+
+    def rows(self, zone: str = None, start: Union[str, int] = None, end: Union[str, int] = None) -> np.ndarray:
+        """
+        Row ids matching a zone and/or a time-of-day range
+
+        A zone and time range reads only the zone's row lists of the time buckets it touches;
+        minute values are read just for the rows of the buckets at its edges. A time range
+        over all zones scans the minute column, which is as fast as merging every zone's lists.
+
+        Args:
+            zone: Zone name (None: all zones)
+            start: Range start as "HH:MM" or minute of day (None: no time filter)
+            end: Range end, exclusive; end <= start wraps past midnight
+
+        Returns:
+            Sorted int64 row ids
+        """
+        if (start is None) != (end is None):
+            raise ValueError("Pass both start and end for a time range")
+        if start is None:
+            if zone is not None:
+                return self.zone_rows(zone)
+            return np.arange(self.num_rows, dtype=np.int64)
+        if zone is None:
+            return np.flatnonzero(_in_range(self.column('minute'), minute_of_day(start), minute_of_day(end)))
+
+        code = self._codes['zone'].get(zone)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        buckets = self.time_buckets(start, end)
+        start, end = minute_of_day(start), minute_of_day(end)
+        minute = self.column('minute')
+        matches = []
+        for bucket, partial in buckets:
+            rows = self._row_list(self._slot_name(code, bucket))
+            matches.append(rows[_in_range(minute[rows], start, end)] if partial else rows)
+        return self._merge(matches)
+
+    def select(self, zone: str = None, start: Union[str, int] = None, end: Union[str, int] = None) -> ParseResult:
+        """
+        Matching rows as a ParseResult (TRAFFIC_SCHEMA columns plus 'minute'), e.g. for TrafficAnalytics
+
+        Only the selected rows are copied out of the mapped files; categories are in
+        first-seen order of the selection, as the parser would produce them.
+
+        Args:
+            zone: Zone name (None: all zones)
+            start: Range start as "HH:MM" or minute of day
+            end: Range end, exclusive
+
+        Returns:
+            ParseResult whose line_numbers are the log row ids
+        """
+        rows = self.rows(zone, start, end)
+        minute = np.asarray(self.column('minute')[rows], dtype=np.int64)
+        violations = self.violations().take(rows)
+        violation_names = np.array(self.dictionaries['violation'], dtype=object)
+        columns = {
+            'id': np.asarray(self.column('id')[rows], dtype=np.int64),
+            'zone': self._decode('zone', rows),
+            'vehicle': self._decode('vehicle', rows),
+            'speed': np.asarray(self.column('speed')[rows], dtype=np.int64),
+            'time': format_minutes(minute),
+            'violations': ListColumn(violation_names[violations.values.astype(np.int64)], violations.offsets),
+            'status': self._decode('status', rows),
+            'minute': minute
+        }
+        return ParseResult(columns, rows, [])
+
+    def _encode(self, name: str, column: CategoryColumn) -> np.ndarray:
+        """Map a batch's category codes onto the log dictionary, extending it with new values"""
+        codes = self._codes[name]
+        values = self.dictionaries[name]
+        for value in column.categories:
+            if value not in codes:
+                codes[value] = len(values)
+                values.append(value)
+        if len(values) > np.iinfo(np.uint16).max:
+            raise ValueError(f"Too many distinct {name} values for the log format")
+        remap = np.array([codes[value] for value in column.categories], dtype=np.int64)
+        return remap[column.codes] if len(remap) else np.zeros(len(column.codes), dtype=np.int64)
+
+    def _decode(self, name: str, rows: np.ndarray) -> CategoryColumn:
+        """Category column of selected rows, recoded to first-seen order"""
+        codes = np.asarray(self.column(name)[rows], dtype=np.int64)
+        present, first = np.unique(codes, return_index=True)
+        present = present[np.argsort(first)]
+        remap = np.zeros(len(self.dictionaries[name]), dtype=np.int32)
+        remap[present] = np.arange(len(present), dtype=np.int32)
+        return CategoryColumn(remap[codes], [self.dictionaries[name][c] for c in present])
+
+    def _slot_name(self, zone_code: int, bucket: int) -> str:
+        return f"slots/{zone_code}_{bucket}"
+
+    def _merge(self, lists: List[np.ndarray]) -> np.ndarray:
+        """Sorted int64 union of disjoint sorted row lists"""
+        lists = [rows for rows in lists if len(rows)]
+        if not lists:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.concatenate(lists).astype(np.int64)
+        if len(lists) == 1:
+            return rows
+        # Sort small selections, mark large ones in a row mask
+        if len(rows) * 64 < self.num_rows:
+            return np.sort(rows)
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[rows] = True
+        return np.flatnonzero(mask)
+
+    def _row_list(self, name: str) -> np.ndarray:
+        """
+        Rows of a (zone, time bucket) list (empty if it was never written)
+
+        Read rather than mapped: there is one list per zone and bucket, and keeping a map
+        (and its file descriptor) open for each would exhaust the process's file limit.
+        """
+        try:
+            return np.fromfile(self._file(name), dtype=ROW_DTYPE)
+        except FileNotFoundError:
+            return np.zeros(0, dtype=ROW_DTYPE)
+
+    def _repair(self):
+        """Truncate files written past the last recorded append"""
+        for name, dtype in COLUMN_DTYPES.items():
+            _truncate(self._file(name), self.num_rows * np.dtype(dtype).itemsize)
+        offsets_path = self._file(_VIOLATION_OFFSETS[0])
+        _truncate(offsets_path, (self.num_rows + 1) * 8)
+        num_codes = int(np.fromfile(offsets_path, dtype=np.int64, count=self.num_rows + 1)[-1])
+        _truncate(self._file(_VIOLATION_CODES[0]), num_codes * np.dtype(_VIOLATION_CODES[1]).itemsize)
+        for name in os.listdir(os.path.join(self.path, "slots")):
+            path = os.path.join(self.path, "slots", name)
+            rows = np.fromfile(path, dtype=ROW_DTYPE)
+            _truncate(path, int(np.searchsorted(rows, self.num_rows)) * np.dtype(ROW_DTYPE).itemsize)
+
+    def _write_meta(self):
+        """Atomically record the row count and dictionaries"""
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': self.num_rows,
+            'bucket_minutes': self.bucket_minutes,
+            'columns': {name: np.dtype(dtype).str for name, dtype in COLUMN_DTYPES.items()},
+            'dictionaries': self.dictionaries
+        }
+        tmp_path = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+
+    def _append_file(self, name: str, values: np.ndarray):
+        self._maps.pop(name, None)
+        with open(self._file(name), "ab") as f:
+            f.write(values.tobytes())
+
+    def _map(self, name: str, dtype, length: int) -> np.ndarray:
+        """Cached read-only memory map of the first length values of a file"""
+        view = self._maps.get(name)
+        if view is None or len(view) != length:
+            if length == 0:
+                view = np.zeros(0, dtype=dtype)
+            else:
+                view = np.memmap(self._file(name), dtype=dtype, mode="r", shape=(length,))
+            self._maps[name] = view
+        return view
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+
+def convert_traffic_logs(source: Union[str, Iterable[str]], path: str, batch_size: int = 100000,
+                         bucket_minutes: int = 60) -> TrafficLog:
+    """
+    Convert free-text traffic logs into a TrafficLog
+
+    Args:
+        source: Text file with one log line per line, or an iterable of log lines
+        path: Log directory (appended to if it already holds a log)
+        batch_size: Lines parsed per batch
+        bucket_minutes: Width of the time-of-day index buckets for a new log
+
+    Returns:
+        The TrafficLog
+    """
+    log = TrafficLog(path, bucket_minutes=bucket_minutes)
+    parser = RecordParser(TRAFFIC_SCHEMA)
+    if isinstance(source, str):
+        batches = parser.parse_file(source, batch_size=batch_size)
+    else:
+        batches = _batches(parser, source, batch_size)
+    for batch in batches:
+        log.append(batch)
+    logger.info(f"Converted traffic logs into {path} ({len(log)} rows)")
+    return log
+
+
+def _batches(parser: RecordParser, lines: Iterable[str], batch_size: int):
+    batch = []
+    first = 1
+    for line in lines:
+        batch.append(line)
+        if len(batch) == batch_size:
+            yield parser.parse(batch, first_line_number=first)
+            first += len(batch)
+            batch = []
+    if batch:
+        yield parser.parse(batch, first_line_number=first)
+
+
+def _in_range(minutes: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Mask of minutes in [start, end), wrapping past midnight when end <= start"""
+    if start < end:
+        return (minutes >= start) & (minutes < end)
+    return (minutes >= start) | ((minutes < end) & (minutes >= 0))
+
+
+def _groups(keys: np.ndarray) -> List[tuple]:
+    """(key, positions) of every distinct key, positions in ascending order"""
+    if len(keys) == 0:
+        return []
+    order = np.argsort(keys, kind="stable")
+    bounds = np.flatnonzero(np.diff(keys[order])) + 1
+    return [(int(keys[group[0]]), group) for group in np.split(order, bounds)]
+
+
+def _truncate(path: str, size: int):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
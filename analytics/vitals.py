@@ -0,0 +1,263 @@
+"""
+Vitals Module
+Incremental per-doctor aggregates, glucose extremes, top-k risk and threshold alerts over a live vitals feed
+"""
+
+from typing import List, Dict, Tuple, Callable
+from collections import deque
+import heapq
+import logging
+
+from .records import RecordParser, RecordParseError, PATIENT_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+HR_ALERT = 100
+BP_ALERT = (140, 90)
+MIN_DOCTOR_LOAD = 2
+
+# Patient state slots
+_DOCTOR, _NAME, _HR, _GLUCOSE, _SCORE, _ORDER = range(6)
+
+
+def risk_score(reading: Dict[str, any], hr_alert: int = HR_ALERT, bp_alert: Tuple[int, int] = BP_ALERT) -> int:
+    """How far HR and BP exceed the alert thresholds combined (0 when within them)"""
+    return (max(reading['hr'] - hr_alert, 0) + max(reading['bp_systolic'] - bp_alert[0], 0) +
+            max(reading['bp_diastolic'] - bp_alert[1], 0))
+
+
+class VitalsMonitor:
+    """Latest vitals per patient with O(1) per-doctor sums and lazily pruned glucose and risk heaps"""
+
+    def __init__(
+        self,
+        hr_alert: int = HR_ALERT,
+        bp_alert: Tuple[int, int] = BP_ALERT,
+        score: Callable[[Dict[str, any]], float] = None,
+        on_alert: Callable[[Dict[str, any]], None] = None,
+        max_alerts: int = 1000,
+        min_doctor_load: int = MIN_DOCTOR_LOAD
+    ):
+        """
+        Initialize monitor
+
+        Args:
+            hr_alert: Heart rate above which an alert is raised
+            bp_alert: (systolic, diastolic) above either of which an alert is raised
+            score: Risk score of a reading, higher is worse (defaults to risk_score with these thresholds)
+            on_alert: Called with each alert event
+            max_alerts: Recent alerts kept in self.alerts
+            min_doctor_load: Doctors with fewer patients are reported understaffed (Q19)
+        """
+        self.hr_alert = hr_alert
+        self.bp_alert = bp_alert
+        self.score = score
+        self.on_alert = on_alert
+        self.min_doctor_load = min_doctor_load
+        self.parser = RecordParser(PATIENT_SCHEMA)
+        self.alerts = deque(maxlen=max_alerts)
+        self.readings = 0
+        self.rejected = 0
+
+        self.patients = {}
+        # Doctor -> [patients, hr sum, glucose sum], in order of first appearance
+        self.doctors = {}
+        self.hr_sum = 0
+        self._next_order = 0
+
+        # (key, first-seen order, patient id); entries that no longer match the patient are skipped
+        self._min_glucose = []
+        self._max_glucose = []
+        self._risk = []
+        self._compact_at = 1024
+
+    def __len__(self):
+        return len(self.patients)
+
+    def process(self, reading: Dict[str, any]) -> List[Dict[str, any]]:
+        """
+        Record one patient's latest vitals, replacing any earlier reading of that patient
+
+        Args:
+            reading: Record with id, doctor, hr, bp_systolic, bp_diastolic and glucose (name optional)
+
+        Returns:
+            Alerts raised by this reading
+        """
+        pid = reading['id']
+        doctor = reading['doctor']
+        hr = reading['hr']
+        glucose = reading['glucose']
+        systolic, diastolic = reading['bp_systolic'], reading['bp_diastolic']
+        hr_alert = self.hr_alert
+        sys_alert, dia_alert = self.bp_alert
+        if self.score is None:
+            # risk_score, inlined: this runs once per reading
+            score = ((hr - hr_alert if hr > hr_alert else 0) + (systolic - sys_alert if systolic > sys_alert else 0) +
+                     (diastolic - dia_alert if diastolic > dia_alert else 0))
+        else:
+            score = self.score(reading)
+
+        state = self.patients.get(pid)
+        if state is None:
+            order = self._next_order
+            self._next_order += 1
+            self.patients[pid] = [doctor, reading.get('name'), hr, glucose, score, order]
+            glucose_changed = score_changed = True
+        else:
+            self._remove_sums(state)
+            glucose_changed, score_changed = state[_GLUCOSE] != glucose, state[_SCORE] != score
+            order = state[_ORDER]
+            state[:_ORDER] = [doctor, reading.get('name', state[_NAME]), hr, glucose, score]
+        sums = self.doctors.get(doctor)
+        if sums is None:
+            sums = self.doctors[doctor] = [0, 0, 0]
+        sums[0] += 1
+        sums[1] += hr
+        sums[2] += glucose
+        self.hr_sum += hr
+
+        if glucose_changed:
+            heapq.heappush(self._min_glucose, (glucose, order, pid))
+            heapq.heappush(self._max_glucose, (-glucose, order, pid))
+        if score_changed:
+            heapq.heappush(self._risk, (-score, order, pid))
+        self.readings += 1
+        if len(self._min_glucose) > self._compact_at or len(self._risk) > self._compact_at:
+            self._compact()
+
+        alerts = []
+        if hr > hr_alert:
+            alerts.append({'type': 'high_hr', 'id': pid, 'doctor': doctor, 'hr': hr})
+        if systolic > sys_alert or diastolic > dia_alert:
+            alerts.append({'type': 'high_bp', 'id': pid, 'doctor': doctor, 'bp': f"{systolic}/{diastolic}"})
+        if alerts:
+            self.alerts.extend(alerts)
+            if self.on_alert:
+                for alert in alerts:
+                    self.on_alert(alert)
+        return alerts
+
+    def process_line(self, line: str) -> List[Dict[str, any]]:
+        """
+        Parse and process one patient line; lines that do not fit the schema are counted and skipped
+
+        Args:
+            line: Line such as "id:1,name:Ali,age:45,doctor:Dr. Ahmed,hr:88,bp:120/80,glucose:110,feedback:Good"
+
+        Returns:
+            Alerts raised by this reading
+        """
+        try:
+            return self.process(self.parser.parse_record(line))
+        except RecordParseError as e:
+            self.rejected += 1
+            logger.debug(f"Rejected vitals reading: {str(e)}")
+            return []
+
+    def discharge(self, patient_id: int):
+        """Drop a patient from every aggregate (heap entries are pruned lazily)"""
+        state = self.patients.pop(patient_id)
+        self._remove_sums(state)
+
+    def doctor_summary(self) -> Dict[str, Dict[str, float]]:
+        """Q3/Q13: patients, average HR and average glucose per doctor"""
+        return {
+            doctor: {'patients': count, 'avg_hr': hr / count, 'avg_glucose': glucose / count}
+            for doctor, (count, hr, glucose) in self.doctors.items() if count
+        }
+
+    def average_hr(self) -> float:
+        """Q10: average heart rate over all patients"""
+        return self.hr_sum / len(self.patients) if self.patients else 0.0
+
+    def doctor_load(self) -> Dict[str, Tuple[int, bool]]:
+        """Q19: (patients, understaffed) per doctor"""
+        return {
+            doctor: (count, count < self.min_doctor_load)
+            for doctor, (count, _, _) in self.doctors.items() if count
+        }
+
+    def min_glucose(self) -> Tuple[int, int]:
+        """Q5: (patient id, glucose) of the lowest glucose; ties go to the patient seen first"""
+        glucose, _, pid = self._peek(self._min_glucose, lambda state: state[_GLUCOSE])
+        return (pid, glucose) if pid is not None else (None, None)
+
+    def max_glucose(self) -> Tuple[int, int]:
+        """Q6: (patient id, glucose) of the highest glucose; ties go to the patient seen first"""
+        glucose, _, pid = self._peek(self._max_glucose, lambda state: -state[_GLUCOSE])
+        return (pid, -glucose) if pid is not None else (None, None)
+
+    def top_risk(self, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Highest-risk patients
+
+        Args:
+            k: Patients to return
+
+        Returns:
+            (patient id, score), highest first; ties go to the patient seen first
+        """
+        heap = self._risk
+        found, kept = [], []
+        seen = set()
+        while heap and len(found) < k:
+            entry = heapq.heappop(heap)
+            state = self.patients.get(entry[2])
+            if state is None or (-state[_SCORE], state[_ORDER]) != entry[:2] or entry[2] in seen:
+                continue
+            seen.add(entry[2])
+            kept.append(entry)
+            found.append((entry[2], state[_SCORE]))
+        for entry in kept:
+            heapq.heappush(heap, entry)
+        return found
+
+    def format(self) -> str:
+        """Q3/Q13, Q5, Q6, Q10 and Q19 printed as the notebook prints them"""
+        lines = ["", "Q3 & Q13 Doctor Summaries:"]
+        for doctor, s in self.doctor_summary().items():
+            lines.append(f"Doctor: {doctor}")
+            lines.append(f" - Patients: {s['patients']}")
+            lines.append(f" - Avg HR: {s['avg_hr']:.1f}")
+            lines.append(f" - Avg Glucose: {s['avg_glucose']:.1f}")
+        low_id, low = self.min_glucose()
+        high_id, high = self.max_glucose()
+        if low_id is not None:
+            lines.extend(["", f"Q5 Lowest Glucose: {self.patients[low_id][_NAME]} ({low})"])
+            lines.append(f"Q6 Highest Glucose: {self.patients[high_id][_NAME]} ({high})")
+        lines.extend(["", f"Q10 Overall Avg HR: {self.average_hr():.1f}"])
+        lines.extend(["", "Q19 Doctor Load Check:"])
+        for doctor, (count, understaffed) in self.doctor_load().items():
+            if understaffed:
+                lines.append(f" - ALERT: {doctor} is understaffed (only {count} patient)")
+            else:
+                lines.append(f" - {doctor} has sufficient load.")
+        return "\n".join(lines)
+
+    def _remove_sums(self, state: list):
+        sums = self.doctors[state[_DOCTOR]]
+        sums[0] -= 1
+        sums[1] -= state[_HR]
+        sums[2] -= state[_GLUCOSE]
+        self.hr_sum -= state[_HR]
+
+    def _peek(self, heap: list, key: Callable[[list], float]) -> tuple:
+        """Top live entry of a heap, discarding stale ones"""
+        while heap:
+            entry = heap[0]
+            state = self.patients.get(entry[2])
+            if state is not None and (key(state), state[_ORDER]) == entry[:2]:
+                return entry
+            heapq.heappop(heap)
+        return None, None, None
+
+    def _compact(self):
+        """Rebuild the heaps from the live patients once stale entries dominate"""
+        items = [(state[_GLUCOSE], state[_SCORE], state[_ORDER], pid) for pid, state in self.patients.items()]
+        self._min_glucose = [(glucose, order, pid) for glucose, _, order, pid in items]
+        self._max_glucose = [(-glucose, order, pid) for glucose, _, order, pid in items]
+        self._risk = [(-score, order, pid) for _, score, order, pid in items]
+        for heap in (self._min_glucose, self._max_glucose, self._risk):
+            heapq.heapify(heap)
+        self._compact_at = 2 * len(self.patients) + 1024
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+CMS Views Benchmark
+Latency of one student change through DepartmentViews vs recomputing the department summary
+
+Usage:
+    python benchmarks/cms_views.py --students 200000 --changes 100000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.records import RecordParser, STUDENT_SCHEMA
+from analytics.cms import StudentAnalytics
+from analytics.cms_views import DepartmentViews
+from record_parser import make_lines
+
+DEPTS = ['CS', 'IT', 'Math', 'EE']
+
+
+def make_changes(ids, count: int, seed: int = 1):
+    """Exam-upload traffic: mostly new marks, some attendance and transfers, a few admissions and withdrawals"""
+    rng = random.Random(seed)
+    live = list(ids)
+    next_id = max(ids) + 1
+    changes = []
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.05:
+            changes.append(('insert', {'id': next_id, 'name': f"Student {next_id}", 'dept': rng.choice(DEPTS),
+                                       'attendance': rng.randint(40, 100),
+                                       'marks': [rng.randint(30, 100) for _ in range(rng.randint(3, 6))]}))
+            live.append(next_id)
+            next_id += 1
+        elif r < 0.08:
+            changes.append(('delete', live.pop(rng.randrange(len(live)))))
+        elif r < 0.80:
+            marks = [rng.randint(30, 100) for _ in range(rng.randint(3, 6))]
+            changes.append(('update', (rng.choice(live), {'marks': marks})))
+        elif r < 0.97:
+            changes.append(('update', (rng.choice(live), {'attendance': rng.randint(40, 100)})))
+        else:
+            changes.append(('update', (rng.choice(live), {'dept': rng.choice(DEPTS)})))
+    return changes
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200000)
+    parser.add_argument("--changes", type=int, default=100000)
+    args = parser.parse_args()
+
+    parsed = RecordParser(STUDENT_SCHEMA).parse(make_lines("students", args.students))
+    start = time.perf_counter()
+    views = DepartmentViews.from_parsed(parsed)
+    build_s = time.perf_counter() - start
+    assert views.format().split("\n") == StudentAnalytics(parsed).format().split("\n")[-6:], \
+        "views differ from StudentAnalytics"
+
+    changes = make_changes(parsed['id'].tolist(), args.changes)
+    start = time.perf_counter()
+    for kind, change in changes:
+        if kind == 'insert':
+            views.insert(change)
+        elif kind == 'delete':
+            views.delete(change)
+        else:
+            views.update(change[0], **change[1])
+    change_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        views.department_summary()
+    summary_us = (time.perf_counter() - start) / 100 * 1e6
+
+    current = views.to_parsed()
+    start = time.perf_counter()
+    StudentAnalytics(current).department_summary()
+    recompute_s = time.perf_counter() - start
+    start = time.perf_counter()
+    mismatched = views.verify()
+    verify_s = time.perf_counter() - start
+    assert not mismatched, f"views drifted from a full recompute: {mismatched}"
+
+    n = args.changes
+    print(f"students={args.students} changes={n} (views identical to a full recompute afterwards)")
+    print(f"initial build:               {build_s:7.2f} s")
+    print(f"one change (insert/update/delete): {change_s / n * 1e6:7.1f} us  ({n / change_s / 1e3:.0f}k changes/s)")
+    print(f"department summary query:    {summary_us:7.1f} us")
+    print(f"full recompute (vectorized): {recompute_s * 1e3:7.1f} ms per change "
+          f"({recompute_s / (change_s / n):,.0f}x the incremental update)")
+    print(f"verify():                    {verify_s:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
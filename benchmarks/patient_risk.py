@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Patient Risk Benchmark
+Patients/sec of the notebook's per-patient Q4/Q7/Q11/Q15/Q17 loops vs RiskEngine masks
+
+Usage:
+    python benchmarks/patient_risk.py --patients 1000000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.records import RecordParser, PATIENT_SCHEMA
+from analytics.patient_risk import RiskEngine
+from record_parser import make_lines, notebook_patients
+
+
+def notebook_rules(clean_patients):
+    """Q4, Q7, Q11, Q15 and Q17 of Smart_Health_Care.ipynb, collecting instead of printing"""
+    high_hr = [p['name'] for p in clean_patients if p['hr'] > 100]
+
+    high_bp = []
+    for p in clean_patients:
+        bp_parts = p['bp'].split('/')
+        if int(bp_parts[0]) > 140 or int(bp_parts[1]) > 90:
+            high_bp.append(p['name'])
+
+    grades = []
+    for p in clean_patients:
+        hr = p['hr']
+        if hr < 70:
+            grade = "A (Excellent)"
+        elif 70 <= hr <= 89:
+            grade = "B (Stable)"
+        elif 90 <= hr <= 110:
+            grade = "C (Concern)"
+        else:
+            grade = "D (High Risk)"
+        grades.append(grade)
+
+    tags = []
+    for p in clean_patients:
+        bp_sys = int(p['bp'].split('/')[0])
+        bp_dia = int(p['bp'].split('/')[1])
+        tags.append("Severe" if (bp_sys > 140 or bp_dia > 90) or (p['feedback'] == "Critical") else "Normal")
+
+    underrated = [p['name'] for p in clean_patients if p['hr'] < 90 and p['feedback'] in ["Fair", "Critical"]]
+    return high_hr, high_bp, grades, tags, underrated
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_lines("patients", args.patients)
+    clean_patients = notebook_patients(lines)
+    start = time.perf_counter()
+    parsed = RecordParser(PATIENT_SCHEMA).parse(lines)
+    parse_s = time.perf_counter() - start
+    del lines
+
+    engine = RiskEngine()
+    start = time.perf_counter()
+    expected = notebook_rules(clean_patients)
+    loop_s = time.perf_counter() - start
+
+    engine_s = float("inf")
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        result = engine.evaluate(parsed)
+        engine_s = min(engine_s, time.perf_counter() - start)
+
+    names = parsed['name']
+    got = (
+        names[result.rows('high_hr')].tolist(),
+        names[result.rows('high_bp')].tolist(),
+        result['hr_grade'].to_list(),
+        result['condition'].to_list(),
+        names[result.rows('underrated')].tolist()
+    )
+    assert got == expected, "RiskEngine outputs differ from the notebook loops"
+
+    n = args.patients
+    print(f"patients={n} (flags, grades and tags identical to the notebook)")
+    print(f"notebook loops:                {loop_s:7.2f} s  {n / loop_s / 1e6:7.2f}M patients/s")
+    print(f"RiskEngine.evaluate:           {engine_s:7.3f} s  {n / engine_s / 1e6:7.2f}M patients/s "
+          f"({loop_s / engine_s:.0f}x)")
+    print(f"RecordParser (bp split once):  {parse_s:7.2f} s  {n / parse_s / 1e6:7.2f}M patients/s")
+    print(f"flag counts: { {k: v for k, v in result.counts().items() if not isinstance(v, dict)} }")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Patient Store Benchmark
+Query latency of the notebook's list scans vs PatientStore hash and sorted indexes
+
+Usage:
+    python benchmarks/patient_store.py --patients 1000000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.records import RecordParser, PATIENT_SCHEMA
+from analytics.patient_store import PatientStore
+from record_parser import make_lines, notebook_patients
+
+
+def notebook_queries(clean_patients):
+    """Q5, Q6, Q13, Q14 and Q16 of Smart_Health_Care.ipynb, collecting instead of printing"""
+    min_glucose = min(clean_patients, key=lambda x: x['glucose'])
+    max_glucose = max(clean_patients, key=lambda x: x['glucose'])
+    doctor_patients = {}
+    for p in clean_patients:
+        doctor_patients.setdefault(p['doctor'], []).append(p['hr'])
+    doctor_avg_hr = {doc: sum(hrs) / len(hrs) for doc, hrs in doctor_patients.items()}
+    seniors = [p['name'] for p in clean_patients if p['age'] >= 60]
+    oldest = sorted(clean_patients, key=lambda x: x['age'], reverse=True)[0]
+    return min_glucose['id'], max_glucose['id'], doctor_avg_hr, seniors, oldest['id']
+
+
+def store_queries(store):
+    """The same answers from the indexes"""
+    ids = store.columns['id']
+    min_id, max_id = ids[store.top_k('glucose', 1, largest=False)[0]], ids[store.top_k('glucose', 1)[0]]
+    doctor_avg_hr = {doc: s['avg_hr'] for doc, s in store.doctor_summary().items()}
+    seniors = [store.names[i] for i in store.range('age', 60).tolist()]
+    return int(min_id), int(max_id), doctor_avg_hr, seniors, int(ids[store.top_k('age', 1)[0]])
+
+
+def latency_us(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1000000)
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    lines = make_lines("patients", args.patients)
+    clean_patients = notebook_patients(lines)
+    parsed = RecordParser(PATIENT_SCHEMA).parse(lines)
+    del lines
+
+    start = time.perf_counter()
+    store = PatientStore.from_parsed(parsed)
+    load_s = time.perf_counter() - start
+    assert store_queries(store) == notebook_queries(clean_patients), "PatientStore answers differ from the notebook"
+
+    # Incremental maintenance: every update moves index entries, then the answers must still match a scan
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(args.updates):
+        pid = rng.randrange(args.patients)
+        changes = {'age': rng.randint(18, 90), 'glucose': rng.randint(70, 200), 'hr': rng.randint(55, 120)}
+        store.update(pid, **changes)
+        clean_patients[pid].update(changes)
+    update_us = (time.perf_counter() - start) / max(args.updates, 1) * 1e6
+    assert store_queries(store) == notebook_queries(clean_patients), "indexes drifted after updates"
+
+    template = store.get_row(0)
+    start = time.perf_counter()
+    for i in range(args.updates):
+        store.insert(dict(template, id=args.patients + i, name=f"New {i}", age=rng.randint(18, 90),
+                          glucose=rng.randint(70, 200), hr=rng.randint(55, 120)))
+    insert_us = (time.perf_counter() - start) / max(args.updates, 1) * 1e6
+
+    queries = [
+        ("min/max glucose (Q5/Q6)", lambda: (store.top_k('glucose', 1, False), store.top_k('glucose', 1)),
+         lambda: (min(clean_patients, key=lambda x: x['glucose']), max(clean_patients, key=lambda x: x['glucose']))),
+        ("oldest patient (Q16)", lambda: store.top_k('age', 1),
+         lambda: sorted(clean_patients, key=lambda x: x['age'], reverse=True)[0]),
+        ("top-10 heart rates", lambda: store.top_k('hr', 10),
+         lambda: sorted(clean_patients, key=lambda x: x['hr'], reverse=True)[:10]),
+        ("seniors count (age >= 60)", lambda: store.count('age', 60),
+         lambda: sum(1 for p in clean_patients if p['age'] >= 60)),
+        ("glucose 150-152 rows", lambda: store.range('glucose', 150, 152),
+         lambda: [p for p in clean_patients if 150 <= p['glucose'] <= 152]),
+        ("per-doctor avg HR (Q13)", lambda: store.doctor_summary(), lambda: notebook_queries(clean_patients)[2]),
+        ("feedback counts (Q9)", lambda: store.feedback_counts(), None),
+    ]
+
+    print(f"patients={args.patients} (answers identical to the notebook before and after {args.updates} updates)")
+    print(f"bulk load + index build: {load_s:7.2f} s")
+    print(f"update (3 indexed fields): {update_us:7.1f} us   insert: {insert_us:7.1f} us")
+    print(f"{'query':28s} {'indexed':>12s} {'notebook scan':>15s}")
+    for name, indexed, scan in queries:
+        fast = latency_us(indexed, args.repeats)
+        slow = latency_us(scan, 1) if scan else None
+        print(f"{name:28s} {fast:9.1f} us " + (f"{slow / 1000:12.1f} ms ({slow / fast:,.0f}x)" if slow else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Record Parser Benchmark
+Lines/sec of the notebooks' split(',') / split(':', 1) loops vs the columnar RecordParser
+
+Usage:
+    python benchmarks/record_parser.py --lines 500000 --batch-size 100000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.records import RecordParser, TRAFFIC_SCHEMA, PATIENT_SCHEMA, STUDENT_SCHEMA
+
+
+def notebook_traffic(logs):
+    """Q1 of Smart_City_Traffic_Safety Analysis.ipynb"""
+    structured_data = []
+    for log in logs:
+        parts = log.split(',')
+        vehicle_data = {}
+        for part in parts:
+            key, value = part.split(':', 1)
+            if key == 'id' or key == 'speed':
+                value = int(value)
+            elif key == 'violations':
+                value = value.strip('[]')
+                value = [] if value == 'None' else [value]
+            vehicle_data[key] = value
+        structured_data.append(vehicle_data)
+    return structured_data
+
+
+def notebook_patients(rows):
+    """Q1 of Smart_Health_Care.ipynb (bp stays a string there; it is split again in Q7 and Q15)"""
+    clean_patients = []
+    for row in rows:
+        patient_dict = {}
+        for part in row.split(','):
+            if ':' in part:
+                key, value = part.split(':', 1)
+                key = key.strip()
+                value = value.strip()
+                if key in ['id', 'age', 'hr', 'glucose']:
+                    patient_dict[key] = int(value)
+                else:
+                    patient_dict[key] = value
+        clean_patients.append(patient_dict)
+    return clean_patients
+
+
+def notebook_students(records):
+    """Q1 of University_CMS_Analyzer.ipynb (drops every mark but the first: marks contain commas)"""
+    parsed_students = []
+    for record in records:
+        try:
+            student_info = {}
+            for part in record.split(','):
+                if ':' in part:
+                    key, value = part.split(':', 1)
+                    key = key.strip()
+                    value = value.strip()
+                    if key == 'id':
+                        student_info['id'] = int(value)
+                    elif key == 'attendance':
+                        student_info['attendance'] = int(value)
+                    elif key == 'marks':
+                        student_info['marks'] = [int(m) for m in value.strip('[]').split(',')]
+                    else:
+                        student_info[key] = value
+            parsed_students.append(student_info)
+        except ValueError:
+            pass
+    return parsed_students
+
+
+def make_lines(kind: str, n: int, seed: int = 0):
+    """Synthetic records in the notebooks' formats"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        if kind == "traffic":
+            violation = rng.choice(["None", "None", "None", "Helmet", "Overspeed", "Signal"])
+            lines.append(
+                f"id:{i},zone:{rng.choice('ABCDEFGH')}{rng.randint(1, 9)},"
+                f"vehicle:{rng.choice(['Car', 'Bike', 'Bus', 'Truck'])},speed:{rng.randint(20, 130)},"
+                f"time:{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d},violations:[{violation}],"
+                f"status:{rng.choice(['Smooth', 'Busy', 'Congested'])}"
+            )
+        elif kind == "patients":
+            lines.append(
+                f"id:{i},name:Patient {i},age:{rng.randint(18, 90)},doctor:Dr. {rng.choice(['Ahmed', 'Sara', 'Bilal', 'Noor'])},"
+                f"hr:{rng.randint(55, 120)},bp:{rng.randint(100, 170)}/{rng.randint(60, 105)},"
+                f"glucose:{rng.randint(70, 200)},feedback:{rng.choice(['Excellent', 'Good', 'Fair', 'Critical'])}"
+            )
+        else:
+            marks = ",".join(str(rng.randint(30, 100)) for _ in range(rng.randint(3, 6)))
+            lines.append(
+                f"id:{i}, name: Student {i}, dept: {rng.choice(['CS', 'IT', 'Math', 'EE'])}, "
+                f"attendance:{rng.randint(40, 100)}, marks: [{marks}], feedback: {rng.choice(['Helpful', 'Good', 'Average'])}"
+            )
+    return lines
+
+
+def rate(fn, arg, n: int, repeats: int) -> float:
+    """Lines per second of the fastest of several calls"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=500000)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--bad-rate", type=float, default=0.001, help="Fraction of malformed traffic lines in the quarantine run")
+    args = parser.parse_args()
+
+    cases = [
+        ("traffic", notebook_traffic, TRAFFIC_SCHEMA),
+        ("patients", notebook_patients, PATIENT_SCHEMA),
+        ("students", notebook_students, STUDENT_SCHEMA)
+    ]
+    print(f"lines={args.lines}")
+    for name, loop, schema in cases:
+        lines = make_lines(name, args.lines)
+        record_parser = RecordParser(schema)
+
+        loop_rate = rate(loop, lines, args.lines, args.repeats)
+        columnar_rate = rate(record_parser.parse, lines, args.lines, args.repeats)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("\n".join(lines))
+        try:
+            start = time.perf_counter()
+            parsed = sum(len(batch) for batch in record_parser.parse_file(f.name, batch_size=args.batch_size))
+            file_rate = parsed / (time.perf_counter() - start)
+        finally:
+            os.unlink(f.name)
+
+        print(f"{name:<9} notebook loop: {loop_rate / 1e3:8.0f}k lines/s  "
+              f"RecordParser: {columnar_rate / 1e3:8.0f}k lines/s ({columnar_rate / loop_rate:.1f}x)  "
+              f"streamed file: {file_rate / 1e3:8.0f}k lines/s")
+
+    # Malformed lines send their part of a batch down the per-record path
+    lines = make_lines("traffic", args.lines)
+    rng = random.Random(1)
+    for i in rng.sample(range(args.lines), int(args.lines * args.bad_rate)):
+        lines[i] = lines[i].replace("speed:", "speed:x")
+    record_parser = RecordParser(TRAFFIC_SCHEMA)
+    columnar_rate = rate(record_parser.parse, lines, args.lines, args.repeats)
+    quarantined = len(record_parser.parse(lines).quarantine)
+    print(f"traffic with {args.bad_rate:.1%} malformed lines: RecordParser {columnar_rate / 1e3:8.0f}k lines/s "
+          f"({quarantined} quarantined)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Traffic Group-By Benchmark
+Records/sec of the notebook's Q2-Q10 dict-of-lists passes vs the columnar TrafficAnalytics
+
+Usage:
+    python benchmarks/traffic_groupby.py --records 1000000
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.records import RecordParser, TRAFFIC_SCHEMA
+from analytics.traffic import TrafficAnalytics
+from record_parser import make_lines, notebook_traffic
+
+
+def notebook_aggregates(structured_data):
+    """Q2-Q10 of Smart_City_Traffic_Safety Analysis.ipynb, one pass per question, without printing"""
+    zone_speeds = {}
+    for vehicle in structured_data:
+        zone_speeds.setdefault(vehicle['zone'], []).append(vehicle['speed'])
+    averages = {zone: sum(speeds) / len(speeds) for zone, speeds in zone_speeds.items()}
+
+    hour_count = {}
+    for vehicle in structured_data:
+        hour = vehicle['time'].split(':')[0]
+        hour_count[hour] = hour_count.get(hour, 0) + 1
+    peak_hour, max_count = None, 0
+    for hour, count in hour_count.items():
+        if count > max_count:
+            max_count, peak_hour = count, hour
+
+    fast_vehicles = [vehicle for vehicle in structured_data if vehicle['speed'] > 80]
+
+    violation_counts = {}
+    for vehicle in structured_data:
+        for violation in vehicle['violations']:
+            if violation:
+                violation_counts[violation] = violation_counts.get(violation, 0) + 1
+
+    zone_data = {}
+    for vehicle in structured_data:
+        data = zone_data.setdefault(vehicle['zone'], {'total_vehicles': 0, 'total_violations': 0, 'total_speed': 0})
+        data['total_vehicles'] += 1
+        data['total_violations'] += len(vehicle['violations'])
+        data['total_speed'] += vehicle['speed']
+
+    vehicle_stats = {}
+    for vehicle in structured_data:
+        stats = vehicle_stats.setdefault(vehicle['vehicle'], {'count': 0, 'total_speed': 0, 'total_violations': 0})
+        stats['count'] += 1
+        stats['total_speed'] += vehicle['speed']
+        stats['total_violations'] += len(vehicle['violations'])
+
+    congested_zones = {}
+    for vehicle in structured_data:
+        if vehicle['status'] == 'Congested':
+            congested_zones[vehicle['zone']] = congested_zones.get(vehicle['zone'], 0) + 1
+
+    time_windows = {
+        'Morning': ['05', '06', '07', '08', '09', '10', '11'],
+        'Afternoon': ['12', '13', '14', '15', '16'],
+        'Evening': ['17', '18', '19'],
+        'Night': ['20', '21', '22', '23', '00', '01', '02', '03', '04']
+    }
+    windows = []
+    for vehicle in structured_data:
+        hour = vehicle['time'].split(':')[0]
+        time_window = 'Unknown'
+        for window_name, hours_list in time_windows.items():
+            if hour in hours_list:
+                time_window = window_name
+                break
+        windows.append(time_window)
+
+    zone_reports = {}
+    for vehicle in structured_data:
+        report = zone_reports.setdefault(vehicle['zone'], {'speeds': [], 'violations': [], 'vehicle_types': []})
+        report['speeds'].append(vehicle['speed'])
+        report['violations'].extend(vehicle['violations'])
+        report['vehicle_types'].append(vehicle['vehicle'])
+    final = {}
+    for zone, report in zone_reports.items():
+        vehicle_count = {}
+        for vehicle_type in report['vehicle_types']:
+            vehicle_count[vehicle_type] = vehicle_count.get(vehicle_type, 0) + 1
+        violations = len([v for v in report['violations'] if v])
+        final[zone] = (len(report['speeds']), sum(report['speeds']) / len(report['speeds']), violations,
+                       max(vehicle_count, key=vehicle_count.get))
+
+    return averages, peak_hour, fast_vehicles, violation_counts, zone_data, vehicle_stats, congested_zones, windows, final
+
+
+def notebook_output(structured_data) -> str:
+    """The notebook's printed Q2-Q10 output, for checking TrafficAnalytics.format()"""
+    averages, peak_hour, fast, violations, zone_data, vehicle_stats, congested, windows, final = \
+        notebook_aggregates(structured_data)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        for zone, average in averages.items():
+            print(f"Zone {zone}: {average:.1f} km/h")
+        hour_count = sum(1 for vehicle in structured_data if vehicle['time'].split(':')[0] == peak_hour)
+        print(f"Peak hour: {peak_hour}:00")
+        print(f"Vehicles during peak: {hour_count}")
+        print("Vehicles over 80 km/h:")
+        for vehicle in fast:
+            print(f"ID {vehicle['id']}: {vehicle['vehicle']} - {vehicle['speed']} km/h")
+        print("Violation counts:")
+        for violation, count in violations.items():
+            print(f"{violation}: {count}")
+        print("Safety index:")
+        for zone, data in zone_data.items():
+            safety_score = (data['total_speed'] / data['total_vehicles'] * 0.1) + \
+                (data['total_violations'] / data['total_vehicles'] * 20)
+            print(f"Zone {zone}: {safety_score:.2f}")
+        print("Vehicle summary:")
+        for vehicle_type, stats in vehicle_stats.items():
+            print(f"{vehicle_type}: {stats['count']} vehicles, {stats['total_speed'] / stats['count']:.1f} km/h, "
+                  f"{stats['total_violations'] / stats['count']:.1f} violations")
+        print("Congested zones:")
+        for zone, count in congested.items():
+            print(f"Zone {zone}: {count} congested")
+        print("Time windows:")
+        for vehicle, window in zip(structured_data, windows):
+            print(f"ID {vehicle['id']}: {vehicle['time']} → {window}")
+        print("FINAL ZONE REPORT:")
+        for zone, (total, avg_speed, total_violations, common_vehicle) in final.items():
+            rate = total_violations / total
+            safety = "Very Safe" if rate == 0 else "Safe" if rate < 0.5 else "Needs Attention"
+            print(f"Zone {zone}: {total} vehicles, {avg_speed:.1f} km/h, {total_violations} violations, "
+                  f"{common_vehicle}, {safety}")
+    return out.getvalue().rstrip("\n")
+
+
+def rate(fn, arg, n: int, repeats: int) -> float:
+    """Records per second of the fastest of several calls"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--check-records", type=int, default=20000, help="Records whose printed reports are compared")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    record_parser = RecordParser(TRAFFIC_SCHEMA)
+
+    lines = make_lines("traffic", args.check_records, seed=1)
+    assert notebook_output(notebook_traffic(lines)) == TrafficAnalytics(record_parser.parse(lines)).format(), \
+        "TrafficAnalytics report differs from the notebook report"
+
+    lines = make_lines("traffic", args.records)
+    structured_data = notebook_traffic(lines)
+    parsed = record_parser.parse(lines)
+    del lines
+
+    loop_rate = rate(notebook_aggregates, structured_data, args.records, args.repeats)
+    columnar_rate = rate(TrafficAnalytics, parsed, args.records, args.repeats)
+
+    print(f"records={args.records} (reports identical on {args.check_records} records)")
+    print(f"notebook Q2-Q10 passes: {loop_rate / 1e3:8.0f}k records/s")
+    print(f"TrafficAnalytics:       {columnar_rate / 1e3:8.0f}k records/s ({columnar_rate / loop_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Traffic Log Benchmark
+"Zone A1 between 17:00 and 19:00" over text logs vs a full column scan vs the indexed TrafficLog
+
+Usage:
+    python benchmarks/traffic_log.py --events 2000000 --days 7
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.traffic_log import convert_traffic_logs
+from traffic_stream import make_feed
+
+
+def text_query(lines, zone, start, end):
+    """Re-parse every log string, as the notebook does, and filter"""
+    matches = []
+    for i, line in enumerate(lines):
+        fields = dict(part.split(':', 1) for part in line.split(','))
+        if fields['zone'] == zone and start <= fields['time'] < end:
+            matches.append(i)
+    return np.array(matches, dtype=np.int64)
+
+
+def scan_query(log, zone, start, end):
+    """Full scan of the mapped zone (unless None) and minute columns"""
+    minute = log.column('minute')
+    mask = (minute >= start) & (minute < end)
+    if zone is not None:
+        mask &= log.column('zone') == log.dictionaries['zone'].index(zone)
+    return np.flatnonzero(mask)
+
+
+def best_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--bucket-minutes", type=int, default=60)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = make_feed(args.events, seconds=args.days * 86400)
+    directory = tempfile.mkdtemp(prefix="traffic_log_")
+    try:
+        start = time.perf_counter()
+        log = convert_traffic_logs(lines, os.path.join(directory, "log"), bucket_minutes=args.bucket_minutes)
+        convert_s = time.perf_counter() - start
+        log_bytes = sum(os.path.getsize(os.path.join(root, name))
+                        for root, _, names in os.walk(log.path) for name in names)
+        index_bytes = sum(os.path.getsize(os.path.join(log.path, "slots", name))
+                          for name in os.listdir(os.path.join(log.path, "slots")))
+        text_bytes = sum(len(line) + 1 for line in lines)
+
+        expected = text_query(lines, "A1", "17:00", "19:00")
+        assert np.array_equal(scan_query(log, "A1", 1020, 1140), expected)
+        assert np.array_equal(log.rows("A1", "17:00", "19:00"), expected)
+        assert np.array_equal(log.rows(start="17:00", end="19:00"), scan_query(log, None, 1020, 1140))
+        zone_a1 = np.flatnonzero(np.asarray(log.column('zone')) == log.dictionaries['zone'].index("A1"))
+        assert np.array_equal(log.zone_rows("A1"), zone_a1)
+
+        text_ms = best_ms(lambda: text_query(lines, "A1", "17:00", "19:00"), 1)
+        scan_ms = best_ms(lambda: scan_query(log, "A1", 1020, 1140), args.repeats)
+        scan_time_ms = best_ms(lambda: scan_query(log, None, 1020, 1140), args.repeats)
+        index_ms = best_ms(lambda: log.rows("A1", "17:00", "19:00"), args.repeats)
+        time_ms = best_ms(lambda: log.rows(start="17:00", end="19:00"), args.repeats)
+        zone_ms = best_ms(lambda: log.zone_rows("A1"), args.repeats)
+        select_ms = best_ms(lambda: log.select("A1", "17:00", "19:00"), args.repeats)
+        buckets = log.time_buckets("17:00", "19:00")
+        partial = sum(partial for _, partial in buckets)
+
+        print(f"events={args.events} days={args.days} matches={len(expected)}")
+        print(f"text {text_bytes / 1e6:.1f} MB -> log {log_bytes / 1e6:.1f} MB, converted in {convert_s:.1f} s")
+        print(f"(zone, time) index: {index_bytes / 1e6:.1f} MB ({index_bytes / len(log):.1f} bytes per row)")
+        print(f"time index: 17:00-19:00 reads {len(buckets)} of {log.num_buckets} time-of-day buckets "
+              f"({partial} need a minute check)")
+        print(f"re-parse text + filter:   {text_ms:9.2f} ms")
+        print(f"zone+time column scan:    {scan_ms:9.2f} ms")
+        print(f"indexed zone+time rows:   {index_ms:9.2f} ms ({scan_ms / index_ms:.1f}x scan)")
+        print(f"time-only column scan:    {scan_time_ms:9.2f} ms")
+        print(f"time-only rows():         {time_ms:9.2f} ms (scans the minute column)")
+        print(f"zone_rows() from buckets: {zone_ms:9.2f} ms")
+        print(f"select() for analytics:   {select_ms:9.2f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Vitals Monitor Benchmark
+Readings/sec through VitalsMonitor vs recomputing the notebook's Q3/Q5/Q6/Q10/Q19 aggregates from scratch
+
+Usage:
+    python benchmarks/vitals.py --patients 50000 --readings 500000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.records import RecordParser, PATIENT_SCHEMA
+from analytics.vitals import VitalsMonitor
+from record_parser import make_lines
+
+
+def notebook_aggregates(clean_patients):
+    """Q3/Q13, Q5, Q6, Q10 and Q19 of Smart_Health_Care.ipynb over the full list"""
+    doc_map = {}
+    for p in clean_patients:
+        doc_map.setdefault(p['doctor'], []).append(p)
+    summary = {}
+    for doc, patients in doc_map.items():
+        count = len(patients)
+        summary[doc] = (count, sum(p['hr'] for p in patients) / count, sum(p['glucose'] for p in patients) / count)
+    min_glucose = min(clean_patients, key=lambda x: x['glucose'])
+    max_glucose = max(clean_patients, key=lambda x: x['glucose'])
+    avg_hr = sum(p['hr'] for p in clean_patients) / len(clean_patients)
+    load = {doc: len(patients) < 2 for doc, patients in doc_map.items()}
+    return summary, min_glucose['id'], max_glucose['id'], avg_hr, load
+
+
+def monitor_aggregates(monitor):
+    summary = {doc: (s['patients'], s['avg_hr'], s['avg_glucose']) for doc, s in monitor.doctor_summary().items()}
+    load = {doc: understaffed for doc, (_, understaffed) in monitor.doctor_load().items()}
+    return summary, monitor.min_glucose()[0], monitor.max_glucose()[0], monitor.average_hr(), load
+
+
+def make_readings(lines, count: int, seed: int = 1):
+    """Ward readings: a random patient's line with fresh vitals"""
+    rng = random.Random(seed)
+    parser = RecordParser(PATIENT_SCHEMA)
+    patients = [parser.parse_record(line) for line in lines]
+    readings = []
+    for _ in range(count):
+        reading = dict(rng.choice(patients))
+        reading['hr'] = rng.randint(55, 120)
+        reading['bp_systolic'] = rng.randint(100, 170)
+        reading['bp_diastolic'] = rng.randint(60, 105)
+        reading['glucose'] = rng.randint(70, 200)
+        readings.append(reading)
+    return readings
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=50000)
+    parser.add_argument("--readings", type=int, default=500000)
+    args = parser.parse_args()
+
+    lines = make_lines("patients", args.patients)
+    readings = make_readings(lines, args.readings)
+
+    monitor = VitalsMonitor()
+    start = time.perf_counter()
+    for line in lines:
+        monitor.process_line(line)
+    line_s = time.perf_counter() - start
+
+    alerts = 0
+    start = time.perf_counter()
+    for reading in readings:
+        alerts += len(monitor.process(reading))
+    process_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    top = monitor.top_risk(10)
+    top_us = (time.perf_counter() - start) * 1e6
+    start = time.perf_counter()
+    got = monitor_aggregates(monitor)
+    query_us = (time.perf_counter() - start) * 1e6
+
+    # Latest reading per patient, in first-seen order, as the notebook's list would hold them
+    record_parser = RecordParser(PATIENT_SCHEMA)
+    clean_patients = {}
+    for line in lines:
+        record = record_parser.parse_record(line)
+        clean_patients[record['id']] = record
+    for reading in readings:
+        clean_patients[reading['id']] = reading
+    clean_patients = list(clean_patients.values())
+    start = time.perf_counter()
+    expected = notebook_aggregates(clean_patients)
+    recompute_s = time.perf_counter() - start
+    assert got[1:3] == expected[1:3] and got[4] == expected[4], "extremes or doctor load differ from the notebook"
+    assert all(g[0] == e[0] and abs(g[1] - e[1]) < 1e-9 and abs(g[2] - e[2]) < 1e-9
+               for g, e in zip(got[0].values(), expected[0].values())), "doctor summaries differ from the notebook"
+    assert abs(got[3] - expected[3]) < 1e-9, "average HR differs from the notebook"
+
+    n = args.readings
+    print(f"patients={args.patients} readings={n} alerts={alerts} (aggregates identical to a full recompute)")
+    print(f"VitalsMonitor.process:        {n / process_s / 1e3:8.1f}k readings/s ({process_s / n * 1e6:.1f} us each)")
+    print(f"VitalsMonitor.process_line:   {len(lines) / line_s / 1e3:8.1f}k lines/s (parse included)")
+    print(f"aggregates + extremes query:  {query_us:8.1f} us")
+    print(f"top-10 risk (heap):           {top_us:8.1f} us  {top[:3]}")
+    print(f"notebook recompute:           {recompute_s * 1e3:8.1f} ms per refresh "
+          f"(= {1 / recompute_s:.1f} refreshes/s vs one per reading)")
+
+
+if __name__ == "__main__":
+    main()